@@ -54,12 +54,16 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # статика у проді
+    'utils.middleware.AsyncWhiteNoiseMiddleware',  # статика у проді (WhiteNoise, сумісний з ASGI)
+    'utils.metrics.MetricsMiddleware',  # /metrics: запити, час, SQL запити по view (без статики)
+    'utils.tracing.TracingMiddleware',  # спани запитів, лише якщо задано TRACING_FILE
+    'utils.middleware.ReplicaRoutingMiddleware',  # читання з репліки (до сесій: їх запис теж рахується)
     # ✅ ДОДАЄМО middleware для медіа файлів
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'utils.middleware.RequestContextMiddleware',  # request для адмінки (потокобезпечно)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -108,6 +112,26 @@ if use_pg:
             'OPTIONS': {'sslmode': os.getenv('DB_SSLMODE', 'require')},  # зовнішній Railway зазвичай потребує SSL
         }
     }
+    # Без пулу кожен запит відкривав нове TLS з'єднання з Railway Postgres.
+    # Пул (psycopg_pool) живе в кожному процесі gunicorn окремо, тож з'єднань до БД
+    # буде до WEB_CONCURRENCY * DB_POOL_MAX_SIZE (+ manage.py / cron) - має бути менше
+    # max_connections Postgres. Під gthread з'єднання одночасно займають потоки воркера,
+    # тому DB_POOL_MAX_SIZE за замовчуванням = GUNICORN_THREADS; під ASGI потоків не
+    # бракує, і gunicorn.conf.py задає окреме значення (ASGI_DB_POOL_MAX_SIZE).
+    # Порівняти затримку: python manage.py bench_db_connections
+    # Перевірка з'єднання перед видачею (розірвані TLS з'єднання); з пулом - ConnectionPool.check_connection
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if config('DB_POOL', default=True, cast=bool):
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=config('GUNICORN_THREADS', default=4, cast=int), cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),  # очікування вільного з'єднання, с
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+        }
+    else:
+        # Постійні з'єднання без пулу (з пулом Django вимагає CONN_MAX_AGE=0)
+        DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
 else:
     DATABASES = {
         'default': {
@@ -116,6 +140,27 @@ else:
         }
     }
 
+# Репліка для читання (utils.db_router): GET запити API та списки адмінки.
+# Postgres - DB_REPLICA_HOST (решта параметрів як у default), SQLite - DB_REPLICA_NAME (файл).
+# У тестах репліка - дзеркало default.
+if use_pg and os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT') or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif not use_pg and os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['utils.db_router.ReplicaRouter']
+# Скільки секунд після запису клієнт читає з default (відставання репліки)
+REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=5, cast=int)
+
 # ---------- Password validation ----------
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -165,6 +210,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson з fallback на стандартний JSON (utils/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'utils.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -189,48 +244,54 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@yoursite.com')
 
+# Синхронізація з 1С (sync_1c): python manage.py sync_1c
+SYNC_1C = {
+    'TRANSPORT': config('SYNC_1C_TRANSPORT', default='sync_1c.transport.HTTPTransport'),
+    'URL': config('SYNC_1C_URL', default=''),
+    'TOKEN': config('SYNC_1C_TOKEN', default=''),
+    'TIMEOUT': config('SYNC_1C_TIMEOUT', default=30, cast=int),
+    'BATCH_SIZE': config('SYNC_1C_BATCH_SIZE', default=200, cast=int),
+}
+
 # ---------- Logging ----------
+# Логи йдуть через чергу (utils/log.py): файл і stdout пише окремий потік.
+# LOG_FILE - JSON Lines (абсолютний шлях, не від CWD; порожній - без файлу). Ротується
+# лише файл з {pid} (файл на процес) - gunicorn.conf.py так і задає; django.log
+# за замовчуванням (runserver, manage.py) не ротується. LOG_JSON - JSON і в stdout (у проді).
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
-        },
-    },
     'handlers': {
-        'console': {
-            'level': 'INFO',
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        },
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'django.log',
-            'formatter': 'verbose',
+        'queue': {
+            '()': 'utils.log.QueueLogHandler',
+            'filename': config('LOG_FILE', default=str(BASE_DIR / 'django.log')),
+            'max_bytes': config('LOG_MAX_BYTES', default=10 * 1024 * 1024, cast=int),
+            'backup_count': config('LOG_BACKUP_COUNT', default=5, cast=int),
+            'json': config('LOG_JSON', default=IS_RAILWAY or ENV == 'production', cast=bool),
         },
     },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'INFO',
+    },
     'loggers': {
-        'django': {
-            'handlers': ['console', 'file'],
-            'level': 'INFO',
-            'propagate': True,
-        },
-        'utils.middleware': {  # ✅ Логування нашого middleware
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
-            'propagate': True,
-        },
-        'sync_1c': {
-            'handlers': ['console', 'file'],
-            'level': 'INFO',
-            'propagate': True,
-        },
+        'django': {'level': 'INFO'},
+        'users': {'level': config('LOG_LEVEL', default='INFO')},
+        'utils': {'level': config('LOG_LEVEL', default='INFO')},
+        'sync_1c': {'level': 'INFO'},
     },
 }
 
+# ---------- Metrics ----------
+# GET /metrics (utils/metrics.py): staff сесія або Authorization: Bearer METRICS_TOKEN
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# ---------- Tracing ----------
+# OpenTelemetry (utils/tracing.py), за замовчуванням вимкнено. TRACING_FILE - JSON Lines
+# зі спанами ({pid} - файл на процес), TRACING_SAMPLE_RATIO - частка запитів, що трасуються.
+TRACING_FILE = config('TRACING_FILE', default='')
+TRACING_SAMPLE_RATIO = config('TRACING_SAMPLE_RATIO', default=1.0, cast=float)
+
 # ---------- Sites (опціонально) ----------
 SITE_ID = 1
 
@@ -3,22 +3,25 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
-from django.views.static import serve
 import os
 
+from utils.aio import serve
+from utils.metrics import metrics_view
+
 urlpatterns = [
     path('', RedirectView.as_view(url='/admin/', permanent=False)),
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
     path('select2/', include('django_select2.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Обслуговування медіа файлів
 if settings.DEBUG:
     # Локальна розробка - стандартний спосіб
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve, document_root=settings.MEDIA_ROOT)
 else:
-    # Продакшн/Railway - кастомне обслуговування
+    # Продакшн/Railway - кастомне обслуговування (async, файл читається частинами)
     urlpatterns += [
         re_path(r'^media/(?P<path>.*)$', serve, {
             'document_root': settings.MEDIA_ROOT,
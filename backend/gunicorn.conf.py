@@ -0,0 +1,86 @@
+# backend/gunicorn.conf.py
+"""
+Налаштування gunicorn (start.sh: gunicorn -c gunicorn.conf.py).
+
+За замовчуванням воркери uvicorn (ASGI, config.asgi): тіло запиту читається
+асинхронно, тож сотні повільних завантажень на процес не займають потоків;
+async view (завантаження, медіа, досьє, адмін-списки) працюють в event loop,
+синхронні DRF view - у потоці на запит. GUNICORN_WORKER_CLASS=gthread повертає
+WSGI (config.wsgi) з GUNICORN_THREADS потоками.
+
+Кожен воркер - окремий процес зі своїм пулом з'єднань до БД. DB_POOL_MAX_SIZE -
+скільки запитів воркера одночасно працюють з БД, решта чекає вільне з'єднання
+до DB_POOL_TIMEOUT. Під gthread за замовчуванням = GUNICORN_THREADS (більше
+запитів одночасно не буває). Під ASGI кожен запит до sync view отримує свій
+потік, тож потоки конкурентність не обмежують - за замовчуванням
+ASGI_DB_POOL_MAX_SIZE (10). Всього з'єднань від веб-сервісу:
+WEB_CONCURRENCY * DB_POOL_MAX_SIZE.
+
+Логи (utils/log.py): LOG_FILE за замовчуванням - logs/django-{pid}.log, файл
+на воркер з ротацією (один файл з кількох процесів не ротується).
+
+PDF_WARM_UP=1 - прогріти генерацію перепусток у кожному воркері (users/services/pdf.py).
+
+Метрики (utils/metrics.py) кожен воркер пише у PROMETHEUS_MULTIPROC_DIR;
+папка очищається при старті master, /metrics сумує всі процеси.
+"""
+import os
+import shutil
+
+# До завантаження застосунку у воркерах: prometheus_client читає змінну при імпорті
+multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-metrics')
+os.environ.setdefault('LOG_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'django-{pid}.log'))
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+is_asgi = 'uvicorn' in worker_class
+wsgi_app = 'config.asgi:application' if is_asgi else 'config.wsgi:application'
+
+if is_asgi:
+    # До завантаження settings у воркерах
+    os.environ.setdefault('DB_POOL_MAX_SIZE', os.getenv('ASGI_DB_POOL_MAX_SIZE', '10'))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))  # тільки для gthread
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'debug')
+accesslog = '-'
+errorlog = '-'
+capture_output = True
+
+
+def when_ready(server):
+    pool_size = int(os.getenv('DB_POOL_MAX_SIZE', threads))
+    server.log.info(
+        'Workers: %s x %s; DB connections up to %s (DB_POOL_MAX_SIZE=%s per worker)',
+        workers, 'ASGI' if is_asgi else f'{threads} threads', workers * pool_size, pool_size,
+    )
+    if is_asgi:
+        server.log.info(
+            'ASGI: понад %s одночасних запитів до БД на воркер чекатимуть вільне з\'єднання '
+            'до DB_POOL_TIMEOUT (DB_POOL_MAX_SIZE / ASGI_DB_POOL_MAX_SIZE)', pool_size,
+        )
+    elif pool_size < threads:
+        server.log.warning('DB_POOL_MAX_SIZE < GUNICORN_THREADS: потоки чекатимуть вільне з\'єднання')
+
+
+def on_starting(server):
+    # Файли попереднього запуску дали б завищені лічильники
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # PDF_WARM_UP=1: reportlab, шрифти і логотип завантажуються до першого запиту, а не в ньому
+    if os.getenv('PDF_WARM_UP', '').lower() in ('1', 'true', 'yes'):
+        from users.services import pdf
+
+        pdf.warm_up()
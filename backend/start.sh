@@ -38,9 +38,4 @@ python manage.py collectstatic --noinput --verbosity=2
 
 # Start server with debug logging
 echo "=== Starting gunicorn ==="
-exec gunicorn config.wsgi:application \
-  --bind 0.0.0.0:$PORT \
-  --log-level debug \
-  --access-logfile - \
-  --error-logfile - \
-  --capture-output
\ No newline at end of file
+exec gunicorn -c gunicorn.conf.py
\ No newline at end of file
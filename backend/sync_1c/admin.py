@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import SyncRun
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'full', 'total', 'synced', 'failed']
+    list_filter = ['full']
+    readonly_fields = ['started_at', 'finished_at', 'full', 'total', 'synced', 'failed', 'errors']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from sync_1c.standin import StandInServer
+
+
+class Command(BaseCommand):
+    help = 'Локальна заглушка HTTP сервісу 1С для розробки (див. sync_1c/standin.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        server = StandInServer((options['host'], options['port']))
+        self.stdout.write(f'Заглушка 1С: {server.url} (SYNC_1C_URL), Ctrl+C для зупинки')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Отримано рядків: {server.received}')
@@ -0,0 +1,24 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from sync_1c.services import sync_tenders
+
+
+class Command(BaseCommand):
+    help = 'Відправляє змінені тендери в 1С (запускати періодично, напр. кожні 5 хвилин)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Повна синхронізація всіх тендерів')
+        parser.add_argument('--batch-size', type=int, help='Рядків у пакеті (за замовчуванням SYNC_1C["BATCH_SIZE"])')
+        parser.add_argument('--limit', type=int, help='Максимум рядків за запуск')
+
+    def handle(self, *args, **options):
+        try:
+            run = sync_tenders(full=options['full'], batch_size=options['batch_size'], limit=options['limit'])
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+        elapsed = (run.finished_at - run.started_at).total_seconds()
+        style = self.style.SUCCESS if not run.failed else self.style.WARNING
+        self.stdout.write(style(
+            f'Відправлено {run.total}, синхронізовано {run.synced}, помилок {run.failed} за {elapsed:.1f} с'
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Початок')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершення')),
+                ('full', models.BooleanField(default=False, verbose_name='Повна синхронізація')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Відправлено')),
+                ('synced', models.PositiveIntegerField(default=0, verbose_name='Синхронізовано')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Помилок')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Помилки')),
+            ],
+            options={
+                'verbose_name': 'Синхронізація з 1С',
+                'verbose_name_plural': 'Синхронізації з 1С',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
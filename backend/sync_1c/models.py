@@ -1,3 +1,21 @@
 from django.db import models
 
-# Create your models here.
+
+class SyncRun(models.Model):
+    """Запуск синхронізації тендерів з 1С (підсумок; результат по рядках - у полях User)"""
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='Початок')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершення')
+    full = models.BooleanField(default=False, verbose_name='Повна синхронізація')
+    total = models.PositiveIntegerField(default=0, verbose_name='Відправлено')
+    synced = models.PositiveIntegerField(default=0, verbose_name='Синхронізовано')
+    failed = models.PositiveIntegerField(default=0, verbose_name='Помилок')
+    # Перші помилки: [{'id': ..., 'tender_number': ..., 'error': ...}]
+    errors = models.JSONField(default=list, blank=True, verbose_name='Помилки')
+
+    class Meta:
+        verbose_name = 'Синхронізація з 1С'
+        verbose_name_plural = 'Синхронізації з 1С'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at:%d.%m.%Y %H:%M} - {self.synced}/{self.total}"
@@ -0,0 +1,145 @@
+# backend/sync_1c/services.py
+"""
+Синхронізація тендерів (User, is_staff=False) з 1С.
+
+Черга - рядки з updated_at > last_sync_at (частковий індекс user_sync_1c_pending_idx).
+Рядки читаються пакетами через .values() з keyset по (updated_at, id), кожен
+пакет - один запит у 1С, результати записуються одним bulk_update. last_sync_at
+отримує прочитаний updated_at рядка, а не поточний час: якщо тендер змінили під
+час відправки, він лишиться в черзі до наступного запуску.
+bulk_update/update не відправляють сигналів і не чіпають auto_now updated_at.
+"""
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import SYNC_1C_PENDING, User
+
+from .models import SyncRun
+from .transport import TransportError, get_transport
+
+logger = logging.getLogger('sync_1c')
+
+PAYLOAD_FIELDS = [
+    'id', 'tender_number', 'sync_1c_id', 'company_name', 'edrpou', 'legal_address',
+    'actual_address', 'director_name', 'contact_person', 'email', 'phone',
+    'department__name', 'status', 'is_activated', 'created_at', 'updated_at',
+]
+
+# Скільки помилок зберігати в SyncRun.errors
+MAX_STORED_ERRORS = 100
+# Після стількох недоставлених пакетів поспіль запуск зупиняється (1С недоступна)
+MAX_FAILED_BATCHES = 3
+
+
+def pending_tenders(full=False):
+    if full:
+        return User.objects.filter(is_staff=False)
+    return User.objects.filter(SYNC_1C_PENDING)
+
+
+def build_payload(row):
+    return {
+        'id': row['id'],
+        'tender_number': row['tender_number'],
+        'sync_1c_id': row['sync_1c_id'],
+        'company_name': row['company_name'],
+        'edrpou': row['edrpou'],
+        'legal_address': row['legal_address'],
+        'actual_address': row['actual_address'],
+        'director_name': row['director_name'],
+        'contact_person': row['contact_person'],
+        'email': row['email'],
+        'phone': row['phone'],
+        'department': row['department__name'] or '',
+        'status': row['status'],
+        'is_activated': row['is_activated'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+    }
+
+
+def iter_batches(queryset, batch_size):
+    """Keyset по (updated_at, id): синхронізовані рядки випадають з черги, курсор від цього не збивається"""
+    queryset = queryset.order_by('updated_at', 'id').values(*PAYLOAD_FIELDS)
+    cursor = None
+    while True:
+        page = queryset
+        if cursor is not None:
+            updated_at, pk = cursor
+            page = page.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+        rows = list(page[:batch_size])
+        if not rows:
+            return
+        yield rows
+        cursor = (rows[-1]['updated_at'], rows[-1]['id'])
+
+
+def _record(rows, results):
+    """Записує результат пакету; повертає список помилок"""
+    synced, errors = [], []
+    for row in rows:
+        external_id, error = results.get(row['id'], ('', 'Немає відповіді від 1С'))
+        if error:
+            errors.append({'id': row['id'], 'tender_number': row['tender_number'], 'error': error})
+            continue
+        synced.append(User(
+            pk=row['id'],
+            synced_to_1c=True,
+            sync_1c_id=(external_id or row['sync_1c_id'])[:50],
+            last_sync_at=row['updated_at'],
+        ))
+    User.objects.bulk_update(synced, ['synced_to_1c', 'sync_1c_id', 'last_sync_at'])
+    if errors:
+        User.objects.filter(pk__in=[error['id'] for error in errors]).update(synced_to_1c=False)
+    return errors
+
+
+def sync_tenders(full=False, transport=None, batch_size=None, limit=None):
+    """
+    Відправляє змінені тендери (full=True - всі) у 1С.
+    limit - максимум рядків за запуск. Повертає SyncRun.
+    """
+    batch_size = batch_size or settings.SYNC_1C['BATCH_SIZE']
+    transport = transport or get_transport()
+    run = SyncRun.objects.create(full=full)
+    failed_batches = 0
+    logger.info('Синхронізація з 1С: старт (full=%s)', full)
+
+    try:
+        for rows in iter_batches(pending_tenders(full), batch_size):
+            if limit is not None:
+                rows = rows[:limit - run.total]
+            payload = [build_payload(row) for row in rows]
+            try:
+                results = transport.send(payload)
+            except TransportError as exc:
+                failed_batches += 1
+                logger.error('Синхронізація з 1С: пакет з %s рядків не доставлено: %s', len(rows), exc)
+                results = {row['id']: ('', f'Транспорт: {exc}') for row in rows}
+            else:
+                failed_batches = 0
+
+            errors = _record(rows, results)
+            run.total += len(rows)
+            run.failed += len(errors)
+            run.synced += len(rows) - len(errors)
+            run.errors.extend(errors[:MAX_STORED_ERRORS - len(run.errors)])
+
+            if failed_batches >= MAX_FAILED_BATCHES:
+                logger.error('Синхронізація з 1С: зупинено після %s недоставлених пакетів', failed_batches)
+                break
+            if limit is not None and run.total >= limit:
+                break
+    finally:
+        transport.close()
+        run.finished_at = timezone.now()
+        run.save()
+
+    logger.info(
+        'Синхронізація з 1С: відправлено %s, синхронізовано %s, помилок %s',
+        run.total, run.synced, run.failed
+    )
+    return run
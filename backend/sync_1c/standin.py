@@ -0,0 +1,66 @@
+# backend/sync_1c/standin.py
+"""
+Локальна заглушка HTTP сервісу 1С (той самий протокол, що в transport.py).
+
+Для розробки та перевірки синхронізації без доступу до 1С:
+    python manage.py run_1c_standin --port 8765
+    SYNC_1C_URL=http://127.0.0.1:8765 python manage.py sync_1c
+Або в коді: server = start_standin(); ... server.url ...; server.shutdown()
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, як у справжнього сервісу
+
+    def do_POST(self):
+        if not self.path.endswith('/tenders/batch'):
+            return self._reply(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            items = json.loads(self.rfile.read(length))['items']
+        except (ValueError, KeyError, TypeError):
+            return self._reply(400, {'error': 'bad request'})
+
+        results = []
+        for item in items:
+            if not item.get('tender_number'):
+                results.append({'id': item.get('id'), 'external_id': None, 'error': 'Немає номера тендеру'})
+            else:
+                external_id = item.get('sync_1c_id') or f"1C-{item['tender_number']}"
+                results.append({'id': item['id'], 'external_id': external_id, 'error': None})
+        self.server.received += len(items)
+        self._reply(200, {'results': results})
+
+    def _reply(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, StandInHandler)
+        self.received = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_standin(host='127.0.0.1', port=0):
+    """Запускає заглушку у фоновому потоці (port=0 - будь-який вільний)"""
+    server = StandInServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,3 +1,103 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from sync_1c.services import pending_tenders, sync_tenders
+from sync_1c.standin import start_standin
+from sync_1c.transport import HTTPTransport
+from users.models import Department, User
+
+
+class SyncTendersTests(TestCase):
+    """sync_tenders проти локальної заглушки 1С (sync_1c/standin.py) по HTTP"""
+
+    def setUp(self):
+        self.server = self.start_server()
+        department = Department.objects.create(name='Підрозділ', code='D1')
+        self.tenders = [
+            User.objects.create(
+                username=f'tender{i}', email=f'tender{i}@example.com', tender_number=f'T-{i}',
+                department=department,
+            )
+            for i in range(5)
+        ]
+        User.objects.create(username='admin', email='admin@example.com', tender_number='ADMIN')
+        # User.save скидає is_staff у нових користувачів
+        User.objects.filter(username='admin').update(is_staff=True)
+
+    def start_server(self):
+        server = start_standin()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def sync(self, server=None, **kwargs):
+        with self.assertLogs('sync_1c', 'INFO'):
+            return sync_tenders(transport=HTTPTransport((server or self.server).url), batch_size=2, **kwargs)
+
+    def test_full_sync(self):
+        run = self.sync(full=True)
+
+        self.assertEqual((run.total, run.synced, run.failed), (5, 5, 0))
+        self.assertEqual(self.server.received, 5)
+        self.assertIsNotNone(run.finished_at)
+        for tender in User.objects.filter(is_staff=False):
+            self.assertTrue(tender.synced_to_1c)
+            self.assertEqual(tender.sync_1c_id, f'1C-{tender.tender_number}')
+            self.assertEqual(tender.last_sync_at, tender.updated_at)
+        self.assertFalse(User.objects.get(username='admin').synced_to_1c)
+
+    def test_incremental_sync_sends_only_changed(self):
+        self.sync()
+        tender = User.objects.get(pk=self.tenders[2].pk)
+        tender.phone = '+380501234567'
+        tender.save()
+
+        run = self.sync()
+
+        self.assertEqual((run.total, run.synced, run.failed), (1, 1, 0))
+        self.assertEqual(self.server.received, 6)
+        self.assertEqual(self.sync().total, 0)
+
+    def test_row_error_is_retried_next_run(self):
+        User.objects.filter(pk=self.tenders[0].pk).update(tender_number='')
+
+        run = self.sync()
+
+        self.assertEqual((run.total, run.synced, run.failed), (5, 4, 1))
+        self.assertEqual(run.errors[0]['id'], self.tenders[0].pk)
+        self.assertFalse(User.objects.get(pk=self.tenders[0].pk).synced_to_1c)
+
+        User.objects.filter(pk=self.tenders[0].pk).update(tender_number='T-0')
+        run = self.sync()
+        self.assertEqual((run.total, run.synced, run.failed), (1, 1, 0))
+
+    def test_unavailable_1c_stops_run_and_retries_next_run(self):
+        url = self.server.url
+        self.server.shutdown()
+        self.server.server_close()
+
+        with self.assertLogs('sync_1c', 'ERROR'):
+            run = sync_tenders(transport=HTTPTransport(url), batch_size=1)
+
+        # Зупинка після MAX_FAILED_BATCHES недоставлених пакетів
+        self.assertEqual((run.total, run.synced, run.failed), (3, 0, 3))
+        self.assertIn('Транспорт', run.errors[0]['error'])
+        self.assertEqual(User.objects.filter(is_staff=False, synced_to_1c=True).count(), 0)
+
+        server = self.start_server()
+        run = self.sync(server)
+        self.assertEqual((run.total, run.synced, run.failed), (5, 5, 0))
+        self.assertEqual(server.received, 5)
+
+
+class SeedScaleSyncTests(TestCase):
+    def test_seeded_tenders_are_not_pending(self):
+        call_command(
+            'seed_scale', users=5, departments=1, employees=1, technics=1, orders=1, chunk=2,
+            no_files=True, stdout=StringIO(),
+        )
+
+        self.assertEqual(User.objects.filter(tender_number__startswith='SCALE-').count(), 5)
+        self.assertFalse(pending_tenders().exists())
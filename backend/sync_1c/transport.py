@@ -0,0 +1,94 @@
+# backend/sync_1c/transport.py
+"""
+Транспорт пакетів у 1С.
+
+Протокол HTTP сервісу 1С:
+    POST <URL>/tenders/batch  {"items": [payload, ...]}
+    200 {"results": [{"id": <локальний id>, "external_id": "...", "error": null}, ...]}
+Рядок з непорожнім error вважається не синхронізованим. 1С оновлює запис за
+tender_number/sync_1c_id, тому повторна відправка пакету безпечна.
+Транспорт обирається в settings.SYNC_1C['TRANSPORT'].
+"""
+import http.client
+import json
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+class TransportError(Exception):
+    """Пакет не доставлено (мережа, HTTP статус, некоректна відповідь)"""
+
+
+class BaseTransport:
+    def send(self, items):
+        """items - список payload; повертає {локальний id: (external_id, error)}"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HTTPTransport(BaseTransport):
+    """JSON по HTTP з одним keep-alive з'єднанням на весь запуск синхронізації"""
+
+    def __init__(self, url, token='', timeout=30):
+        if not url:
+            raise ImproperlyConfigured('SYNC_1C["URL"] не задано')
+        parts = urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.path = parts.path.rstrip('/') + '/tenders/batch'
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+        self._connection = None
+
+    def _request(self, body):
+        if self._connection is None:
+            self._connection = self.connection_class(self.netloc, timeout=self.timeout)
+        self._connection.request('POST', self.path, body=body, headers=self.headers)
+        response = self._connection.getresponse()
+        return response.status, response.read()
+
+    def send(self, items):
+        body = json.dumps({'items': items}, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+        try:
+            try:
+                status, data = self._request(body)
+            except ConnectionError:
+                # Сервер міг закрити keep-alive з'єднання між пакетами - одна повторна спроба
+                # (таймаут не повторюємо: 1С могла ще обробляти пакет)
+                self.close()
+                status, data = self._request(body)
+        except (OSError, http.client.HTTPException) as exc:
+            self.close()
+            raise TransportError(str(exc) or exc.__class__.__name__) from exc
+
+        if status != 200:
+            raise TransportError(f'HTTP {status}: {data[:200].decode(errors="replace")}')
+        try:
+            results = json.loads(data)['results']
+            return {
+                int(result['id']): (str(result.get('external_id') or ''), str(result.get('error') or ''))
+                for result in results
+            }
+        except (ValueError, KeyError, TypeError) as exc:
+            raise TransportError(f'Некоректна відповідь 1С: {exc}') from exc
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def get_transport():
+    options = settings.SYNC_1C
+    transport_class = import_string(options['TRANSPORT'])
+    return transport_class(url=options['URL'], token=options['TOKEN'], timeout=options['TIMEOUT'])
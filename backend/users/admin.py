@@ -1,15 +1,28 @@
 # backend/users/admin.py
+import logging
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.contrib import messages
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django import forms
+from django.db.models import Count, Exists, IntegerField, OuterRef, Prefetch, Subquery, prefetch_related_objects
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
 from django_select2.forms import ModelSelect2Widget
-from .models import User, Department, WorkType, WorkSubType, Equipment, UserWork, TechnicType, InstrumentType, UserSpecification, UserEmployee, UserOrder, UserTechnic, UserInstrument, UserPPE, Permit
+from .models import User, Department, WorkType, WorkSubType, Equipment, UserWork, TechnicType, InstrumentType, UserSpecification, UserEmployee, UserOrder, UserTechnic, UserInstrument, UserPPE, Permit, DocumentFile, UserReadiness, ExpiryRecord, OutboxConsumer
 from django.urls import reverse
+from .services import pdf, search
+from .services.expiry import EXPIRY_WARNING_DAYS
+from utils.metrics import ZIP_EXPORT_BYTES
+from utils.middleware import get_current_request
+
+logger = logging.getLogger(__name__)
 
 def get_file_url(file_field):
     """Отримує URL файлу незалежно від формату зберігання"""
@@ -255,14 +268,67 @@ class StaffUserAdmin(BaseUserAdmin):
                     )
                     obj.user_permissions.add(permission)
                 except Permission.DoesNotExist:
-                    print(f"Permission {perm_codename} not found")
+                    logger.warning('Право %s не знайдено', perm_codename)
                     continue
             
-            print(f"✅ Права надано адміну підрозділу: {obj.username}")
+            logger.info('Права надано адміну підрозділу: %s', obj.username)
 
 
 # ================ INLINE КЛАСИ ДЛЯ ПЕРЕГЛЯДУ ДАНИХ КАБІНЕТУ ================
 
+def count_subquery(model):
+    """COUNT(*) дочірніх записів користувача як корельований підзапит (для annotate)"""
+    counts = (
+        model.objects.filter(user=OuterRef('pk'))
+        .order_by()
+        .values('user')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class PrefetchedInlineFormSet(BaseInlineFormSet):
+    """
+    Інлайн бере об'єкти з кешу батьківського об'єкта (TenderUserAdmin.get_object
+    підвантажує все досьє наперед), замість окремого запиту на кожен інлайн.
+    """
+
+    def __init__(self, *args, queryset=None, **kwargs):
+        # Фільтри з get_queryset інлайна кеш батьківського об'єкта не враховує
+        self._inline_filtered = queryset is not None and queryset.query.has_filters()
+        super().__init__(*args, queryset=queryset, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if queryset._result_cache is None and not queryset.query.is_empty() and not self._inline_filtered:
+            cached = self._cached_objects(queryset)
+            if cached is not None:
+                queryset._result_cache = cached
+                queryset._prefetch_done = True
+        return queryset
+
+    @staticmethod
+    def _ordering(queryset):
+        query = queryset.query
+        return tuple(query.order_by or (query.get_meta().ordering if query.default_ordering else ()))
+
+    def _cached_objects(self, queryset):
+        rel = self.fk.remote_field
+        if rel.one_to_one:
+            if not rel.is_cached(self.instance):
+                return None
+            obj = rel.get_cached_value(self.instance)
+            return [obj] if obj is not None else []
+        cache = getattr(self.instance, '_prefetched_objects_cache', {})
+        cached = cache.get(rel.get_accessor_name())
+        # Кеш відсортований інакше, ніж запит інлайна (ordering інлайна, order_by('pk')
+        # для моделі без Meta.ordering) - порядок рядків змінився б, тож звичайний запит
+        if cached is None or self._ordering(cached) != self._ordering(queryset):
+            return None
+        return list(cached)
+
+
 # ================ СПЕЦИФІКАЦІЯ З РОБОТАМИ ТА ФАЙЛАМИ ================
 
 class UserWorkInline(admin.TabularInline):
@@ -306,6 +372,7 @@ class UserWorkInline(admin.TabularInline):
 class UserSpecificationInline(admin.StackedInline):
     """Специфікація робіт"""
     model = UserSpecification
+    formset = PrefetchedInlineFormSet
     extra = 0
     max_num = 1
     can_delete = False
@@ -384,6 +451,7 @@ class UserSpecificationInline(admin.StackedInline):
 class UserEmployeeInline(admin.TabularInline):
     """Співробітники"""
     model = UserEmployee
+    formset = PrefetchedInlineFormSet
     extra = 0
     can_delete = False
     readonly_fields = ['name', 'photo_display', 'medical_exam_date', 'organization_name', 
@@ -443,6 +511,7 @@ class UserEmployeeInline(admin.TabularInline):
 class UserOrderInline(admin.TabularInline):
     """Накази"""
     model = UserOrder
+    formset = PrefetchedInlineFormSet
     extra = 0
     can_delete = False
     readonly_fields = ['order_type',  'documents_preview', 'created_at']
@@ -483,7 +552,7 @@ class UserOrderInline(admin.TabularInline):
                     
                     return format_html('<div style="line-height: 1.4;">{}</div>', result)
             except Exception as e:
-                print(f"DEBUG Накази: {e}")
+                logger.warning('Документи наказу %s: %s', obj.pk, e)
                 pass
         return format_html('<span style="color: #ccc;">—</span>')
     documents_preview.short_description = 'Файли'
@@ -495,6 +564,7 @@ class UserOrderInline(admin.TabularInline):
 class UserTechnicInline(admin.TabularInline):
     """Техніка"""
     model = UserTechnic
+    formset = PrefetchedInlineFormSet
     extra = 0
     can_delete = False
     readonly_fields = ['technic_display', 'documents_count', 'documents_links', 'created_at']
@@ -508,6 +578,9 @@ class UserTechnicInline(admin.TabularInline):
         return 'Не вказано'
     technic_display.short_description = 'Техніка'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('technic_type')
+
     def documents_count(self, obj):
         if obj.documents:
             try:
@@ -553,7 +626,7 @@ class UserTechnicInline(admin.TabularInline):
                     return format_html('<div style="line-height: 1.3; max-width: 250px;">{}</div>', 
                                     format_html('<br><br>'.join([str(link) for link in links[:2]])))
             except Exception as e:
-                print(f"DEBUG Техніка помилка: {e}")
+                logger.warning('Документи техніки %s: %s', obj.pk, e)
                 return format_html('<span style="color: #ff4d4f;">Помилка: {}</span>', str(e))
         return format_html('<span style="color: #ccc;">—</span>')
     documents_links.short_description = 'Файли'
@@ -565,6 +638,7 @@ class UserTechnicInline(admin.TabularInline):
 class UserInstrumentInline(admin.TabularInline):
     """Інструменти"""
     model = UserInstrument
+    formset = PrefetchedInlineFormSet
     extra = 0
     can_delete = False
     readonly_fields = ['instrument_display', 'documents_count', 'documents_links', 'created_at']
@@ -578,6 +652,9 @@ class UserInstrumentInline(admin.TabularInline):
         return 'Не вказано'
     instrument_display.short_description = 'Інструмент'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('instrument_type')
+
     def documents_count(self, obj):
         if obj.documents:
             try:
@@ -623,7 +700,7 @@ class UserInstrumentInline(admin.TabularInline):
                     return format_html('<div style="line-height: 1.3; max-width: 250px;">{}</div>', 
                                     format_html('<br><br>'.join([str(link) for link in links[:2]])))
             except Exception as e:
-                print(f"DEBUG Інструменти помилка: {e}")
+                logger.warning('Документи інструменту %s: %s', obj.pk, e)
                 return format_html('<span style="color: #ff4d4f;">Помилка: {}</span>', str(e))
         return format_html('<span style="color: #ccc;">—</span>')
     documents_links.short_description = 'Файли'
@@ -635,6 +712,7 @@ class UserInstrumentInline(admin.TabularInline):
 class UserPPEInline(admin.StackedInline):
     """ЗІЗ - Засоби індивідуального захисту"""
     model = UserPPE
+    formset = PrefetchedInlineFormSet
     extra = 0
     max_num = 1
     can_delete = False
@@ -686,7 +764,7 @@ class UserPPEInline(admin.StackedInline):
                             count, files_html, extra_info
                         )
             except Exception as e:
-                print(f"DEBUG ЗІЗ помилка: {e}")
+                logger.warning('Документи ЗІЗ %s: %s', obj.pk, e)
                 return format_html(
                     '<div style="background: #fff7e6; padding: 15px; border-radius: 6px; border-left: 4px solid #faad14;">'
                     '<span style="color: #fa8c16;">🛡️ Помилка: {}</span>'
@@ -709,8 +787,11 @@ class TenderUserAdmin(admin.ModelAdmin):
     """Адмін панель для переможців тендерів"""
     list_display = [
         'tender_number', 'company_name', 'email', 'status_colored', 
-        'department_name', 'access_status', 'activation_link_display', 'password_change_link', 'created_at'
+        'department_name', 'employees_count', 'technics_count', 'permits_count',
+        'readiness_completeness', 'readiness_missing', 'expiry_status',
+        'access_status', 'activation_link_display', 'password_change_link', 'created_at'
     ]
+    list_select_related = ['department', 'readiness']
     list_filter = ['status', 'is_activated', 'department']
     search_fields = ['tender_number', 'company_name', 'email', 'edrpou']
     readonly_fields = ['tender_number', 'created_at', 'updated_at', 'activation_token', 'activation_link_field', 'permits_section']
@@ -817,7 +898,7 @@ class TenderUserAdmin(admin.ModelAdmin):
         if not obj or not obj.pk:
             return "Інформація недоступна"
         
-        request = getattr(self, '_current_request', None)
+        request = get_current_request()
         permits_count = obj.permits.count() if hasattr(obj, 'permits') else 0
     
         if request and request.user.is_superuser:
@@ -984,7 +1065,6 @@ class TenderUserAdmin(admin.ModelAdmin):
         import json
         from django.http import JsonResponse
         from django.db import transaction
-        from users.services.pdf_generator import PermitPDFGenerator
         
         # Перевіряємо права
         if not request.user.is_superuser:
@@ -1003,7 +1083,6 @@ class TenderUserAdmin(admin.ModelAdmin):
                 old_count = user.permits.count()
                 user.permits.all().delete()
                 
-                generator = PermitPDFGenerator()
                 created_permits = []
                 
                 # Створюємо для співробітників
@@ -1015,7 +1094,7 @@ class TenderUserAdmin(admin.ModelAdmin):
                         employee=employee,
                         created_by=request.user
                     )
-                    generator.generate_permit(permit)
+                    pdf.generate_permit(permit)
                     permit.save()
                     created_permits.append({
                         'number': permit.permit_number,
@@ -1031,7 +1110,7 @@ class TenderUserAdmin(admin.ModelAdmin):
                         technic=technic,
                         created_by=request.user
                     )
-                    generator.generate_permit(permit)
+                    pdf.generate_permit(permit)
                     permit.save()
                     created_permits.append({
                         'number': permit.permit_number,
@@ -1106,6 +1185,7 @@ class TenderUserAdmin(admin.ModelAdmin):
                         zip_file.writestr(f"{permit.permit_number}_ERROR.txt", error_info.encode('utf-8'))
         
         zip_buffer.seek(0)
+        ZIP_EXPORT_BYTES.observe(zip_buffer.getbuffer().nbytes)
         
         # Відправляємо ZIP файл
         response = HttpResponse(
@@ -1134,10 +1214,31 @@ class TenderUserAdmin(admin.ModelAdmin):
         # ВАЖЛИВО: custom URLs мають йти ПЕРЕД стандартними
         return custom_urls + urls
 
-    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
-        """Зберігаємо request для використання в permits_section"""
-        self._current_request = request
-        return super().changeform_view(request, object_id, form_url, extra_context)
+    def get_object(self, request, object_id, from_field=None):
+        """
+        На сторінці редагування підвантажуємо все досьє фіксованою кількістю запитів:
+        інлайни (PrefetchedInlineFormSet), works_summary та permits_section читають з кешу.
+        """
+        obj = super().get_object(request, object_id, from_field)
+        match = request.resolver_match
+        if obj is None or not match or match.url_name != 'users_tenderuser_change':
+            return obj
+
+        lookups = [
+            'department',
+            Prefetch('permits', queryset=Permit.objects.select_related('employee', 'technic__technic_type')),
+        ]
+        if request.user.is_superuser:
+            lookups += [
+                'specification', 'ppe',
+                Prefetch('works', queryset=UserWork.objects.select_related('work_type', 'work_sub_type')),
+                'employees', 'orders',
+                Prefetch('technics', queryset=UserTechnic.objects.select_related('technic_type')),
+                Prefetch('instruments', queryset=UserInstrument.objects.select_related('instrument_type')),
+            ]
+        prefetch_related_objects([obj], *lookups)
+        return obj
+
         
     def password_change_link(self, obj):
         if obj.pk:
@@ -1154,14 +1255,46 @@ class TenderUserAdmin(admin.ModelAdmin):
         
         if request.user.is_superuser:
             # Суперадмін бачить всіх
-            return qs
+            pass
         elif request.user.is_staff and hasattr(request.user, 'department') and request.user.department:
             # Адмін підрозділу бачить тільки переможців зі свого підрозділу
-            return qs.filter(department=request.user.department)
+            qs = qs.filter(department=request.user.department)
         else:
             # Якщо у адміна немає підрозділу - не бачить нікого
             return qs.none()
+
+        match = request.resolver_match
+        if match and match.url_name == 'users_tenderuser_changelist':
+            qs = self._annotate_changelist(qs)
+        return qs
+
+    def _annotate_changelist(self, qs):
+        """Лічильники та прапорці термінів у тому ж SQL запиті, що й сторінка списку"""
+        today = timezone.localdate()
+        soon = today + timedelta(days=EXPIRY_WARNING_DAYS)
+        return qs.annotate(
+            employees_total=count_subquery(UserEmployee),
+            technics_total=count_subquery(UserTechnic),
+            permits_total=count_subquery(Permit),
+            has_expired=Exists(
+                ExpiryRecord.objects.filter(user=OuterRef('pk'), expiry_date__lt=today)
+            ),
+            expires_soon=Exists(
+                ExpiryRecord.objects.filter(user=OuterRef('pk'), expiry_date__range=(today, soon))
+            ),
+        )
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Пошук через індекс SearchEntry (FTS/trigram) замість icontains по кожному полю.
+        Знаходить тендер також за ПІБ співробітника чи держномером техніки.
+        """
+        if not search.tokenize(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        department_id = None if request.user.is_superuser else request.user.department_id
+        user_ids = search.matching_user_ids(search_term, department_id=department_id)
+        return queryset.filter(pk__in=user_ids), False
+
     def get_list_filter(self, request):
         """Адміни підрозділів не бачать фільтр по підрозділах"""
         filters = list(self.list_filter)
@@ -1189,6 +1322,57 @@ class TenderUserAdmin(admin.ModelAdmin):
     def department_name(self, obj):
         return obj.department.name if obj.department else '-'
     department_name.short_description = 'Підрозділ'
+    department_name.admin_order_field = 'department__name'
+
+    def _readiness(self, obj):
+        try:
+            return obj.readiness
+        except UserReadiness.DoesNotExist:
+            return None
+
+    def readiness_completeness(self, obj):
+        """Заповненість документів (попередньо обчислена)"""
+        readiness = self._readiness(obj)
+        if readiness is None:
+            return '—'
+        color = '#52c41a' if readiness.completeness == 100 else '#faad14' if readiness.completeness >= 50 else '#ff4d4f'
+        return format_html(
+            '<span style="color: {}; font-weight: bold;">{}%</span>',
+            color, readiness.completeness
+        )
+    readiness_completeness.short_description = 'Готовність'
+    readiness_completeness.admin_order_field = 'readiness__completeness'
+
+    def readiness_missing(self, obj):
+        readiness = self._readiness(obj)
+        return readiness.missing_documents_count if readiness else '—'
+    readiness_missing.short_description = 'Бракує документів'
+    readiness_missing.admin_order_field = 'readiness__missing_documents_count'
+
+    def employees_count(self, obj):
+        return getattr(obj, 'employees_total', None)
+    employees_count.short_description = 'Співробітників'
+    employees_count.admin_order_field = 'employees_total'
+
+    def technics_count(self, obj):
+        return getattr(obj, 'technics_total', None)
+    technics_count.short_description = 'Техніки'
+    technics_count.admin_order_field = 'technics_total'
+
+    def permits_count(self, obj):
+        return getattr(obj, 'permits_total', None)
+    permits_count.short_description = 'Перепусток'
+    permits_count.admin_order_field = 'permits_total'
+
+    def expiry_status(self, obj):
+        """Терміни дії документів (прапорці з annotate)"""
+        if getattr(obj, 'has_expired', False):
+            return format_html('<span style="color: #ff4d4f;">❌ Є прострочені</span>')
+        if getattr(obj, 'expires_soon', False):
+            return format_html('<span style="color: #faad14;">⚠️ Закінчуються</span>')
+        return format_html('<span style="color: #52c41a;">✅</span>')
+    expiry_status.short_description = 'Терміни дії'
+    expiry_status.admin_order_field = 'has_expired'
     
     def status_colored(self, obj):
         """Кольоровий статус"""
@@ -1418,6 +1602,52 @@ class InstrumentTypeAdmin(admin.ModelAdmin):
         return len(obj.required_documents)
     documents_count.short_description = 'К-сть документів'
 
+@admin.register(DocumentFile)
+class DocumentFileAdmin(admin.ModelAdmin):
+    """Всі файли документів переможців (пошук по типу, терміну дії, хешу)"""
+    list_display = ['name', 'owner_type', 'document_type', 'user', 'expiry_date', 'size', 'file_link']
+    list_filter = ['owner_type', 'expiry_date']
+    search_fields = ['=digest', 'document_type', 'name', 'user__tender_number']
+    list_select_related = ['user']
+    date_hierarchy = 'expiry_date'
+    readonly_fields = [
+        'user', 'owner_type', 'owner_id', 'document_type', 'name', 'path',
+        'size', 'digest', 'expiry_date', 'created_at'
+    ]
+
+    def file_link(self, obj):
+        if obj.path:
+            return format_html('<a href="{}" target="_blank" style="color: #007cba; text-decoration: none;">📄 Відкрити</a>', obj.path)
+        return '-'
+    file_link.short_description = 'Файл'
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        if hasattr(request.user, 'department') and request.user.department:
+            return qs.filter(user__department=request.user.department)
+        return qs.none()
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(OutboxConsumer)
+class OutboxConsumerAdmin(admin.ModelAdmin):
+    """Зовнішні системи, які отримують зміни через relay_outbox"""
+    list_display = ['name', 'webhook_url', 'department', 'is_active', 'cursor', 'last_delivery_at', 'last_error']
+    list_filter = ['is_active']
+    readonly_fields = ['last_delivery_at', 'last_error']
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
 # Якщо потрібно - додати список перепусток в адмінку
 # @admin.register(Permit)
 # class PermitAdmin(admin.ModelAdmin):
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from users.models import DocumentFile
+from users.services.documents import fill_missing_digests
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Рахує SHA-256 файлів DocumentFile з порожнім digest (після міграції 0015 або втрачених хешувань)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        pending = DocumentFile.objects.filter(digest='').order_by('pk')
+        last_pk, updated = 0, 0
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            updated += fill_missing_digests(batch)
+            last_pk = batch[-1]
+        remaining = pending.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Хеш пораховано для {updated} рядків; без файлу на диску: {remaining}'
+        ))
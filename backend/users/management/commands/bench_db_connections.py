@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.db.utils import load_backend
+
+
+def _timings(iterations, request):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        request()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+class Command(BaseCommand):
+    help = (
+        "Порівнює затримку запиту до БД з новим з'єднанням на кожен запит "
+        "і з поточними налаштуваннями DATABASES (пул / CONN_MAX_AGE)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        alias, iterations = options['database'], options['iterations']
+        connection = connections[alias]
+
+        # Як було без пулу: CONN_MAX_AGE=0, з'єднання (з TLS) відкривається і закривається щоразу
+        settings_dict = {**connection.settings_dict, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}
+        settings_dict['OPTIONS'] = {k: v for k, v in settings_dict['OPTIONS'].items() if k != 'pool'}
+        backend = load_backend(settings_dict['ENGINE'])
+
+        def fresh_request():
+            direct = backend.DatabaseWrapper(settings_dict, alias=f'{alias}_bench')
+            try:
+                with direct.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            finally:
+                direct.close()
+
+        # Поточні налаштування: той самий цикл, що request_started/request_finished
+        def configured_request():
+            close_old_connections()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            close_old_connections()
+
+        configured_request()  # прогрів пулу
+        fresh = _timings(iterations, fresh_request)
+        configured = _timings(iterations, configured_request)
+
+        mode = 'pool' if 'pool' in connection.settings_dict['OPTIONS'] else (
+            f"CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}"
+        )
+        self.stdout.write(f"{connection.vendor} ({connection.settings_dict['HOST'] or connection.settings_dict['NAME']}), "
+                          f"{iterations} запитів")
+        for label, timings in (("нове з'єднання", fresh), (mode, configured)):
+            self.stdout.write(
+                f'  {label:<22} медіана {statistics.median(timings):7.2f} мс, '
+                f'p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} мс'
+            )
+        saved = statistics.median(fresh) - statistics.median(configured)
+        self.stdout.write(self.style.SUCCESS(f'Економія на запит: {saved:.2f} мс'))
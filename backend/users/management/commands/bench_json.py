@@ -0,0 +1,96 @@
+import io
+import statistics
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from utils.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+DOCUMENT_TYPES = ['Техпаспорт', 'Страховий поліс', 'Технічний огляд', 'Сертифікат', 'Договір']
+
+
+def _timings(repeat, run):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _technics_payload(count):
+    """Сторінка AdminTechnicListView: техніка з documents_info по 5 типах документів"""
+    created_at = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    host = 'https://tenderbug.example.com'
+    results = []
+    for index in range(count):
+        results.append({
+            'id': index,
+            'user': index // 10,
+            'user_company': f'ТОВ "Будмонтаж {index // 10}"',
+            'user_department': 'Підрозділ Київ',
+            'technic_type': 3,
+            'technic_type_name': 'Автокран',
+            'custom_type': '',
+            'display_name': 'Автокран',
+            'registration_number': f'АА{index:04d}ВВ',
+            'is_active': True,
+            # Дати, Decimal - через JSONEncoder DRF (default)
+            'created_at': created_at,
+            'load_capacity': Decimal('25.50'),
+            'documents_info': {
+                doc_type: [{
+                    'name': f'{doc_type} №{index}.pdf',
+                    'path': f'/media/tenders/tender_T-{index}/technics/{doc_type} №{index}.pdf',
+                    'url': f'{host}/media/tenders/tender_T-{index}/technics/{doc_type}%20%E2%84%96{index}.pdf',
+                    'size': 102400 + index,
+                    'uploaded_at': '2025-01-01T10:00:00',
+                }]
+                for doc_type in DOCUMENT_TYPES
+            },
+        })
+    return {'count': count, 'next': None, 'previous': None, 'results': results}
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює рендер і парсинг JSON відповіді адмін-списку: JSONRenderer/JSONParser DRF '
+        'і FastJSONRenderer/FastJSONParser (orjson). Синтетичні дані, БД не потрібна'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Рядків техніки у відповіді')
+        parser.add_argument('--repeat', type=int, default=7)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не встановлений - FastJSONRenderer працює як JSONRenderer')
+        rows, repeat = options['rows'], options['repeat']
+        data = _technics_payload(rows)
+
+        stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        body = stock_renderer.render(data)
+        if fast_renderer.render(data) != body:
+            raise CommandError('FastJSONRenderer дає інші байти, ніж JSONRenderer')
+        if FastJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(io.BytesIO(body)):
+            raise CommandError('FastJSONParser дає інший результат, ніж JSONParser')
+
+        cases = [
+            ('render', lambda: stock_renderer.render(data), lambda: fast_renderer.render(data)),
+            ('parse', lambda: JSONParser().parse(io.BytesIO(body)), lambda: FastJSONParser().parse(io.BytesIO(body))),
+        ]
+        self.stdout.write(f'{rows} рядків, {len(body) / 1024 / 1024:.1f} МБ JSON, {repeat} прогонів')
+        for label, stock, fast in cases:
+            stock_timings = _timings(repeat, stock)
+            fast_timings = _timings(repeat, fast)
+            self.stdout.write(label)
+            for name, timings in (('DRF (json)', stock_timings), ('orjson', fast_timings)):
+                self.stdout.write(
+                    f'  {name:<12} медіана {statistics.median(timings):8.2f} мс, мінімум {min(timings):8.2f} мс'
+                )
+            speedup = statistics.median(stock_timings) / statistics.median(fast_timings)
+            self.stdout.write(self.style.SUCCESS(f'  Прискорення: {speedup:.1f}x'))
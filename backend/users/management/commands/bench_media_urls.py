@@ -0,0 +1,124 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from users.models import UserEmployee
+from utils.media import MediaURLResolver
+
+DOCUMENT_TYPES = ['Техпаспорт', 'Страховий поліс', 'Технічний огляд', 'Сертифікат', 'Договір']
+
+
+def _timings(repeat, run):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _technic_documents(count, per_owner):
+    """documents техніки: {тип: [файли]}, кириличні імена як у реальних завантаженнях"""
+    owners = []
+    for owner in range(count // per_owner):
+        owners.append({
+            doc_type: [{
+                'name': f'{doc_type} №{owner}.pdf',
+                'path': f'/media/tenders/tender_T-{owner}/technics/{doc_type}/{doc_type} №{owner}.pdf',
+                'size': 1024 + owner,
+                'uploaded_at': '2025-01-01T10:00:00',
+            }]
+            for doc_type in DOCUMENT_TYPES[:per_owner]
+        })
+    return owners
+
+
+def _employees(count):
+    """Незбережені співробітники з FileField (URL будується без БД)"""
+    return [
+        UserEmployee(
+            name=f'Співробітник {index}',
+            photo=f'tenders/tender_T-{index}/employees/фото_{index}.jpg',
+            qualification_certificate=f'tenders/tender_T-{index}/employees/посвідчення_{index}.pdf',
+        )
+        for index in range(count)
+    ]
+
+
+# Як було до MediaURLResolver: build_absolute_uri на кожен файл
+
+def _groups_per_document(request, documents):
+    result = {}
+    for doc_type, files in documents.items():
+        result[doc_type] = []
+        for file_info in files:
+            file_data = file_info.copy()
+            if file_data['path'].startswith('/media/'):
+                file_data['url'] = request.build_absolute_uri(file_data['path'])
+            result[doc_type].append(file_data)
+    return result
+
+
+def _employee_per_document(request, employee):
+    return (
+        request.build_absolute_uri(employee.photo.url),
+        request.build_absolute_uri(employee.qualification_certificate.url),
+    )
+
+
+def _employee_resolver(resolver, employee):
+    return resolver.file_url(employee.photo), resolver.file_url(employee.qualification_certificate)
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює побудову абсолютних URL документів: build_absolute_uri на кожен файл '
+        'і MediaURLResolver (один на запит). Синтетичні дані, БД не потрібна'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=5000, help='Файлів у списку')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        count, repeat = options['documents'], options['repeat']
+        host = next((host for host in settings.ALLOWED_HOSTS if not host.startswith('.')), 'localhost')
+        request = RequestFactory().get('/api/auth/admin/technics/', HTTP_HOST=host)
+        technics = _technic_documents(count, per_owner=5)
+        employees = _employees(count // 2)
+
+        def technics_old():
+            return [_groups_per_document(request, documents) for documents in technics]
+
+        def technics_new():
+            # Новий резолвер на кожен прогін - як на кожен запит
+            resolver = MediaURLResolver(request)
+            return [resolver.document_groups(documents) for documents in technics]
+
+        def employees_old():
+            return [_employee_per_document(request, employee) for employee in employees]
+
+        def employees_new():
+            resolver = MediaURLResolver(request)
+            return [_employee_resolver(resolver, employee) for employee in employees]
+
+        cases = [
+            (f'documents_info техніки ({count} файлів)', technics_old, technics_new),
+            (f'FileField співробітників ({len(employees) * 2} файлів)', employees_old, employees_new),
+        ]
+        self.stdout.write(f'{repeat} прогонів, час на список')
+        for label, old, new in cases:
+            if old() != new():
+                raise CommandError(f'{label}: URL відрізняються')
+            old_timings = _timings(repeat, old)
+            new_timings = _timings(repeat, new)
+            self.stdout.write(label)
+            for name, timings in (('build_absolute_uri', old_timings), ('MediaURLResolver', new_timings)):
+                self.stdout.write(
+                    f'  {name:<20} медіана {statistics.median(timings):8.2f} мс, мінімум {min(timings):8.2f} мс'
+                )
+            speedup = statistics.median(old_timings) / statistics.median(new_timings)
+            self.stdout.write(self.style.SUCCESS(f'  Прискорення: {speedup:.1f}x'))
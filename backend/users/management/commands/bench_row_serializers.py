@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from users.models import User
+from users.views import (
+    AdminEmployeeListView, AdminInstrumentListView, AdminOrderListView, AdminPPEListView,
+    AdminSpecificationListView, AdminTechnicListView,
+)
+
+VIEWS = {
+    'orders': AdminOrderListView,
+    'technics': AdminTechnicListView,
+    'employees': AdminEmployeeListView,
+    'instruments': AdminInstrumentListView,
+    'ppe': AdminPPEListView,
+    'specifications': AdminSpecificationListView,
+}
+
+
+def _timings(repeat, run):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _as_items(data):
+    """Порівняння з порядком ключів"""
+    return [list(item.items()) for item in data]
+
+
+class Command(BaseCommand):
+    help = (
+        'Порівнює серіалізацію адмін-списків: ModelSerializer (many=True) і RowSerializer з .values(). '
+        'Запит до БД входить у час; дані - з поточної БД (напр. після seed_scale)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Рядків на список')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--only', choices=sorted(VIEWS), action='append', help='Тільки ці списки')
+
+    def handle(self, *args, **options):
+        limit, repeat = options['rows'], options['repeat']
+        host = next((host for host in settings.ALLOWED_HOSTS if not host.startswith('.')), 'localhost')
+        request = RequestFactory().get('/api/auth/admin/', HTTP_HOST=host)
+        # Суперадмін бачить усі рядки (get_queryset без фільтра підрозділу)
+        request.user = User(is_staff=True, is_superuser=True)
+
+        self.stdout.write(f'До {limit} рядків на список, {repeat} прогонів')
+        for name in options['only'] or VIEWS:
+            view = VIEWS[name](request=request, format_kwarg=None)
+            queryset = view.get_queryset()
+
+            def model_serializer():
+                return view.serializer_class(queryset[:limit], many=True, context={'request': request}).data
+
+            def row_serializer():
+                # Як RowListMixin.list: новий RowSerializer на запит
+                rows = view.row_serializer_class(request)
+                return rows.serialize(rows.values(queryset)[:limit])
+
+            expected = model_serializer()
+            if not expected:
+                raise CommandError(f'{name}: немає рядків - заповніть БД (python manage.py seed_scale)')
+            if _as_items(row_serializer()) != _as_items(expected):
+                raise CommandError(f'{name}: RowSerializer дає інший результат, ніж ModelSerializer')
+
+            model_timings = _timings(repeat, model_serializer)
+            row_timings = _timings(repeat, row_serializer)
+            self.stdout.write(f'{name} ({len(expected)} рядків)')
+            for label, timings in (('ModelSerializer', model_timings), ('RowSerializer', row_timings)):
+                self.stdout.write(
+                    f'  {label:<16} медіана {statistics.median(timings):8.2f} мс, мінімум {min(timings):8.2f} мс'
+                )
+            speedup = statistics.median(model_timings) / statistics.median(row_timings)
+            self.stdout.write(self.style.SUCCESS(f'  Прискорення: {speedup:.1f}x'))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from users.models import Permit, User, UserEmployee, UserInstrument, UserOrder, UserTechnic
+
+
+def hot_paths():
+    """(опис, queryset, індекс, який має бути в плані)"""
+    return [
+        ('Накази тендеру за типом', UserOrder.objects.filter(user_id=1, order_type='custom').order_by('-created_at'),
+         'order_user_type_created_idx'),
+        ('Співробітники тендеру', UserEmployee.objects.filter(user_id=1).order_by('-created_at'),
+         'employee_user_created_idx'),
+        ('Техніка тендеру', UserTechnic.objects.filter(user_id=1).order_by('-created_at'), 'technic_user_created_idx'),
+        ('Інструменти тендеру', UserInstrument.objects.filter(user_id=1).order_by('-created_at'),
+         'instrument_user_created_idx'),
+        ('Остання перепустка тендеру', Permit.objects.filter(user_id=1).order_by('-created_at')[:1],
+         'permit_user_created_idx'),
+        ('Накази (суперадмін)', UserOrder.objects.order_by('-created_at')[:50], 'order_created_idx'),
+        ('Співробітники (суперадмін)', UserEmployee.objects.order_by('-created_at')[:50], 'employee_created_idx'),
+        ('Техніка (суперадмін)', UserTechnic.objects.order_by('-created_at')[:50], 'technic_created_idx'),
+        ('Інструменти (суперадмін)', UserInstrument.objects.order_by('-created_at')[:50], 'instrument_created_idx'),
+        ('Тендери за статусом і підрозділом', User.objects.filter(is_staff=False, status='new', department_id=1),
+         'user_tender_status_dept_idx'),
+        ('Тендери підрозділу', User.objects.filter(is_staff=False, department_id=1).order_by('-id'),
+         'user_tender_dept_idx'),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Перевіряє через EXPLAIN, що гарячі запити списків використовують свої індекси'
+
+    def handle(self, *args, **options):
+        failed = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # На малих таблицях планувальник обирає seq scan; перевіряємо, що індекс придатний
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for label, queryset, index_name in hot_paths():
+                plan = queryset.explain()
+                if index_name in plan:
+                    self.stdout.write(f'OK    {label}: {index_name}')
+                else:
+                    failed.append(label)
+                    self.stdout.write(self.style.ERROR(f'FAIL  {label}: очікувався {index_name}'))
+                    self.stdout.write('      ' + plan.replace('\n', '\n      '))
+        if failed:
+            raise CommandError(f'Без очікуваного індексу: {len(failed)} запит(ів)')
+        self.stdout.write(self.style.SUCCESS('Всі гарячі запити використовують індекси'))
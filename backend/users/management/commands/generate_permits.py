@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from users.models import User, Permit
-from users.services.pdf_generator import PermitPDFGenerator
+from users.services import pdf
 
 class Command(BaseCommand):
     help = 'Генерує перепустки для користувача'
@@ -28,7 +28,6 @@ class Command(BaseCommand):
                 if old_count > 0:
                     self.stdout.write(f'Видалено {old_count} старих перепусток')
                 
-                generator = PermitPDFGenerator()
                 created_count = 0
                 
                 # Перепустки для працівників
@@ -39,7 +38,7 @@ class Command(BaseCommand):
                         permit_type='employee',
                         employee=employee
                     )
-                    generator.generate_permit(permit)
+                    pdf.generate_permit(permit)
                     permit.save()
                     created_count += 1
                     self.stdout.write(f'✓ {permit.permit_number} - {employee.name}')
@@ -52,7 +51,7 @@ class Command(BaseCommand):
                         permit_type='technic',
                         technic=technic
                     )
-                    generator.generate_permit(permit)
+                    pdf.generate_permit(permit)
                     permit.save()
                     created_count += 1
                     self.stdout.write(f'✓ {permit.permit_number} - {technic.display_name}')
@@ -64,4 +63,4 @@ class Command(BaseCommand):
         except User.DoesNotExist:
             self.stdout.write(
                 self.style.ERROR(f'Користувач з тендером {tender_number} не знайдений')
-            )
\ No newline at end of file
+            )
\ No newline at end of file
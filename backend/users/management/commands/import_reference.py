@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.services.reference_import import REFERENCES, ReferenceImportError, import_reference, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Імпортує довідник з вивантаження 1С (.csv / .json / .jsonl): нові, змінені, відсутні - деактивуються'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(REFERENCES), help='Довідник')
+        parser.add_argument('path', help='Файл вивантаження')
+        parser.add_argument('--keep-missing', action='store_true', help='Не деактивувати записи, відсутні у файлі')
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати зміни')
+
+    def handle(self, *args, **options):
+        try:
+            result = import_reference(
+                options['kind'], read_rows(options['path']),
+                deactivate_missing=not options['keep_missing'], dry_run=options['dry_run'],
+            )
+        except (OSError, ReferenceImportError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stderr.write(f"Рядок {error['row']}: {error['error']}")
+        summary = (
+            f"нових {result['created']}, змінених {result['updated']}, "
+            f"деактивовано {result['deactivated']}, без змін {result['unchanged']}"
+        )
+        if result['errors']:
+            raise CommandError(f"Імпорт скасовано, помилок: {len(result['errors'])} ({summary})")
+        prefix = 'Перевірка (без змін у БД): ' if options['dry_run'] else 'Імпортовано: '
+        self.stdout.write(self.style.SUCCESS(prefix + summary))
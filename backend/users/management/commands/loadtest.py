@@ -0,0 +1,295 @@
+import glob
+import http.client
+import io
+import json
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils.crypto import get_random_string
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from users.models import Department, TechnicType, User, UserEmployee, UserTechnic
+
+LOADTEST_DEPARTMENT = 'LOADTEST'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank перцентиль відсортованого списку"""
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[index]
+
+
+def _photo_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (300, 400), (120, 140, 160)).save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+class _Session:
+    """Keep-alive з'єднання одного клієнта (як браузер) + токен / cookies"""
+
+    def __init__(self, base_url, timeout):
+        url = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(url.hostname, url.port, timeout=timeout)
+        self.headers = {}
+
+    def request(self, method, path, body=None, headers=None):
+        headers = {**self.headers, **(headers or {})}
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Сервер закрив keep-alive з'єднання між запитами - одна повторна спроба
+                self.connection.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        self.connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Навантажувальний тест кабінету переможця проти запущеного сервера: створює N тендерів '
+        '(співробітники з фото, техніка з документами), кожен проходить логін -> досьє -> '
+        'завантаження документів -> схвалення адміном -> генерація перепусток. '
+        'Звіт: пропускна здатність і перцентилі затримки по endpoint. '
+        'Сервер має працювати з тією ж БД і MEDIA_ROOT (python manage.py runserver / gunicorn). '
+        'SQLite пропускає один запис за раз: паралельна генерація перепусток дасть "database is locked", '
+        'реальні цифри - на Postgres.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--tenders', type=int, default=20, help='Кількість тендерів (віртуальних переможців)')
+        parser.add_argument('--concurrency', type=int, default=10, help='Одночасних клієнтів')
+        parser.add_argument('--employees', type=int, default=5, help='Співробітників на тендер')
+        parser.add_argument('--technics', type=int, default=2, help='Одиниць техніки на тендер')
+        parser.add_argument('--uploads', type=int, default=3, help='Завантажень документів на тендер')
+        parser.add_argument('--upload-kb', type=int, default=256, help='Розмір документа, КБ')
+        parser.add_argument('--no-permits', action='store_true', help='Без генерації перепусток')
+        parser.add_argument('--timeout', type=float, default=60)
+        parser.add_argument('--keep', action='store_true', help='Не видаляти створені дані')
+
+    def handle(self, *args, **options):
+        if options['tenders'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--tenders і --concurrency мають бути > 0')
+        self.options = options
+        self.base_url = options['base_url'].rstrip('/')
+        self.run_id = uuid.uuid4().hex[:6].upper()
+        self.password = get_random_string(16)
+        self.results = []  # (endpoint, статус, мс); list.append потокобезпечний
+
+        self._check_server()
+        try:
+            # Всередині try: збій посеред створення теж прибирається (_cleanup - по префіксу run_id)
+            started = time.perf_counter()
+            users = self._seed()
+            self.stdout.write(
+                f'Створено {len(users)} тендерів за {time.perf_counter() - started:.1f} с (LT{self.run_id}-*)'
+            )
+            self._prepare_admin()
+            self.upload = os.urandom(options['upload_kb'] * 1024)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                list(executor.map(self._scenario, users))
+            self._report(time.perf_counter() - started)
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    # ===================================================================
+    # Підготовка
+
+    def _check_server(self):
+        session = _Session(self.base_url, timeout=5)
+        try:
+            session.request('GET', '/api/auth/departments/')
+        except OSError as exc:
+            raise CommandError(f'Сервер {self.base_url} недоступний: {exc}')
+        finally:
+            session.close()
+
+    def _seed(self):
+        department, _ = Department.objects.get_or_create(
+            code=LOADTEST_DEPARTMENT, defaults={'name': 'Навантажувальний тест'}
+        )
+        technic_types = list(TechnicType.objects.all()[:10])
+        photo = _photo_bytes()
+        expiry = (date.today() + timedelta(days=365)).isoformat()
+        users = []
+        for index in range(self.options['tenders']):
+            tender_number = f'LT{self.run_id}-{index:05d}'
+            user = User(
+                username=tender_number.lower(), email=f'{tender_number.lower()}@loadtest.local',
+                tender_number=tender_number, company_name=f'ТОВ Навантаження {index}',
+                edrpou=f'{index:08d}', department=department,
+                status='in_progress', is_activated=True,
+            )
+            user.set_password(self.password)
+            user.save()
+
+            employees = []
+            for number in range(self.options['employees']):
+                employee = UserEmployee(
+                    user=user, name=f'Працівник {number} {tender_number}', position='Монтажник',
+                    medical_exam_date=date.today(),
+                )
+                employee.photo.save(f'photo_{number}.jpg', ContentFile(photo), save=False)
+                employees.append(employee)
+            UserEmployee.objects.bulk_create(employees)
+
+            UserTechnic.objects.bulk_create([
+                UserTechnic(
+                    user=user,
+                    technic_type=technic_types[number % len(technic_types)] if technic_types else None,
+                    custom_type='' if technic_types else 'Автокран',
+                    registration_number=f'BC{index:04d}{number:02d}',
+                    documents={'Техпаспорт': [{
+                        'name': f'tech_passport_{number}.pdf',
+                        'path': f'/media/tenders/tender_{tender_number}/technics/tech_passport_{number}.pdf',
+                        'expiry_date': expiry,
+                    }]},
+                )
+                for number in range(self.options['technics'])
+            ])
+            users.append(user)
+        return users
+
+    def _prepare_admin(self):
+        """Суперадмін: токен для API схвалення, сесія + CSRF для генерації перепусток в адмінці"""
+        self.admin = User(
+            username=f'loadtest-admin-{self.run_id.lower()}', email=f'admin-{self.run_id.lower()}@loadtest.local',
+            tender_number=f'LT{self.run_id}-ADMIN', is_staff=True, is_superuser=True,
+        )
+        self.admin._from_admin = True
+        self.admin.set_unusable_password()
+        self.admin.save()
+        self.admin_token = Token.objects.create(user=self.admin).key
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(self.admin.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = self.admin.get_session_auth_hash()
+        session.create()
+        csrf_token = get_random_string(32)
+        self.admin_headers = {
+            'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf_token}',
+            'X-CSRFToken': csrf_token,
+            'Referer': f'{self.base_url}/admin/',
+        }
+
+    # ===================================================================
+    # Сценарій одного переможця
+
+    def _call(self, session, endpoint, method, path, body=None, headers=None, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            status, content = session.request(method, path, body=body, headers=headers)
+        except OSError:
+            status, content = 0, b''
+        self.results.append((endpoint, status, (time.perf_counter() - started) * 1000))
+        if status not in expect:
+            return None
+        return json.loads(content) if content else {}
+
+    def _scenario(self, user):
+        client = _Session(self.base_url, self.options['timeout'])
+        admin = _Session(self.base_url, self.options['timeout'])
+        try:
+            login = self._call(
+                client, 'login', 'POST', '/api/auth/login/',
+                body=json.dumps({'username': user.tender_number, 'password': self.password}),
+                headers={'Content-Type': 'application/json'},
+            )
+            if not login:
+                return
+            client.headers['Authorization'] = f"Token {login['token']}"
+
+            self._call(client, 'profile', 'GET', '/api/auth/profile/')
+            self._call(client, 'employees', 'GET', '/api/auth/user-employees/')
+            self._call(client, 'technics', 'GET', '/api/auth/user-technics/')
+            self._call(client, 'specification', 'GET', '/api/auth/user-specification/')
+
+            for number in range(self.options['uploads']):
+                body, content_type = self._multipart(f'document_{number}.pdf', 'employees')
+                self._call(client, 'upload-document', 'POST', '/api/auth/upload-document/',
+                           body=body, headers={'Content-Type': content_type})
+
+            admin.headers['Authorization'] = f'Token {self.admin_token}'
+            if self._call(admin, 'approve', 'POST', f'/api/auth/users/{user.pk}/approve/') is None:
+                return
+            if self.options['no_permits']:
+                return
+            # Статус "Підтверджений" адмін ставить формою користувача; тут - напряму
+            User.objects.filter(pk=user.pk).update(status='accepted')
+            admin.headers = self.admin_headers
+            self._call(admin, 'generate-permits', 'POST',
+                       f'/admin/users/tenderuser/{user.pk}/generate-permits-ajax/')
+        finally:
+            client.close()
+            admin.close()
+            close_old_connections()
+
+    def _multipart(self, filename, document_type):
+        boundary = uuid.uuid4().hex
+        body = b''.join([
+            f'--{boundary}\r\nContent-Disposition: form-data; name="document_type"\r\n\r\n{document_type}\r\n'.encode(),
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'.encode(),
+            self.upload,
+            f'\r\n--{boundary}--\r\n'.encode(),
+        ])
+        return body, f'multipart/form-data; boundary={boundary}'
+
+    # ===================================================================
+    # Звіт і прибирання
+
+    def _report(self, elapsed):
+        by_endpoint = {}
+        for endpoint, status, duration in self.results:
+            by_endpoint.setdefault(endpoint, []).append((status, duration))
+
+        header = f"{'endpoint':<18}{'n':>6}{'err':>6}{'rps':>8}" + ''.join(f'{f"p{p}":>9}' for p in PERCENTILES) + f"{'max':>9}"
+        self.stdout.write(f'\n{self.options["tenders"]} тендерів, {self.options["concurrency"]} одночасно, '
+                          f'{elapsed:.1f} с; затримка, мс')
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for endpoint, rows in by_endpoint.items():
+            durations = sorted(duration for _, duration in rows)
+            errors = sum(1 for status, _ in rows if not 200 <= status < 300)
+            self.stdout.write(
+                f'{endpoint:<18}{len(rows):>6}{errors:>6}{len(rows) / elapsed:>8.1f}'
+                + ''.join(f'{_percentile(durations, p):>9.0f}' for p in PERCENTILES)
+                + f'{durations[-1]:>9.0f}'
+            )
+        total_errors = sum(1 for _, status, _ in self.results if not 200 <= status < 300)
+        self.stdout.write('-' * len(header))
+        self.stdout.write(f'Всього {len(self.results)} запитів, {len(self.results) / elapsed:.1f} rps, помилок: {total_errors}')
+        failed = sorted({status for _, status, _ in self.results if not 200 <= status < 300})
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Статуси помилок: {failed} (0 - немає відповіді)'))
+
+    def _cleanup(self):
+        """Все з префіксом цього запуску: тендери, адмін і їх папки в MEDIA_ROOT"""
+        prefix = f'LT{self.run_id}-'
+        User.objects.filter(tender_number__startswith=prefix).delete()
+        for folder in glob.glob(os.path.join(glob.escape(str(settings.MEDIA_ROOT)), 'tenders', f'tender_{prefix}*')):
+            shutil.rmtree(folder, ignore_errors=True)
+        self.stdout.write(f'Дані {prefix}* видалено')
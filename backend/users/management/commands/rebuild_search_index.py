@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.services import search
+
+
+class Command(BaseCommand):
+    help = 'Повністю перебудовує пошуковий індекс (SearchEntry)'
+
+    def handle(self, *args, **options):
+        created = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Пошуковий індекс перебудовано: {created} записів'))
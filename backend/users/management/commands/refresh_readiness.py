@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.services.readiness import refresh_readiness
+
+
+class Command(BaseCommand):
+    help = 'Перераховує підсумок готовності (кількість прострочених змінюється з часом - запускати щодня)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', help='ID користувача (можна кілька)')
+
+    def handle(self, *args, **options):
+        user_ids = options['user'] or list(User.objects.filter(is_staff=False).values_list('pk', flat=True))
+        refresh_readiness(user_ids)
+        self.stdout.write(self.style.SUCCESS(f'Готовність перераховано для {len(user_ids)} користувачів'))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import OutboxConsumer
+from users.services import outbox
+
+
+class Command(BaseCommand):
+    help = 'Доставляє нові події outbox на webhook активних споживачів (OutboxConsumer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', action='append', help='Назва споживача (можна кілька); за замовчуванням всі активні')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Працювати безперервно')
+        parser.add_argument('--interval', type=float, default=5, help='Пауза між проходами в режимі --loop, с')
+        parser.add_argument('--prune', action='store_true', help=f'Видалити події, старші за {outbox.RETENTION_DAYS} днів')
+
+    def handle(self, *args, **options):
+        consumers = OutboxConsumer.objects.filter(is_active=True)
+        if options['consumer']:
+            consumers = consumers.filter(name__in=options['consumer'])
+            if not consumers.exists():
+                raise CommandError('Активних споживачів з такими назвами немає')
+
+        if options['prune']:
+            self.stdout.write(f'Видалено старих подій: {outbox.prune()}')
+
+        while True:
+            for consumer in consumers:
+                try:
+                    delivered = outbox.relay(consumer, batch_size=options['batch_size'])
+                except OSError as exc:
+                    self.stderr.write(f'{consumer.name}: помилка доставки: {exc}')
+                    continue
+                if delivered:
+                    self.stdout.write(f'{consumer.name}: доставлено {delivered}, курсор {consumer.cursor}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
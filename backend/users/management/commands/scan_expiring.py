@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import User
+from users.services import expiry
+
+
+class Command(BaseCommand):
+    help = 'Знаходить документи з терміном дії що закінчується і формує дайджести по тендерах та підрозділах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=expiry.EXPIRY_WARNING_DAYS,
+                            help=f'Горизонт у днях (за замовчуванням {expiry.EXPIRY_WARNING_DAYS})')
+        parser.add_argument('--overdue-days', type=int, default=0,
+                            help='Також включити документи що прострочені не більше N днів')
+        parser.add_argument('--send', action='store_true', help='Надіслати дайджести на email')
+        parser.add_argument('--rebuild', action='store_true', help='Повністю перебудувати індекс перед пошуком')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            created = expiry.rebuild_index()
+            self.stdout.write(f'Індекс перебудовано: {created} записів')
+
+        today = timezone.localdate()
+        start = today - timedelta(days=options['overdue_days'])
+        end = today + timedelta(days=options['days'])
+
+        by_tender, by_department = expiry.build_digests(expiry.expiring_records(start, end))
+        total = sum(len(t['items']) for t in by_tender.values())
+
+        if not total:
+            self.stdout.write(self.style.SUCCESS(f'Немає документів що закінчуються до {end:%d.%m.%Y}'))
+            return
+
+        messages = []
+        for tender in by_tender.values():
+            user = tender['user']
+            body = self._tender_digest(user, tender['items'], today)
+            self.stdout.write(body + '\n')
+            if user.email:
+                messages.append((
+                    f'Терміни дії документів - тендер {user.tender_number}',
+                    body, settings.DEFAULT_FROM_EMAIL, [user.email]
+                ))
+
+        admin_emails = {}
+        admins = User.objects.filter(
+            is_staff=True, is_active=True, department_id__in=[d for d in by_department if d]
+        ).values_list('department_id', 'email')
+        for department_id, email in admins:
+            if email:
+                admin_emails.setdefault(department_id, []).append(email)
+
+        for department_id, digest in by_department.items():
+            body = self._department_digest(digest, today)
+            self.stdout.write(body + '\n')
+            recipients = admin_emails.get(department_id)
+            if recipients:
+                name = digest['department'].name if digest['department'] else 'Без підрозділу'
+                messages.append((
+                    f'Терміни дії документів - {name}',
+                    body, settings.DEFAULT_FROM_EMAIL, recipients
+                ))
+
+        if options['send'] and messages:
+            sent = send_mass_mail(messages, fail_silently=False)
+            self.stdout.write(f'Надіслано листів: {sent}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Знайдено {total} документів у {len(by_tender)} тендерах, {len(by_department)} підрозділах'
+        ))
+
+    def _line(self, record, today):
+        status = 'ПРОСТРОЧЕНО' if record.expiry_date < today else f'залишилось {(record.expiry_date - today).days} дн.'
+        return f'  - {record.title} / {record.kind}: до {record.expiry_date:%d.%m.%Y} ({status})'
+
+    def _tender_digest(self, user, items, today):
+        lines = [f'Тендер {user.tender_number} - {user.company_name or user.email}']
+        lines += [self._line(record, today) for record in items]
+        return '\n'.join(lines)
+
+    def _department_digest(self, digest, today):
+        name = digest['department'].name if digest['department'] else 'Без підрозділу'
+        lines = [f'Підрозділ: {name}']
+        for items in digest['tenders'].values():
+            user = items[0].user
+            lines.append(f' Тендер {user.tender_number} - {user.company_name or user.email}')
+            lines += [self._line(record, today) for record in items]
+        return '\n'.join(lines)
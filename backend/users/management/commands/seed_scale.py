@@ -0,0 +1,263 @@
+import io
+import os
+import random
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from users.models import Department, Permit, TechnicType, User, UserEmployee, UserOrder, UserTechnic
+from users.services import expiry, readiness, search
+from users.services.documents import bulk_create_document_files, owner_type_for
+
+PHOTO_VARIANTS = 32
+FIRST_NAMES = ['Андрій', 'Богдан', 'Василь', 'Дмитро', 'Іван', 'Максим', 'Олег', 'Петро', 'Роман', 'Тарас',
+               'Олена', 'Ірина', 'Наталія', 'Оксана', 'Юлія']
+LAST_NAMES = ['Бондаренко', 'Коваленко', 'Мельник', 'Шевченко', 'Ткаченко', 'Кравченко', 'Олійник',
+              'Гончаренко', 'Савченко', 'Руденко', 'Лисенко', 'Марченко', 'Поліщук', 'Левченко']
+POSITIONS = ['Монтажник', 'Електрозварник', 'Стропальник', 'Машиніст крана', 'Електромонтер', 'Виконроб']
+TECHNIC_DOCUMENTS = ['Техпаспорт', 'Страховий поліс', 'Технічний огляд']
+ORDER_TYPES = [value for value, _ in UserOrder.ORDER_TYPES if value != 'custom']
+
+
+def _photo_variants():
+    """Кілька різних JPEG (колір/ініціали) - копії розкладаються по співробітниках"""
+    variants = []
+    for index in range(PHOTO_VARIANTS):
+        image = Image.new('RGB', (300, 400), (60 + index * 5 % 180, 90 + index * 11 % 150, 120 + index * 7 % 120))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((90, 60, 210, 200), fill=(230, 200, 170))
+        draw.rectangle((60, 220, 240, 400), fill=(40, 60, 90))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=80)
+        variants.append(buffer.getvalue())
+    return variants
+
+
+def _permit_template():
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.drawString(72, 760, 'Synthetic permit (seed_scale)')
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _write_files(files):
+    """[(відносний шлях у MEDIA_ROOT, вміст)] - виконується в пулі потоків"""
+    for relative_path, content in files:
+        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as file:
+            file.write(content)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерує синтетичні дані для навантажувального тестування: підрозділи, переможці тендерів, '
+        'співробітники з фото, техніка з документами, накази, перепустки. '
+        'Рядки вставляються bulk_create пакетами, файли пишуться паралельно; DocumentFile, терміни дії, '
+        'готовність і пошук будуються як при масовому імпорті, але без подій outbox. '
+        'Тендери мають номери <prefix>-<run>-NNNNNNN; --clear видаляє все з цим prefix через ORM '
+        '(з сигналами, повільно) - великий набір швидше видалити разом з БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=10)
+        parser.add_argument('--users', type=int, default=1000, help='Переможців тендерів')
+        parser.add_argument('--employees', type=int, default=20, help='Співробітників на тендер')
+        parser.add_argument('--technics', type=int, default=5, help='Одиниць техніки на тендер')
+        parser.add_argument('--orders', type=int, default=3, help='Наказів на тендер')
+        parser.add_argument('--accepted-share', type=float, default=0.3,
+                            help='Частка тендерів у статусі "Підтверджений" - для них створюються перепустки')
+        parser.add_argument('--chunk', type=int, default=500, help='Тендерів на транзакцію')
+        parser.add_argument('--batch-size', type=int, default=2000, help='batch_size для bulk_create')
+        parser.add_argument('--workers', type=int, default=min(32, (os.cpu_count() or 1) * 4),
+                            help='Потоків для запису файлів')
+        parser.add_argument('--no-files', action='store_true', help='Лише рядки в БД, без фото і PDF на диску')
+        parser.add_argument('--skip-derived', action='store_true',
+                            help='Без DocumentFile, термінів дії, готовності та пошукового індексу')
+        parser.add_argument('--prefix', default='SCALE')
+        parser.add_argument('--seed', type=int, default=None, help='Seed генератора (відтворюваний набір)')
+        parser.add_argument('--clear', action='store_true', help='Видалити раніше згенеровані дані з цим prefix')
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['clear']:
+            self._clear(options['prefix'])
+            return
+        if options['users'] < 1 or options['departments'] < 1:
+            raise CommandError('--users і --departments мають бути > 0')
+
+        self.random = random.Random(options['seed'])
+        self.run_id = uuid.uuid4().hex[:4].upper()
+        self.password = make_password('seed-scale')  # один хеш на всіх: PBKDF2 на кожного - хвилини
+        self.photos = _photo_variants()
+        self.permit_pdf = _permit_template()
+        self.technic_types = list(TechnicType.objects.all())
+        self.today = date.today()
+
+        started = time.perf_counter()
+        departments = self._departments()
+        total_rows, user_ids, pending = len(departments), [], []
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for start in range(0, options['users'], options['chunk']):
+                numbers = range(start, min(start + options['chunk'], options['users']))
+                with transaction.atomic():
+                    rows, users, files = self._chunk(numbers, departments)
+                total_rows += rows
+                user_ids.extend(user.pk for user in users)
+                # Файли цього пакета пишуться, поки вставляється наступний; пам'ять - не більше двох пакетів
+                for future in pending:
+                    future.result()
+                pending = [executor.submit(_write_files, user_files) for user_files in files]
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{numbers.stop}/{options["users"]} тендерів, {total_rows} рядків, '
+                    f'{total_rows / elapsed:.0f} рядків/с'
+                )
+            for future in pending:
+                future.result()
+
+        if not options['skip_derived']:
+            derived_started = time.perf_counter()
+            readiness.refresh_readiness(user_ids)
+            indexed = search.rebuild_index()
+            self.stdout.write(
+                f'Готовність і пошуковий індекс ({indexed} записів): {time.perf_counter() - derived_started:.1f} с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Створено {total_rows} рядків за {time.perf_counter() - started:.1f} с '
+            f'(тендери {options["prefix"]}-{self.run_id}-*, пароль seed-scale)'
+        ))
+
+    # ===================================================================
+    # Генерація
+
+    def _departments(self):
+        prefix = f'{self.options["prefix"]}-{self.run_id}'
+        return Department.objects.bulk_create([
+            Department(name=f'Підрозділ {prefix} №{number + 1}', code=f'{prefix}-D{number:03d}')
+            for number in range(self.options['departments'])
+        ])
+
+    def _person(self):
+        return f'{self.random.choice(LAST_NAMES)} {self.random.choice(FIRST_NAMES)}'
+
+    def _date(self, back_days, forward_days):
+        return self.today + timedelta(days=self.random.randint(-back_days, forward_days))
+
+    def _chunk(self, numbers, departments):
+        """Один пакет тендерів з усіма залежними рядками; повертає (рядків, users, файли по тендерах)"""
+        options, batch_size = self.options, self.options['batch_size']
+        users = []
+        for number in numbers:
+            tender_number = f'{options["prefix"]}-{self.run_id}-{number:07d}'
+            accepted = self.random.random() < options['accepted_share']
+            users.append(User(
+                username=tender_number.lower(), email=f'{tender_number.lower()}@seed.local',
+                password=self.password, tender_number=tender_number,
+                company_name=f'ТОВ "{self.random.choice(LAST_NAMES)} Буд {number}"',
+                edrpou=f'{self.random.randint(0, 99999999):08d}', director_name=self._person(),
+                contact_person=self._person(), phone=f'+38067{self.random.randint(0, 9999999):07d}',
+                department=self.random.choice(departments),
+                status='accepted' if accepted else self.random.choice(['new', 'in_progress', 'in_progress']),
+                is_activated=True,
+                synced_to_1c=True,
+            ))
+        User.objects.bulk_create(users, batch_size=batch_size)
+        # Синтетичні тендери не мають потрапити в обмін з 1С: черга (SYNC_1C_PENDING) - це
+        # last_sync_at порожній або старший за updated_at; update() не чіпає auto_now updated_at
+        User.objects.filter(pk__in=[user.pk for user in users]).update(last_sync_at=F('updated_at'))
+
+        employees, technics, orders, files = [], [], [], {}
+        for user in users:
+            folder = f'tenders/tender_{user.tender_number}'
+            user_files = files.setdefault(user.pk, [])
+            for number in range(options['employees']):
+                photo = f'{folder}/employees/photos/photo_{number}.jpg'
+                user_files.append((photo, self.photos[self.random.randrange(PHOTO_VARIANTS)]))
+                employees.append(UserEmployee(
+                    user=user, name=f'{self._person()} {number}', photo=photo,
+                    position=self.random.choice(POSITIONS), organization_name='Медичний центр',
+                    medical_exam_date=self._date(400, 0), qualification_expiry_date=self._date(60, 700),
+                ))
+            for number in range(options['technics']):
+                technic_type = self.random.choice(self.technic_types) if self.technic_types else None
+                technics.append(UserTechnic(
+                    user=user, technic_type=technic_type, custom_type='' if technic_type else 'Автокран',
+                    registration_number=f'BC{self.random.randint(0, 9999):04d}{chr(65 + number % 26)}X',
+                    documents={
+                        doc_type: [{
+                            'name': f'{doc_type} {number}.pdf',
+                            'path': f'/media/{folder}/technics/{doc_type}_{number}.pdf',
+                            'expiry_date': self._date(90, 700).isoformat(),
+                        }]
+                        for doc_type in TECHNIC_DOCUMENTS
+                    },
+                ))
+            for number in range(options['orders']):
+                order_type = ORDER_TYPES[number % len(ORDER_TYPES)]
+                orders.append(UserOrder(user=user, order_type=order_type, documents=[{
+                    'name': f'{order_type}_{number}.pdf', 'path': f'/media/{folder}/orders/{order_type}_{number}.pdf',
+                }]))
+        UserEmployee.objects.bulk_create(employees, batch_size=batch_size)
+        UserTechnic.objects.bulk_create(technics, batch_size=batch_size)
+        UserOrder.objects.bulk_create(orders, batch_size=batch_size)
+
+        permits, counters = [], {}
+        accepted = {user.pk: user for user in users if user.status == 'accepted'}
+        for permit_type, assets in (('employee', employees), ('technic', technics)):
+            for asset in assets:
+                user = accepted.get(asset.user_id)
+                if user is None:
+                    continue
+                counters[user.pk] = counters.get(user.pk, 0) + 1
+                permit_number = f'{user.tender_number}-{counters[user.pk]}'
+                pdf_path = f'tenders/tender_{user.tender_number}/permits/permit_{permit_number}.pdf'
+                files[user.pk].append((pdf_path, self.permit_pdf))
+                permits.append(Permit(
+                    user=user, permit_number=permit_number, permit_type=permit_type, pdf_file=pdf_path,
+                    **{permit_type: asset},
+                ))
+        Permit.objects.bulk_create(permits, batch_size=batch_size)
+        if not options['skip_derived']:
+            self._derived(employees, technics, orders)
+
+        rows = len(users) + len(employees) + len(technics) + len(orders) + len(permits)
+        return rows, users, [] if options['no_files'] else list(files.values())
+
+    def _derived(self, employees, technics, orders):
+        """Те, що при масовому імпорті роблять обробники bulk_created, крім outbox"""
+        bulk_create_document_files(technics + orders)
+        expiry.index_employees(employees)
+        for owners in (technics, orders):
+            if owners:
+                expiry.index_document_owners(owners, owner_type_for(owners[0]))
+
+    # ===================================================================
+    # Видалення
+
+    def _clear(self, prefix):
+        started = time.perf_counter()
+        user_ids = list(User.objects.filter(tender_number__startswith=f'{prefix}-').values_list('pk', flat=True))
+        for start in range(0, len(user_ids), self.options['chunk']):
+            batch = user_ids[start:start + self.options['chunk']]
+            tender_numbers = list(User.objects.filter(pk__in=batch).values_list('tender_number', flat=True))
+            with transaction.atomic():
+                User.objects.filter(pk__in=batch).delete()
+            for tender_number in tender_numbers:
+                shutil.rmtree(os.path.join(settings.MEDIA_ROOT, 'tenders', f'tender_{tender_number}'), ignore_errors=True)
+        Department.objects.filter(code__startswith=f'{prefix}-').delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Видалено {len(user_ids)} тендерів з prefix {prefix} і їх підрозділи за {time.perf_counter() - started:.1f} с'
+        ))
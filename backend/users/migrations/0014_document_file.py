@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_rename_qualification_issue_to_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_type', models.CharField(choices=[('order', 'Наказ'), ('technic', 'Техніка'), ('instrument', 'Інструмент'), ('ppe', 'ЗІЗ')], max_length=20, verbose_name='Тип власника')),
+                ('owner_id', models.PositiveBigIntegerField(verbose_name='ID власника')),
+                ('document_type', models.CharField(blank=True, max_length=500, verbose_name='Тип документу')),
+                ('name', models.CharField(blank=True, max_length=500, verbose_name='Назва файлу')),
+                ('path', models.CharField(max_length=1000, verbose_name='Шлях')),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Розмір')),
+                ('digest', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('expiry_date', models.DateField(blank=True, null=True, verbose_name='Термін дії')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_files', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Файл документа',
+                'verbose_name_plural': 'Файли документів',
+                'ordering': ['owner_type', 'owner_id', 'id'],
+                'indexes': [models.Index(fields=['owner_type', 'owner_id'], name='docfile_owner_idx'), models.Index(fields=['user', 'owner_type'], name='docfile_user_owner_idx'), models.Index(fields=['document_type'], name='docfile_doc_type_idx'), models.Index(fields=['expiry_date'], name='docfile_expiry_idx'), models.Index(fields=['digest'], name='docfile_digest_idx'), models.Index(fields=['path'], name='docfile_path_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Перенесення JSON документів у DocumentFile
+# Логіка заморожена тут (історичні моделі, без імпорту users.services), файли не хешуються:
+# digest заповнює команда backfill_document_digests після деплою.
+
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+OWNER_MODELS = {
+    'order': 'UserOrder',
+    'technic': 'UserTechnic',
+    'instrument': 'UserInstrument',
+    'ppe': 'UserPPE',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def normalize_media_path(path):
+    if not path or not isinstance(path, str):
+        return ''
+    media_url = settings.MEDIA_URL
+    if not path.startswith(media_url) and media_url in path:
+        return path[path.index(media_url):]
+    return path
+
+
+def parse_expiry_date(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_size(value):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return None
+    return size if size >= 0 else None
+
+
+def iter_document_entries(documents):
+    if isinstance(documents, dict):
+        for doc_type, files in documents.items():
+            if isinstance(files, list):
+                for file_info in files:
+                    if isinstance(file_info, dict):
+                        yield str(doc_type), file_info
+    elif isinstance(documents, list):
+        for file_info in documents:
+            if isinstance(file_info, dict):
+                yield file_info.get('document_type') or '', file_info
+
+
+def document_rows(owner_type, owner_id, user_id, documents):
+    rows = []
+    for doc_type, file_info in iter_document_entries(documents):
+        path = normalize_media_path(file_info.get('path') or file_info.get('url') or '')
+        if not path:
+            continue
+        rows.append({
+            'user_id': user_id,
+            'owner_type': owner_type,
+            'owner_id': owner_id,
+            'document_type': doc_type[:500],
+            'name': (file_info.get('name') or file_info.get('original_name') or file_info.get('filename') or '')[:500],
+            'path': path[:1000],
+            'size': parse_size(file_info.get('size')),
+            'expiry_date': parse_expiry_date(file_info.get('expiry_date')),
+        })
+    return rows
+
+
+def populate_document_files(apps, schema_editor):
+    DocumentFile = apps.get_model('users', 'DocumentFile')
+    db_alias = schema_editor.connection.alias
+
+    for owner_type, model_name in OWNER_MODELS.items():
+        model = apps.get_model('users', model_name)
+        batch = []
+        owners = model.objects.using(db_alias).values_list('pk', 'user_id', 'documents')
+        for owner_id, user_id, documents in owners.iterator(chunk_size=BATCH_SIZE):
+            for row in document_rows(owner_type, owner_id, user_id, documents):
+                batch.append(DocumentFile(**row))
+            if len(batch) >= BATCH_SIZE:
+                DocumentFile.objects.using(db_alias).bulk_create(batch)
+                batch = []
+        if batch:
+            DocumentFile.objects.using(db_alias).bulk_create(batch)
+
+
+def clear_document_files(apps, schema_editor):
+    DocumentFile = apps.get_model('users', 'DocumentFile')
+    DocumentFile.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_document_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_document_files, clear_document_files),
+    ]
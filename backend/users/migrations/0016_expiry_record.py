@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_populate_document_files'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiryRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(choices=[('work', 'Дозвіл на роботи'), ('employee', 'Співробітник'), ('order', 'Наказ'), ('technic', 'Техніка'), ('instrument', 'Інструмент'), ('ppe', 'ЗІЗ')], max_length=20, verbose_name='Джерело')),
+                ('source_id', models.PositiveBigIntegerField(verbose_name='ID джерела')),
+                ('kind', models.CharField(max_length=500, verbose_name='Документ')),
+                ('title', models.CharField(blank=True, max_length=500, verbose_name='Назва')),
+                ('expiry_date', models.DateField(verbose_name='Термін дії')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.department', verbose_name='Підрозділ')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiry_records', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Термін дії',
+                'verbose_name_plural': 'Терміни дії',
+                'ordering': ['expiry_date'],
+                'indexes': [models.Index(fields=['expiry_date', 'department'], name='expiry_date_dept_idx'), models.Index(fields=['user', 'expiry_date'], name='expiry_user_date_idx'), models.Index(fields=['source_type', 'source_id'], name='expiry_source_idx')],
+            },
+        ),
+    ]
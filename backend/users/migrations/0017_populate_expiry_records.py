@@ -0,0 +1,107 @@
+# Заповнення індексу термінів дії з наявних даних
+# Логіка заморожена тут (історичні моделі, без імпорту users.services); повна
+# перебудова після деплою - python manage.py scan_expiring --rebuild
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+EMPLOYEE_DATE_FIELDS = [
+    ('medical_exam_date', 'Медичний огляд'),
+    ('qualification_expiry_date', 'Кваліфікаційне посвідчення'),
+    ('safety_training_date', 'Посвідчення з охорони праці'),
+    ('special_training_date', 'Посвідчення спеціального навчання'),
+]
+
+
+def owner_titles(apps, using):
+    """{тип власника: {id: назва}} для записів документів"""
+    UserTechnic = apps.get_model('users', 'UserTechnic')
+    UserInstrument = apps.get_model('users', 'UserInstrument')
+    UserOrder = apps.get_model('users', 'UserOrder')
+    choices = dict(UserOrder._meta.get_field('order_type').choices)
+    return {
+        'technic': {
+            pk: type_name or custom
+            for pk, type_name, custom in UserTechnic.objects.using(using).values_list(
+                'pk', 'technic_type__name', 'custom_type'
+            )
+        },
+        'instrument': {
+            pk: type_name or custom
+            for pk, type_name, custom in UserInstrument.objects.using(using).values_list(
+                'pk', 'instrument_type__name', 'custom_type'
+            )
+        },
+        'order': {
+            pk: custom if order_type == 'custom' and custom else choices.get(order_type, order_type)
+            for pk, order_type, custom in UserOrder.objects.using(using).values_list(
+                'pk', 'order_type', 'custom_title'
+            )
+        },
+    }
+
+
+def populate_expiry_records(apps, schema_editor):
+    ExpiryRecord = apps.get_model('users', 'ExpiryRecord')
+    User = apps.get_model('users', 'User')
+    UserEmployee = apps.get_model('users', 'UserEmployee')
+    UserWork = apps.get_model('users', 'UserWork')
+    DocumentFile = apps.get_model('users', 'DocumentFile')
+    using = schema_editor.connection.alias
+
+    departments = dict(User.objects.using(using).values_list('pk', 'department_id'))
+    batch = []
+
+    def add(user_id, source_type, source_id, kind, title, expiry_date):
+        batch.append(ExpiryRecord(
+            user_id=user_id, department_id=departments.get(user_id), source_type=source_type,
+            source_id=source_id, kind=kind[:500], title=(title or '')[:500], expiry_date=expiry_date,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            ExpiryRecord.objects.using(using).bulk_create(batch)
+            batch.clear()
+
+    fields = [field_name for field_name, _ in EMPLOYEE_DATE_FIELDS]
+    employees = UserEmployee.objects.using(using).values_list('pk', 'user_id', 'name', *fields)
+    for pk, user_id, name, *dates in employees.iterator(chunk_size=BATCH_SIZE):
+        for (_, kind), expiry_date in zip(EMPLOYEE_DATE_FIELDS, dates):
+            if expiry_date:
+                add(user_id, 'employee', pk, kind, name, expiry_date)
+
+    works = (
+        UserWork.objects.using(using)
+        .filter(expiry_date__isnull=False)
+        .values_list('pk', 'user_id', 'work_sub_type__name', 'expiry_date')
+    )
+    for pk, user_id, title, expiry_date in works.iterator(chunk_size=BATCH_SIZE):
+        add(user_id, 'work', pk, 'Дозвіл на роботи', title, expiry_date)
+
+    titles = owner_titles(apps, using)
+    files = (
+        DocumentFile.objects.using(using)
+        .filter(expiry_date__isnull=False)
+        .values_list('owner_type', 'owner_id', 'user_id', 'document_type', 'name', 'expiry_date')
+    )
+    for owner_type, owner_id, user_id, document_type, name, expiry_date in files.iterator(chunk_size=BATCH_SIZE):
+        title = titles.get(owner_type, {}).get(owner_id, 'ЗІЗ' if owner_type == 'ppe' else '')
+        add(user_id, owner_type, owner_id, document_type or name or 'Документ', title, expiry_date)
+
+    if batch:
+        ExpiryRecord.objects.using(using).bulk_create(batch)
+
+
+def clear_expiry_records(apps, schema_editor):
+    ExpiryRecord = apps.get_model('users', 'ExpiryRecord')
+    ExpiryRecord.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0016_expiry_record'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_expiry_records, clear_expiry_records),
+    ]
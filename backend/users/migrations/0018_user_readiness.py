@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0017_populate_expiry_records'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReadiness',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employees_count', models.PositiveIntegerField(default=0, verbose_name='Співробітників')),
+                ('technics_count', models.PositiveIntegerField(default=0, verbose_name='Техніки')),
+                ('instruments_count', models.PositiveIntegerField(default=0, verbose_name='Інструментів')),
+                ('orders_count', models.PositiveIntegerField(default=0, verbose_name='Наказів')),
+                ('works_count', models.PositiveIntegerField(default=0, verbose_name='Робіт')),
+                ('required_documents_count', models.PositiveIntegerField(default=0, verbose_name='Необхідних документів')),
+                ('missing_documents_count', models.PositiveIntegerField(default=0, verbose_name='Відсутніх документів')),
+                ('missing_documents', models.JSONField(blank=True, default=list, verbose_name='Відсутні документи')),
+                ('expired_count', models.PositiveIntegerField(default=0, verbose_name='Прострочених')),
+                ('completeness', models.PositiveSmallIntegerField(default=0, verbose_name='Повнота, %')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='readiness', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Готовність переможця',
+                'verbose_name_plural': 'Готовність переможців',
+                'indexes': [models.Index(fields=['completeness'], name='readiness_completeness_idx'), models.Index(fields=['missing_documents_count'], name='readiness_missing_idx'), models.Index(fields=['expired_count'], name='readiness_expired_idx')],
+            },
+        ),
+    ]
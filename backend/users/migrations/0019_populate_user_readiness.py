@@ -0,0 +1,16 @@
+# Початкове заповнення UserReadiness та UserDocumentStatus
+# Перерахунок - десяток агрегуючих запитів з логікою users.services.readiness, яку міграція
+# не імпортує (історичні міграції не мають залежати від поточного коду). Заповнення -
+# командою після деплою: python manage.py refresh_readiness (її і так запускають щодня).
+# Доки рядка немає, адмінка і API показують готовність як порожню.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_user_readiness'),
+    ]
+
+    operations = []
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_populate_user_readiness'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(choices=[('tender', 'Тендер'), ('employee', 'Співробітник'), ('technic', 'Техніка'), ('instrument', 'Інструмент')], max_length=20, verbose_name='Тип')),
+                ('source_id', models.PositiveIntegerField(verbose_name="ID об'єкта")),
+                ('title', models.CharField(max_length=500, verbose_name='Назва')),
+                ('body', models.TextField(blank=True, verbose_name='Текст для пошуку')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.department', verbose_name='Підрозділ')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Пошуковий запис',
+                'verbose_name_plural': 'Пошуковий індекс',
+                'indexes': [models.Index(fields=['department', 'source_type'], name='search_dept_type_idx'), models.Index(fields=['user'], name='search_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source_type', 'source_id'), name='search_source_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,137 @@
+# Повнотекстовий пошук: Postgres - tsvector + pg_trgm GIN, SQLite - FTS5 з тригерами.
+# Структури створюються сирим SQL залежно від БД, тому моделі про них не знають.
+# SQL і заповнення заморожені тут (історичні моделі, без імпорту users.services);
+# повна перебудова після деплою - python manage.py rebuild_search_index
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+FTS_TABLE = 'users_searchentry_fts'
+
+SQLITE_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, body,
+        content='users_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_ai AFTER INSERT ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_ad AFTER DELETE ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_au AFTER UPDATE ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS users_searchentry_ai',
+    'DROP TRIGGER IF EXISTS users_searchentry_ad',
+    'DROP TRIGGER IF EXISTS users_searchentry_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_SETUP = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """ALTER TABLE users_searchentry ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', title || ' ' || body)) STORED""",
+    'CREATE INDEX IF NOT EXISTS search_vector_gin_idx ON users_searchentry USING GIN (search_vector)',
+    """CREATE INDEX IF NOT EXISTS search_text_trgm_idx ON users_searchentry
+        USING GIN ((title || ' ' || body) gin_trgm_ops)""",
+]
+
+POSTGRES_TEARDOWN = [
+    'DROP INDEX IF EXISTS search_text_trgm_idx',
+    'DROP INDEX IF EXISTS search_vector_gin_idx',
+    'ALTER TABLE users_searchentry DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def create_search_backend(apps, schema_editor):
+    statements = {'postgresql': POSTGRES_SETUP, 'sqlite': SQLITE_SETUP}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_backend(apps, schema_editor):
+    statements = {'postgresql': POSTGRES_TEARDOWN, 'sqlite': SQLITE_TEARDOWN}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def _join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+def populate_search_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('users', 'SearchEntry')
+    User = apps.get_model('users', 'User')
+    UserEmployee = apps.get_model('users', 'UserEmployee')
+    UserTechnic = apps.get_model('users', 'UserTechnic')
+    UserInstrument = apps.get_model('users', 'UserInstrument')
+    using = schema_editor.connection.alias
+
+    departments = {}
+    batch = []
+
+    def add(user_id, source_type, source_id, title, body):
+        batch.append(SearchEntry(
+            user_id=user_id, department_id=departments.get(user_id),
+            source_type=source_type, source_id=source_id, title=title[:500], body=body,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            SearchEntry.objects.using(using).bulk_create(batch)
+            batch.clear()
+
+    tenders = User.objects.using(using).filter(is_staff=False).values_list(
+        'pk', 'department_id', 'tender_number', 'company_name', 'edrpou', 'email',
+        'director_name', 'contact_person', 'phone',
+    )
+    for pk, department_id, tender_number, company_name, *contacts in tenders.iterator(chunk_size=BATCH_SIZE):
+        departments[pk] = department_id
+        add(pk, 'tender', pk, _join(tender_number, company_name), _join(tender_number, company_name, *contacts))
+
+    employees = UserEmployee.objects.using(using).filter(user_id__in=list(departments)).values_list(
+        'pk', 'user_id', 'name', 'position', 'organization_name'
+    )
+    for pk, user_id, name, position, organization_name in employees.iterator(chunk_size=BATCH_SIZE):
+        add(user_id, 'employee', pk, name, _join(name, position, organization_name))
+
+    technics = UserTechnic.objects.using(using).filter(user_id__in=list(departments)).values_list(
+        'pk', 'user_id', 'technic_type__name', 'custom_type', 'registration_number'
+    )
+    for pk, user_id, type_name, custom_type, registration_number in technics.iterator(chunk_size=BATCH_SIZE):
+        add(
+            user_id, 'technic', pk, _join(type_name or custom_type, registration_number),
+            _join(type_name, custom_type, registration_number),
+        )
+
+    instruments = UserInstrument.objects.using(using).filter(user_id__in=list(departments)).values_list(
+        'pk', 'user_id', 'instrument_type__name', 'custom_type'
+    )
+    for pk, user_id, type_name, custom_type in instruments.iterator(chunk_size=BATCH_SIZE):
+        add(user_id, 'instrument', pk, type_name or custom_type or '', _join(type_name, custom_type))
+
+    if batch:
+        SearchEntry.objects.using(using).bulk_create(batch)
+
+
+def clear_search_entries(apps, schema_editor):
+    SearchEntry = apps.get_model('users', 'SearchEntry')
+    SearchEntry.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_search_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_backend, drop_search_backend),
+        migrations.RunPython(populate_search_entries, clear_search_entries),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0021_search_backend'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', False), models.Q(('last_sync_at__isnull', True), ('updated_at__gt', models.F('last_sync_at')), _connector='OR')), fields=['updated_at', 'id'], name='user_sync_1c_pending_idx'),
+        ),
+    ]
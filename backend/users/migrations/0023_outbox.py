@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_user_sync_1c_pending_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Назва')),
+                ('webhook_url', models.URLField(max_length=500, verbose_name='Webhook URL')),
+                ('token', models.CharField(blank=True, max_length=255, verbose_name='Bearer токен')),
+                ('source_types', models.JSONField(blank=True, default=list, help_text='Напр. ["employee", "permit"]; порожньо - всі', verbose_name='Типи подій')),
+                ('cursor', models.PositiveBigIntegerField(default=0, verbose_name='Курсор (останній доставлений id)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активний')),
+                ('last_delivery_at', models.DateTimeField(blank=True, null=True, verbose_name='Остання доставка')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('department', models.ForeignKey(blank=True, help_text='Порожньо - події всіх підрозділів', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.department', verbose_name='Підрозділ')),
+            ],
+            options={
+                'verbose_name': 'Споживач outbox',
+                'verbose_name_plural': 'Споживачі outbox',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tender_id', models.PositiveBigIntegerField(verbose_name='ID тендеру')),
+                ('source_type', models.CharField(choices=[('tender', 'Тендер'), ('employee', 'Співробітник'), ('technic', 'Техніка'), ('instrument', 'Інструмент'), ('order', 'Наказ'), ('permit', 'Перепустка')], max_length=20, verbose_name='Джерело')),
+                ('source_id', models.PositiveBigIntegerField(verbose_name='ID джерела')),
+                ('action', models.CharField(choices=[('created', 'Створено'), ('updated', 'Змінено'), ('deleted', 'Видалено')], max_length=10, verbose_name='Дія')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Дані')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.department', verbose_name='Підрозділ')),
+            ],
+            options={
+                'verbose_name': 'Подія outbox',
+                'verbose_name_plural': 'Події outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['department', 'id'], name='outbox_dept_id_idx'), models.Index(fields=['created_at'], name='outbox_created_idx')],
+            },
+        ),
+    ]
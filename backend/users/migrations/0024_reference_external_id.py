@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Код 1С'),
+        ),
+        migrations.AddField(
+            model_name='equipment',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='Активний'),
+        ),
+        migrations.AddField(
+            model_name='instrumenttype',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Код 1С'),
+        ),
+        migrations.AddField(
+            model_name='technictype',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Код 1С'),
+        ),
+        migrations.AddField(
+            model_name='worksubtype',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Код 1С'),
+        ),
+        migrations.AddField(
+            model_name='worksubtype',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='Активний'),
+        ),
+        migrations.AddField(
+            model_name='worktype',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Код 1С'),
+        ),
+        migrations.AddField(
+            model_name='worktype',
+            name='is_active',
+            field=models.BooleanField(default=True, verbose_name='Активний'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+from utils.migrations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не працює всередині транзакції
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0024_reference_external_id'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='permit',
+            index=models.Index(fields=['user', '-created_at'], name='permit_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', False)), fields=['status', 'department'], name='user_tender_status_dept_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', False)), fields=['department', '-id'], name='user_tender_dept_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='useremployee',
+            index=models.Index(fields=['user', '-created_at'], name='employee_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='useremployee',
+            index=models.Index(fields=['-created_at'], name='employee_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userinstrument',
+            index=models.Index(fields=['user', '-created_at'], name='instrument_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userinstrument',
+            index=models.Index(fields=['-created_at'], name='instrument_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userorder',
+            index=models.Index(fields=['user', 'order_type', '-created_at'], name='order_user_type_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='userorder',
+            index=models.Index(fields=['-created_at'], name='order_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usertechnic',
+            index=models.Index(fields=['user', '-created_at'], name='technic_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='usertechnic',
+            index=models.Index(fields=['-created_at'], name='technic_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:58
+# SearchEntry.source_id - bigint, як ExpiryRecord/OutboxEvent.source_id.
+# SQLite змінює тип перебудовою таблиці, тригери FTS (0021) при цьому зникають -
+# створюємо їх знову і перебудовуємо FTS індекс. У Postgres - ALTER COLUMN TYPE.
+
+from django.db import migrations, models
+
+FTS_TABLE = 'users_searchentry_fts'
+
+SQLITE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_ai AFTER INSERT ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_ad AFTER DELETE ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_searchentry_au AFTER UPDATE ON users_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0025_hot_path_indexes'),
+    ]
+
+    operations = [
+        # Відкат виконується у зворотному порядку: тригери - після зворотної AlterField
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_triggers),
+        migrations.AlterField(
+            model_name='searchentry',
+            name='source_id',
+            field=models.PositiveBigIntegerField(verbose_name="ID об'єкта"),
+        ),
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+    ]
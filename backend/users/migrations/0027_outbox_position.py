@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:05
+# Курсор outbox - position (порядок коміту) замість id (порядок вставки).
+# Наявним подіям position = id, тож збережені курсори споживачів лишаються дійсними;
+# нові позиції продовжуються після найбільшої.
+
+from django.db import migrations, models
+
+
+def positions_from_ids(apps, schema_editor):
+    OutboxEvent = apps.get_model('users', 'OutboxEvent')
+    OutboxEvent.objects.using(schema_editor.connection.alias).update(position=models.F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0026_search_source_bigint'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxevent',
+            name='outbox_dept_id_idx',
+        ),
+        migrations.AddField(
+            model_name='outboxevent',
+            name='position',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Позиція'),
+        ),
+        migrations.RunPython(positions_from_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='outboxconsumer',
+            name='cursor',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Курсор (позиція останньої доставленої події)'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['department', 'position'], name='outbox_dept_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('position__isnull', True)), fields=['id'], name='outbox_unsequenced_idx'),
+        ),
+    ]
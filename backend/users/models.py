@@ -1,6 +1,7 @@
 # backend/users/models.py
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F, Q
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 from django.utils import timezone
@@ -73,6 +74,10 @@ class Department(models.Model):
         return self.name
 
 
+# Тендери, змінені після останньої синхронізації з 1С (sync_1c) - під частковий індекс User
+SYNC_1C_PENDING = Q(is_staff=False) & (Q(last_sync_at__isnull=True) | Q(updated_at__gt=F('last_sync_at')))
+
+
 class User(AbstractUser):
     """
     Розширена модель користувача
@@ -153,6 +158,13 @@ class User(AbstractUser):
             ("approve_tender_users", "Can approve tender winners"),
             ("decline_tender_users", "Can decline tender winners"),
         ]
+        indexes = [
+            # Черга синхронізації з 1С: тільки змінені рядки, обхід по (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], condition=SYNC_1C_PENDING, name='user_sync_1c_pending_idx'),
+            # Списки переможців тендерів (is_staff=False): фільтр статусу/підрозділу, адмінка підрозділу
+            models.Index(fields=['status', 'department'], condition=Q(is_staff=False), name='user_tender_status_dept_idx'),
+            models.Index(fields=['department', '-id'], condition=Q(is_staff=False), name='user_tender_dept_idx'),
+        ]
 
     def __str__(self):
         if self.is_staff:
@@ -171,6 +183,30 @@ class User(AbstractUser):
             
         super().save(*args, **kwargs)
 
+    # Поля, від яких залежать UserReadiness і ExpiryRecord (signals.user_saved)
+    READINESS_FIELDS = ('department_id', 'is_staff')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._readiness_state = instance._current_readiness_state()
+        return instance
+
+    def _current_readiness_state(self):
+        # Відкладені (defer/only) поля не читаємо - їх немає в __dict__
+        return {name: self.__dict__[name] for name in self.READINESS_FIELDS if name in self.__dict__}
+
+    def readiness_changed(self, update_fields=None):
+        """
+        Чи змінились поля готовності з моменту завантаження (для post_save).
+        Запам'ятовує поточні значення - наступне збереження порівнюється з ними.
+        """
+        if update_fields is not None and not {'department', 'department_id', 'is_staff'} & set(update_fields):
+            return False
+        loaded = getattr(self, '_readiness_state', {})
+        self._readiness_state = self._current_readiness_state()
+        return any(name not in loaded or loaded[name] != getattr(self, name) for name in self.READINESS_FIELDS)
+
     @property
     def is_tender_winner(self):
         """Перевірка чи це переможець тендеру (зареєстрований через фронтенд)"""
@@ -328,6 +364,9 @@ class UserDocumentStatus(models.Model):
 # Довідники
 class WorkType(models.Model):
     name = models.TextField(verbose_name="Тип робіт")
+    # Код запису в 1С (import_reference); порожній - створено вручну
+    external_id = models.CharField('Код 1С', max_length=64, unique=True, null=True, blank=True)
+    is_active = models.BooleanField(default=True, verbose_name="Активний")
 
     def __str__(self):
         return self.name
@@ -336,6 +375,9 @@ class WorkSubType(models.Model):
     work_type = models.ForeignKey(WorkType, on_delete=models.CASCADE, related_name='subtypes')
     name = models.TextField(verbose_name="Підтип робіт")
     has_equipment = models.BooleanField(default=False, verbose_name="Потребує обладнання")
+    # Код запису в 1С (import_reference); порожній - створено вручну
+    external_id = models.CharField('Код 1С', max_length=64, unique=True, null=True, blank=True)
+    is_active = models.BooleanField(default=True, verbose_name="Активний")
 
     def __str__(self):
         return f"{self.name} ({self.work_type.name})"
@@ -343,6 +385,9 @@ class WorkSubType(models.Model):
 class Equipment(models.Model):
     subtype = models.ForeignKey(WorkSubType, on_delete=models.CASCADE, related_name='equipment')
     name = models.TextField(verbose_name="Обладнання")
+    # Код запису в 1С (import_reference); порожній - створено вручну
+    external_id = models.CharField('Код 1С', max_length=64, unique=True, null=True, blank=True)
+    is_active = models.BooleanField(default=True, verbose_name="Активний")
 
     def __str__(self):
         return f"{self.name} - {self.subtype.name}"
@@ -396,6 +441,8 @@ class TechnicType(models.Model):
     """Типи техніки з необхідними документами"""
     name = models.CharField('Тип техніки', max_length=255)
     required_documents = models.JSONField('Необхідні документи', default=list)
+    # Код запису в 1С (import_reference); порожній - створено вручну
+    external_id = models.CharField('Код 1С', max_length=64, unique=True, null=True, blank=True)
     is_active = models.BooleanField('Активний', default=True)
     created_at = models.DateTimeField('Створено', auto_now_add=True)
     
@@ -412,6 +459,8 @@ class InstrumentType(models.Model):
     """Типи інструментів з необхідними документами"""
     name = models.CharField('Вид інструменту', max_length=255)
     required_documents = models.JSONField('Необхідні документи', default=list)
+    # Код запису в 1С (import_reference); порожній - створено вручну
+    external_id = models.CharField('Код 1С', max_length=64, unique=True, null=True, blank=True)
     is_active = models.BooleanField('Активний', default=True)
     created_at = models.DateTimeField('Створено', auto_now_add=True)
     
@@ -500,6 +549,10 @@ class UserEmployee(models.Model):
         verbose_name = "Співробітник"
         verbose_name_plural = "Співробітники"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='employee_user_created_idx'),
+            models.Index(fields=['-created_at'], name='employee_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.user.company_name})"
@@ -541,6 +594,10 @@ class UserOrder(models.Model):
         verbose_name_plural = 'Накази'
         ordering = ['user', 'order_type', '-created_at']
         # ВИДАЛЯЄМО unique_together щоб дозволити декілька кастомних наказів
+        indexes = [
+            models.Index(fields=['user', 'order_type', '-created_at'], name='order_user_type_created_idx'),
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+        ]
     
     def __str__(self):
         if self.order_type == 'custom' and self.custom_title:
@@ -561,6 +618,10 @@ class UserOrder(models.Model):
             return self.custom_title
         return self.get_order_type_display()
 
+# Тип техніки, для якого державний реєстраційний номер не видається
+TOWER_CRANE = 'Баштовий кран'
+
+
 class UserTechnic(models.Model):
     """Техніка користувача (таб Техніка)"""
     user = models.ForeignKey(
@@ -589,6 +650,10 @@ class UserTechnic(models.Model):
         verbose_name = 'Техніка'
         verbose_name_plural = 'Техніка'
         ordering = ['user', '-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='technic_user_created_idx'),
+            models.Index(fields=['-created_at'], name='technic_created_idx'),
+        ]
     
     def __str__(self):
         name = self.technic_type.name if self.technic_type else self.custom_type
@@ -598,6 +663,13 @@ class UserTechnic(models.Model):
     def display_name(self):
         return self.technic_type.name if self.technic_type else self.custom_type
 
+    @staticmethod
+    def requires_registration_number(technic_type, custom_type):
+        """Номер НЕ обов'язковий для: 1) Баштового крана, 2) Кастомних типів"""
+        if technic_type:
+            return technic_type.name != TOWER_CRANE
+        return not custom_type
+
 
 class UserInstrument(models.Model):
     """Інструменти користувача (таб Інструменти)"""
@@ -622,6 +694,10 @@ class UserInstrument(models.Model):
         verbose_name = 'Інструмент'
         verbose_name_plural = 'Інструменти'
         ordering = ['user', '-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='instrument_user_created_idx'),
+            models.Index(fields=['-created_at'], name='instrument_created_idx'),
+        ]
     
     def __str__(self):
         name = self.instrument_type.name if self.instrument_type else self.custom_type
@@ -682,6 +758,9 @@ class Permit(models.Model):
     class Meta:
         verbose_name = 'Перепустка'
         verbose_name_plural = 'Перепустки'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='permit_user_created_idx'),
+        ]
     
     def __str__(self):
         if self.employee:
@@ -696,4 +775,267 @@ class Permit(models.Model):
             next_number = last_number + 1
         else:
             next_number = 1
-        return f"{user.tender_number}-{next_number}"
\ No newline at end of file
+        return f"{user.tender_number}-{next_number}"
+
+# Нормалізовані документи
+
+class DocumentFile(models.Model):
+    """Файл документа з JSON поля documents (наказ, техніка, інструмент, ЗІЗ)"""
+    OWNER_TYPES = [
+        ('order', 'Наказ'),
+        ('technic', 'Техніка'),
+        ('instrument', 'Інструмент'),
+        ('ppe', 'ЗІЗ'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='document_files',
+        verbose_name='Користувач'
+    )
+    owner_type = models.CharField('Тип власника', max_length=20, choices=OWNER_TYPES)
+    owner_id = models.PositiveBigIntegerField('ID власника')
+    document_type = models.CharField('Тип документу', max_length=500, blank=True)
+    name = models.CharField('Назва файлу', max_length=500, blank=True)
+    path = models.CharField('Шлях', max_length=1000)
+    size = models.PositiveBigIntegerField('Розмір', null=True, blank=True)
+    digest = models.CharField('SHA-256', max_length=64, blank=True)
+    expiry_date = models.DateField('Термін дії', null=True, blank=True)
+    created_at = models.DateTimeField('Створено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Файл документа'
+        verbose_name_plural = 'Файли документів'
+        ordering = ['owner_type', 'owner_id', 'id']
+        indexes = [
+            models.Index(fields=['owner_type', 'owner_id'], name='docfile_owner_idx'),
+            models.Index(fields=['user', 'owner_type'], name='docfile_user_owner_idx'),
+            models.Index(fields=['document_type'], name='docfile_doc_type_idx'),
+            models.Index(fields=['expiry_date'], name='docfile_expiry_idx'),
+            models.Index(fields=['digest'], name='docfile_digest_idx'),
+            models.Index(fields=['path'], name='docfile_path_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_owner_type_display()} #{self.owner_id} - {self.name or self.path}"
+
+    @property
+    def is_expired(self):
+        return bool(self.expiry_date) and self.expiry_date < timezone.now().date()
+
+
+class ExpiryRecord(models.Model):
+    """Індекс термінів дії (роботи, співробітники, документи) для пошуку по діапазону дат"""
+    SOURCE_TYPES = [
+        ('work', 'Дозвіл на роботи'),
+        ('employee', 'Співробітник'),
+        ('order', 'Наказ'),
+        ('technic', 'Техніка'),
+        ('instrument', 'Інструмент'),
+        ('ppe', 'ЗІЗ'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='expiry_records',
+        verbose_name='Користувач'
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Підрозділ'
+    )
+    source_type = models.CharField('Джерело', max_length=20, choices=SOURCE_TYPES)
+    source_id = models.PositiveBigIntegerField('ID джерела')
+    kind = models.CharField('Документ', max_length=500)
+    title = models.CharField('Назва', max_length=500, blank=True)
+    expiry_date = models.DateField('Термін дії')
+
+    class Meta:
+        verbose_name = 'Термін дії'
+        verbose_name_plural = 'Терміни дії'
+        ordering = ['expiry_date']
+        indexes = [
+            models.Index(fields=['expiry_date', 'department'], name='expiry_date_dept_idx'),
+            models.Index(fields=['user', 'expiry_date'], name='expiry_user_date_idx'),
+            models.Index(fields=['source_type', 'source_id'], name='expiry_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.kind} (до {self.expiry_date:%d.%m.%Y})"
+
+    @property
+    def is_expired(self):
+        return self.expiry_date < timezone.now().date()
+
+
+class UserReadiness(models.Model):
+    """Денормалізований підсумок готовності переможця тендеру (оновлюється сигналами)"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='readiness',
+        verbose_name='Користувач'
+    )
+    employees_count = models.PositiveIntegerField('Співробітників', default=0)
+    technics_count = models.PositiveIntegerField('Техніки', default=0)
+    instruments_count = models.PositiveIntegerField('Інструментів', default=0)
+    orders_count = models.PositiveIntegerField('Наказів', default=0)
+    works_count = models.PositiveIntegerField('Робіт', default=0)
+    required_documents_count = models.PositiveIntegerField('Необхідних документів', default=0)
+    missing_documents_count = models.PositiveIntegerField('Відсутніх документів', default=0)
+    missing_documents = models.JSONField('Відсутні документи', default=list, blank=True)
+    expired_count = models.PositiveIntegerField('Прострочених', default=0)
+    completeness = models.PositiveSmallIntegerField('Повнота, %', default=0)
+    updated_at = models.DateTimeField('Оновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Готовність переможця'
+        verbose_name_plural = 'Готовність переможців'
+        indexes = [
+            models.Index(fields=['completeness'], name='readiness_completeness_idx'),
+            models.Index(fields=['missing_documents_count'], name='readiness_missing_idx'),
+            models.Index(fields=['expired_count'], name='readiness_expired_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.tender_number} - {self.completeness}%"
+
+    @property
+    def is_ready(self):
+        return (
+            self.employees_count > 0
+            and self.missing_documents_count == 0
+            and self.expired_count == 0
+        )
+
+
+class SearchEntry(models.Model):
+    """
+    Пошуковий індекс по тендерах, співробітниках, техніці та інструментах.
+    Повнотекстовий пошук - додатково на рівні БД (міграція 0021):
+    Postgres - tsvector + trigram GIN, SQLite - FTS5 таблиця users_searchentry_fts.
+    """
+    SOURCE_TYPES = [
+        ('tender', 'Тендер'),
+        ('employee', 'Співробітник'),
+        ('technic', 'Техніка'),
+        ('instrument', 'Інструмент'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='search_entries',
+        verbose_name='Користувач'
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Підрозділ'
+    )
+    source_type = models.CharField('Тип', max_length=20, choices=SOURCE_TYPES)
+    source_id = models.PositiveBigIntegerField('ID об\'єкта')
+    title = models.CharField('Назва', max_length=500)
+    body = models.TextField('Текст для пошуку', blank=True)
+    updated_at = models.DateTimeField('Оновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Пошуковий запис'
+        verbose_name_plural = 'Пошуковий індекс'
+        constraints = [
+            models.UniqueConstraint(fields=['source_type', 'source_id'], name='search_source_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'source_type'], name='search_dept_type_idx'),
+            models.Index(fields=['user'], name='search_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_type_display()}: {self.title}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Журнал змін для зовнішніх систем (outbox). Пишеться сигналами в тій самій
+    транзакції, що і зміна; position - курсор споживачів (relay_outbox, /outbox/).
+    """
+    SOURCE_TYPES = [
+        ('tender', 'Тендер'),
+        ('employee', 'Співробітник'),
+        ('technic', 'Техніка'),
+        ('instrument', 'Інструмент'),
+        ('order', 'Наказ'),
+        ('permit', 'Перепустка'),
+    ]
+    ACTIONS = [
+        ('created', 'Створено'),
+        ('updated', 'Змінено'),
+        ('deleted', 'Видалено'),
+    ]
+
+    # Без FK: подія про видалення має пережити сам тендер
+    tender_id = models.PositiveBigIntegerField('ID тендеру')
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Підрозділ'
+    )
+    source_type = models.CharField('Джерело', max_length=20, choices=SOURCE_TYPES)
+    source_id = models.PositiveBigIntegerField('ID джерела')
+    action = models.CharField('Дія', max_length=10, choices=ACTIONS)
+    payload = models.JSONField('Дані', default=dict, blank=True)
+    created_at = models.DateTimeField('Створено', auto_now_add=True)
+    # Порядок коміту: присвоюється вже закомітченим подіям (users.services.outbox.sequence)
+    position = models.PositiveBigIntegerField('Позиція', null=True, blank=True, unique=True, editable=False)
+
+    class Meta:
+        verbose_name = 'Подія outbox'
+        verbose_name_plural = 'Події outbox'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['department', 'position'], name='outbox_dept_position_idx'),
+            models.Index(fields=['created_at'], name='outbox_created_idx'),
+            models.Index(fields=['id'], condition=Q(position__isnull=True), name='outbox_unsequenced_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.source_type}:{self.source_id} {self.action}"
+
+
+class OutboxConsumer(models.Model):
+    """Зовнішня система, якій relay_outbox доставляє події outbox на webhook"""
+    name = models.CharField('Назва', max_length=100, unique=True)
+    webhook_url = models.URLField('Webhook URL', max_length=500)
+    token = models.CharField('Bearer токен', max_length=255, blank=True)
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='+',
+        verbose_name='Підрозділ',
+        help_text='Порожньо - події всіх підрозділів'
+    )
+    source_types = models.JSONField(
+        'Типи подій', default=list, blank=True,
+        help_text='Напр. ["employee", "permit"]; порожньо - всі'
+    )
+    cursor = models.PositiveBigIntegerField('Курсор (позиція останньої доставленої події)', default=0)
+    is_active = models.BooleanField('Активний', default=True)
+    last_delivery_at = models.DateTimeField('Остання доставка', null=True, blank=True)
+    last_error = models.TextField('Остання помилка', blank=True)
+
+    class Meta:
+        verbose_name = 'Споживач outbox'
+        verbose_name_plural = 'Споживачі outbox'
+
+    def __str__(self):
+        return self.name
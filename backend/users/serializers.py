@@ -1,13 +1,19 @@
+import logging
+
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from utils.media import media_resolver
+from utils.rows import RowSerializer
 from .models import (
     User, Department, PasswordResetToken, WorkType, WorkSubType, Equipment, 
     UserWork, TechnicType, InstrumentType, UserSpecification, UserEmployee, 
-    UserOrder, UserTechnic, UserInstrument, UserPPE, Permit
+    UserOrder, UserTechnic, UserInstrument, UserPPE, Permit, UserReadiness
 )
 
+logger = logging.getLogger(__name__)
+
 # ===================================================================
 # БАЗОВІ СЕРІАЛІЗАТОРИ (залишаються без змін)
 
@@ -105,17 +111,32 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
+class UserReadinessSerializer(serializers.ModelSerializer):
+    """Попередньо обчислений підсумок готовності"""
+    is_ready = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = UserReadiness
+        fields = [
+            'employees_count', 'technics_count', 'instruments_count', 'orders_count',
+            'works_count', 'required_documents_count', 'missing_documents_count',
+            'missing_documents', 'expired_count', 'completeness', 'is_ready', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Основна інформація про користувача"""
     department_name = serializers.CharField(source='department.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    readiness = UserReadinessSerializer(read_only=True, allow_null=True)
     
     class Meta:
         model = User
         fields = [
             'id', 'tender_number', 'company_name', 'edrpou', 'email', 'phone',
             'contact_person', 'department', 'department_name', 'status', 
-            'status_display', 'is_activated', 'documents_folder',
+            'status_display', 'is_activated', 'documents_folder', 'readiness',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'tender_number', 'documents_folder', 'created_at']
@@ -125,6 +146,7 @@ class UserDetailSerializer(serializers.ModelSerializer):
     """Детальна інформація про користувача для адмінів"""
     department_name = serializers.CharField(source='department.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    readiness = UserReadinessSerializer(read_only=True, allow_null=True)
     
     class Meta:
         model = User
@@ -132,7 +154,7 @@ class UserDetailSerializer(serializers.ModelSerializer):
             'id', 'tender_number', 'company_name', 'edrpou', 'legal_address',
             'actual_address', 'director_name', 'contact_person', 'email', 
             'phone', 'department', 'department_name', 'status', 'status_display',
-            'is_activated', 'documents_folder', 'created_at', 'updated_at',
+            'is_activated', 'documents_folder', 'readiness', 'created_at', 'updated_at',
             'last_login'
         ]
         read_only_fields = ['id', 'tender_number', 'documents_folder', 'created_at']
@@ -178,32 +200,16 @@ class UserEmployeeSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
     
     def get_photo_url(self, obj):
-        if obj.photo:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.photo.url)
-        return None
+        return media_resolver(self.context.get('request')).file_url(obj.photo)
     
     def get_qualification_certificate_url(self, obj):
-        if obj.qualification_certificate:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.qualification_certificate.url)
-        return None
+        return media_resolver(self.context.get('request')).file_url(obj.qualification_certificate)
     
     def get_safety_training_certificate_url(self, obj):
-        if obj.safety_training_certificate:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.safety_training_certificate.url)
-        return None
+        return media_resolver(self.context.get('request')).file_url(obj.safety_training_certificate)
     
     def get_special_training_certificate_url(self, obj):
-        if obj.special_training_certificate:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.special_training_certificate.url)
-        return None
+        return media_resolver(self.context.get('request')).file_url(obj.special_training_certificate)
     
     def validate(self, data):
         """Валідація дат"""
@@ -223,7 +229,7 @@ class UserEmployeeSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Створення співробітника"""
-        print(f"🔍 DEBUG CREATE: validated_data = {validated_data}")
+        logger.debug('Створення співробітника: %s', validated_data)
         validated_data['user'] = self.context['request'].user
 
         # Очищуємо пусті дати
@@ -234,7 +240,7 @@ class UserEmployeeSerializer(serializers.ModelSerializer):
                 validated_data[field] = None
         
         instance = super().create(validated_data)
-        print(f"✅ DEBUG CREATE: Created = {instance}")
+        logger.debug('Створено співробітника %s', instance.pk)
         return instance
 
 
@@ -257,22 +263,7 @@ class UserOrderSerializer(serializers.ModelSerializer):
     
     def get_documents_info(self, obj):
         """Повертає інформацію про завантажені файли з URL'ами"""
-        if not obj.documents or not isinstance(obj.documents, list):
-            return []
-        
-        request = self.context.get('request')
-        documents_with_urls = []
-        
-        for doc in obj.documents:
-            if isinstance(doc, dict):
-                doc_info = doc.copy()
-                if 'path' in doc_info and request:
-                    file_path = doc_info['path']
-                    if file_path.startswith('/media/'):
-                        doc_info['url'] = request.build_absolute_uri(file_path)
-                documents_with_urls.append(doc_info)
-        
-        return documents_with_urls
+        return media_resolver(self.context.get('request')).document_list(obj.documents)
     
     def validate(self, attrs):
         """Валідація даних"""
@@ -324,24 +315,7 @@ class UserTechnicSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
     
     def get_documents_info(self, obj):
-        if not obj.documents:
-            return {}
-        
-        request = self.context.get('request')
-        documents_with_urls = {}
-        
-        for doc_type, files in obj.documents.items():
-            if isinstance(files, list):
-                documents_with_urls[doc_type] = []
-                for file_info in files:
-                    file_data = file_info.copy()
-                    if 'path' in file_data and request:
-                        file_path = file_data['path']
-                        if file_path.startswith('/media/'):
-                            file_data['url'] = request.build_absolute_uri(file_path)
-                    documents_with_urls[doc_type].append(file_data)
-        
-        return documents_with_urls
+        return media_resolver(self.context.get('request')).document_groups(obj.documents)
     
     def get_required_documents(self, obj):
         if obj.technic_type:
@@ -359,16 +333,8 @@ class UserTechnicSerializer(serializers.ModelSerializer):
             technic_type = technic_type if technic_type is not None else self.instance.technic_type
             custom_type = custom_type if custom_type else self.instance.custom_type
 
-        # Визначаємо чи це "Баштовий кран"
-        is_tower_crane = False
-        if technic_type:
-            is_tower_crane = technic_type.name == 'Баштовий кран'
-
-        # Перевіряємо обов'язковість реєстраційного номера
-        # Номер НЕ обов'язковий для: 1) Баштового крана, 2) Кастомних типів
-        is_custom = custom_type and not technic_type
-
-        if not is_tower_crane and not is_custom and not registration_number:
+        # Номер НЕ обов'язковий для Баштового крана і кастомних типів
+        if UserTechnic.requires_registration_number(technic_type, custom_type) and not registration_number:
             raise serializers.ValidationError({
                 'registration_number': "Поле 'Державний реєстраційний номер' є обов'язковим для заповнення"
             })
@@ -410,24 +376,7 @@ class UserInstrumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
     
     def get_documents_info(self, obj):
-        if not obj.documents:
-            return {}
-        
-        request = self.context.get('request')
-        documents_with_urls = {}
-        
-        for doc_type, files in obj.documents.items():
-            if isinstance(files, list):
-                documents_with_urls[doc_type] = []
-                for file_info in files:
-                    file_data = file_info.copy()
-                    if 'path' in file_data and request:
-                        file_path = file_data['path']
-                        if file_path.startswith('/media/'):
-                            file_data['url'] = request.build_absolute_uri(file_path)
-                    documents_with_urls[doc_type].append(file_data)
-        
-        return documents_with_urls
+        return media_resolver(self.context.get('request')).document_groups(obj.documents)
     
     def get_required_documents(self, obj):
         if obj.instrument_type:
@@ -454,27 +403,92 @@ class UserPPESerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
     
     def get_documents_info(self, obj):
-        if not obj.documents:
-            return []
-        
-        request = self.context.get('request')
-        documents_with_urls = []
-        
-        for doc in obj.documents:
-            doc_info = doc.copy()
-            if 'path' in doc_info and request:
-                file_path = doc_info['path']
-                if file_path.startswith('/media/'):
-                    doc_info['url'] = request.build_absolute_uri(file_path)
-            documents_with_urls.append(doc_info)
-        
-        return documents_with_urls
+        return media_resolver(self.context.get('request')).document_list(obj.documents)
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
 
+# ===================================================================
+# ЛЕГКІ СЕРІАЛІЗАТОРИ АДМІН-СПИСКІВ (тільки читання, рядки .values())
+# Вихід збігається з відповідними ModelSerializer вище
+
+class UserSpecificationRowSerializer(RowSerializer):
+    model = UserSpecification
+    fields = UserSpecificationSerializer.Meta.fields
+
+
+class UserEmployeeRowSerializer(RowSerializer):
+    model = UserEmployee
+    fields = UserEmployeeSerializer.Meta.fields
+    sources = {
+        'photo_url': 'photo',
+        'qualification_certificate_url': 'qualification_certificate',
+        'safety_training_certificate_url': 'safety_training_certificate',
+        'special_training_certificate_url': 'special_training_certificate',
+    }
+
+
+class UserOrderRowSerializer(RowSerializer):
+    model = UserOrder
+    fields = UserOrderSerializer.Meta.fields
+    order_type_labels = {value: str(label) for value, label in UserOrder.ORDER_TYPES}
+
+    def get_order_type_display(self, row):
+        return self.order_type_labels.get(row['order_type'], row['order_type'])
+
+    def get_display_title(self, row):
+        if row['order_type'] == 'custom' and row['custom_title']:
+            return row['custom_title']
+        return self.get_order_type_display(row)
+
+    def get_documents_info(self, row):
+        return self.media.document_list(row['documents'])
+
+
+class UserTechnicRowSerializer(RowSerializer):
+    model = UserTechnic
+    fields = UserTechnicSerializer.Meta.fields
+    sources = {'technic_type': 'technic_type_id', 'technic_type_name': 'technic_type__name'}
+    extra_columns = ['technic_type__required_documents']
+    omit_if_none = ['technic_type_name']
+
+    def get_display_name(self, row):
+        return row['technic_type__name'] if row['technic_type_id'] else row['custom_type']
+
+    def get_documents_info(self, row):
+        return self.media.document_groups(row['documents'])
+
+    def get_required_documents(self, row):
+        return row['technic_type__required_documents'] if row['technic_type_id'] else []
+
+
+class UserInstrumentRowSerializer(RowSerializer):
+    model = UserInstrument
+    fields = UserInstrumentSerializer.Meta.fields
+    sources = {'instrument_type': 'instrument_type_id', 'instrument_type_name': 'instrument_type__name'}
+    extra_columns = ['instrument_type__required_documents']
+    omit_if_none = ['instrument_type_name']
+
+    def get_display_name(self, row):
+        return row['instrument_type__name'] if row['instrument_type_id'] else row['custom_type']
+
+    def get_documents_info(self, row):
+        return self.media.document_groups(row['documents'])
+
+    def get_required_documents(self, row):
+        return row['instrument_type__required_documents'] if row['instrument_type_id'] else []
+
+
+class UserPPERowSerializer(RowSerializer):
+    model = UserPPE
+    fields = UserPPESerializer.Meta.fields
+
+    def get_documents_info(self, row):
+        return self.media.document_list(row['documents'])
+
+
 # ===================================================================
 # ІНШІ СЕРІАЛІЗАТОРИ (роботи, аутентифікація тощо)
 
@@ -577,8 +591,4 @@ class PermitSerializer(serializers.ModelSerializer):
         return obj.technic.display_name if obj.technic else "Невідомо"
     
     def get_pdf_url(self, obj):
-        if obj.pdf_file:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.pdf_file.url)
-        return None
\ No newline at end of file
+        return media_resolver(self.context.get('request')).file_url(obj.pdf_file)
\ No newline at end of file
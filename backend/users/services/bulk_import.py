@@ -0,0 +1,496 @@
+# users/services/bulk_import.py
+"""
+Масовий імпорт з CSV/XLSX (+ необов'язковий ZIP з файлами).
+
+Всі рядки перевіряються одним проходом, помилки повертаються по рядках.
+Якщо є хоча б одна помилка - нічого не створюється. Інакше файли з архіву
+зберігаються у сховище, а записи створюються через bulk_create пакетами.
+"""
+import csv
+import difflib
+import hashlib
+import io
+import os
+import re
+import zipfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import InstrumentType, TechnicType, UserEmployee, UserInstrument, UserTechnic
+from users.signals import bulk_created
+
+from .documents import parse_expiry_date, sign_digest
+from .readiness import required_names
+
+BATCH_SIZE = 500
+MAX_ROWS = 5000
+MAX_ATTACHMENT_SIZE = 20 * 1024 * 1024  # 20MB на файл з архіву
+ALLOWED_ATTACHMENT_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.webp', '.doc', '.docx'}
+TABLE_EXTENSIONS = {'.csv', '.xlsx'}
+
+
+class ImportFileError(Exception):
+    """Файл не вдалося прочитати взагалі (формат, кодування, порожній)"""
+
+
+def normalize_header(value):
+    return ' '.join(str(value or '').replace('*', ' ').split()).casefold()
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return value if hasattr(value, 'year') else str(value).strip()
+
+
+def _read_csv(uploaded_file):
+    raw = uploaded_file.read()
+    for encoding in ('utf-8-sig', 'cp1251'):
+        try:
+            text = raw.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ImportFileError('Не вдалося визначити кодування CSV (очікується UTF-8 або Windows-1251)')
+
+    first_line = text.split('\n', 1)[0]
+    delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+    return csv.reader(io.StringIO(text, newline=''), delimiter=delimiter)
+
+
+def _read_xlsx(uploaded_file):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError('Імпорт XLSX недоступний на сервері, завантажте CSV')
+    try:
+        workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError('Не вдалося відкрити XLSX файл')
+    return workbook.active.iter_rows(values_only=True)
+
+
+def read_table(uploaded_file):
+    """
+    Повертає (заголовки, [(номер_рядка, [комірки])]).
+    Номер рядка - як у таблиці (заголовок = 1), щоб користувач знайшов помилку.
+    """
+    extension = os.path.splitext(uploaded_file.name or '')[1].lower()
+    if extension not in TABLE_EXTENSIONS:
+        raise ImportFileError('Підтримуються тільки файли CSV та XLSX')
+
+    reader = _read_csv(uploaded_file) if extension == '.csv' else _read_xlsx(uploaded_file)
+    headers = None
+    rows = []
+    for line_number, values in enumerate(reader, start=1):
+        values = [_cell(v) for v in values]
+        if not any(v != '' for v in values):
+            continue
+        if headers is None:
+            headers = [str(v) for v in values]
+            continue
+        rows.append((line_number, values))
+        if len(rows) > MAX_ROWS:
+            raise ImportFileError(f'Забагато рядків (максимум {MAX_ROWS})')
+
+    if headers is None:
+        raise ImportFileError('Файл порожній')
+    return headers, rows
+
+
+def map_columns(headers, columns):
+    """columns - {поле: (варіанти заголовку)}; повертає {поле: індекс_колонки}"""
+    lookup = {}
+    for field_name, aliases in columns.items():
+        for alias in (field_name,) + tuple(aliases):
+            lookup[normalize_header(alias)] = field_name
+    mapping = {}
+    for index, header in enumerate(headers):
+        field_name = lookup.get(normalize_header(header))
+        if field_name and field_name not in mapping:
+            mapping[field_name] = index
+    return mapping
+
+
+class AttachmentArchive:
+    """ZIP з файлами, на які посилаються рядки таблиці (за іменем файлу)"""
+
+    def __init__(self, uploaded_file):
+        self.saved = []
+        self._stored = {}
+        if uploaded_file is None:
+            self.zip = None
+            self.index = {}
+            return
+        try:
+            self.zip = zipfile.ZipFile(uploaded_file)
+        except zipfile.BadZipFile:
+            raise ImportFileError('Архів з файлами пошкоджений або не є ZIP')
+        self.index = {}
+        for info in self.zip.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or info.filename.startswith('__MACOSX'):
+                continue
+            self.index[name.casefold()] = info
+
+    def check(self, reference):
+        """Повертає текст помилки або None"""
+        name = os.path.basename(str(reference).replace('\\', '/'))
+        info = self.index.get(name.casefold())
+        if info is None:
+            return f'Файл "{name}" не знайдено в архіві'
+        if os.path.splitext(name)[1].lower() not in ALLOWED_ATTACHMENT_EXTENSIONS:
+            return f'Недопустимий тип файлу "{name}"'
+        if info.file_size > MAX_ATTACHMENT_SIZE:
+            return f'Файл "{name}" завеликий (максимум {MAX_ATTACHMENT_SIZE // (1024 * 1024)}MB)'
+        return None
+
+    def store(self, instance, field_name, reference):
+        """Зберігає файл з архіву за upload_to поля і прив'язує до екземпляра"""
+        info = self.index[os.path.basename(str(reference).replace('\\', '/')).casefold()]
+        key = (instance.user_id, field_name, info.filename)
+        if key not in self._stored:
+            field = instance._meta.get_field(field_name)
+            filename = field.generate_filename(instance, os.path.basename(info.filename))
+            stored_name = default_storage.save(filename, ContentFile(self.zip.read(info)))
+            self.saved.append(stored_name)
+            self._stored[key] = stored_name
+        setattr(instance, field_name, self._stored[key])
+
+    def store_document(self, instance, folder, document_type, reference):
+        """Зберігає файл документу і додає його в JSON documents ({тип: [файли]})"""
+        info = self.index[os.path.basename(str(reference).replace('\\', '/')).casefold()]
+        name = os.path.basename(info.filename)
+        content = self.zip.read(info)
+        stored_name = default_storage.save(
+            f'tenders/tender_{instance.user.tender_number}/{folder}/{name}', ContentFile(content)
+        )
+        self.saved.append(stored_name)
+        path = f'{settings.MEDIA_URL}{stored_name}'
+        digest = hashlib.sha256(content).hexdigest()
+        instance.documents.setdefault(document_type, []).append({
+            'name': name,
+            'original_name': name,
+            'path': path,
+            'size': info.file_size,
+            'document_type': document_type,
+            'digest': digest,
+            'digest_signature': sign_digest(path, digest),
+        })
+
+    def rollback(self):
+        for name in self.saved:
+            default_storage.delete(name)
+        self.saved = []
+
+
+def _bulk_create(model, instances):
+    created = []
+    for start in range(0, len(instances), BATCH_SIZE):
+        created.extend(model.objects.bulk_create(instances[start:start + BATCH_SIZE]))
+    return created
+
+
+def run_import(model, instances, attachments, archive, documents=(), folder=''):
+    """
+    Зберігає файли та створює записи в одній транзакції.
+    attachments - [(екземпляр, поле, посилання_на_файл)] для FileField,
+    documents - [(екземпляр, тип_документу, посилання_на_файл)] для JSON documents.
+    """
+    try:
+        with transaction.atomic():
+            for instance, field_name, reference in attachments:
+                archive.store(instance, field_name, reference)
+            for instance, document_type, reference in documents:
+                archive.store_document(instance, folder, document_type, reference)
+            created = _bulk_create(model, instances)
+            bulk_created.send(sender=model, instances=created)
+    except Exception:
+        archive.rollback()
+        raise
+    return created
+
+
+# ===================================================================
+# Співробітники
+
+EMPLOYEE_COLUMNS = {
+    'name': ('ПІБ', 'ПІБ співробітника', "Прізвище, ім'я, по батькові", 'Співробітник'),
+    'position': ('Посада',),
+    'organization_name': ('Організація', 'Назва організації що проводила медогляд', 'Заклад медогляду'),
+    'medical_exam_date': ('Медогляд', 'Дата медогляду'),
+    'qualification_expiry_date': ('Кваліфікація до', 'Термін дії кваліфікаційного посвідчення'),
+    'safety_training_date': ('Охорона праці', 'Дата навчання з охорони праці'),
+    'special_training_date': ('Спецнавчання', 'Дата спеціального навчання'),
+    'photo': ('Фото', 'Фото співробітника'),
+    'qualification_certificate': ('Посвідчення кваліфікації', 'Файл кваліфікації'),
+    'safety_training_certificate': ('Посвідчення з охорони праці', 'Файл охорони праці'),
+    'special_training_certificate': ('Посвідчення спеціального навчання', 'Файл спецнавчання'),
+}
+
+# Як у UserEmployeeSerializer.validate - всі дати є термінами закінчення
+EMPLOYEE_DATE_FIELDS = [
+    'medical_exam_date', 'qualification_expiry_date', 'safety_training_date', 'special_training_date'
+]
+EMPLOYEE_FILE_FIELDS = [
+    'photo', 'qualification_certificate', 'safety_training_certificate', 'special_training_certificate'
+]
+EMPLOYEE_TEXT_FIELDS = ['name', 'position', 'organization_name']
+
+
+def import_employees(user, table_file, archive_file=None):
+    """
+    Повертає {'created': [UserEmployee], 'errors': [{'row', 'field', 'error'}]}.
+    Помилки формату файлу піднімаються як ImportFileError.
+    """
+    headers, rows = read_table(table_file)
+    columns = map_columns(headers, EMPLOYEE_COLUMNS)
+    if 'name' not in columns:
+        raise ImportFileError('Не знайдено колонку "ПІБ"')
+    archive = AttachmentArchive(archive_file)
+
+    today = timezone.localdate()
+    max_lengths = {name: UserEmployee._meta.get_field(name).max_length for name in EMPLOYEE_TEXT_FIELDS}
+    errors = []
+    instances = []
+    attachments = []
+
+    for line_number, values in rows:
+        def value(field_name):
+            index = columns.get(field_name)
+            return values[index] if index is not None and index < len(values) else ''
+
+        row_errors = []
+        data = {}
+        for field_name in EMPLOYEE_TEXT_FIELDS:
+            text = str(value(field_name))
+            if len(text) > max_lengths[field_name]:
+                row_errors.append((field_name, f'Не більше {max_lengths[field_name]} символів'))
+            data[field_name] = text
+        if not data['name']:
+            row_errors.append(('name', "Обов'язкове поле"))
+
+        for field_name in EMPLOYEE_DATE_FIELDS:
+            raw = value(field_name)
+            if raw == '':
+                data[field_name] = None
+                continue
+            parsed = parse_expiry_date(raw)
+            if parsed is None:
+                row_errors.append((field_name, 'Невірний формат дати (очікується ДД.ММ.РРРР)'))
+            elif parsed <= today:
+                row_errors.append((field_name, 'Термін дії має бути в майбутньому'))
+            data[field_name] = parsed
+
+        row_files = []
+        for field_name in EMPLOYEE_FILE_FIELDS:
+            reference = value(field_name)
+            if reference == '':
+                continue
+            error = archive.check(reference) if archive.zip else 'Файл вказано, але архів не завантажено'
+            if error:
+                row_errors.append((field_name, error))
+            else:
+                row_files.append((field_name, reference))
+
+        if row_errors:
+            errors.extend({'row': line_number, 'field': f, 'error': e} for f, e in row_errors)
+            continue
+        instance = UserEmployee(user=user, **data)
+        instances.append(instance)
+        attachments.extend((instance, field_name, reference) for field_name, reference in row_files)
+
+    if not rows:
+        errors.append({'row': None, 'field': None, 'error': 'Файл не містить жодного рядка з даними'})
+    if errors:
+        return {'created': [], 'errors': errors}
+
+    return {'created': run_import(UserEmployee, instances, attachments, archive), 'errors': []}
+
+
+# ===================================================================
+# Техніка та інструменти
+
+# Латинські літери, що виглядають як кириличні (часто трапляються в Excel)
+HOMOGLYPHS = str.maketrans({
+    'a': 'а', 'c': 'с', 'e': 'е', 'i': 'і', 'k': 'к', 'm': 'м', 'o': 'о',
+    'p': 'р', 't': 'т', 'x': 'х', 'y': 'у', 'h': 'н', 'b': 'в',
+    '’': "'", 'ʼ': "'", '`': "'", '«': '"', '»': '"', '–': '-', '—': '-',
+})
+
+FUZZY_CUTOFF = 0.85
+
+
+def normalize_name(value):
+    return ' '.join(str(value or '').casefold().translate(HOMOGLYPHS).split())
+
+
+class TypeMatcher:
+    """
+    Індекс назв типів у пам'яті (один запит на весь імпорт).
+    Спочатку точний збіг після нормалізації, потім найближчий за difflib.
+    Неточний збіг має містити ті самі числа: "Автокран 35т" не стає "Автокран 50т".
+    """
+
+    def __init__(self, types, cutoff=FUZZY_CUTOFF):
+        self.cutoff = cutoff
+        self.by_key = {}
+        for item in types:
+            self.by_key.setdefault(normalize_name(item.name), item)
+        self._cache = {}
+
+    def match(self, name):
+        """Повертає (тип або None, чи_неточний_збіг)"""
+        key = normalize_name(name)
+        if key not in self._cache:
+            if key in self.by_key:
+                self._cache[key] = (self.by_key[key], False)
+            else:
+                numbers = re.findall(r'\d+', key)
+                close = [
+                    candidate
+                    for candidate in difflib.get_close_matches(key, self.by_key, n=3, cutoff=self.cutoff)
+                    if re.findall(r'\d+', candidate) == numbers
+                ]
+                self._cache[key] = (self.by_key[close[0]], True) if close else (None, False)
+        return self._cache[key]
+
+
+def split_references(value):
+    """Кілька файлів в одній комірці розділяються ; | або новим рядком"""
+    for separator in ('|', '\n'):
+        value = str(value).replace(separator, ';')
+    return [part.strip() for part in value.split(';') if part.strip()]
+
+
+def _import_assets(user, table_file, archive_file, model, type_model, type_field, columns, folder):
+    """
+    Спільна логіка для техніки та інструментів.
+    Колонки, що не відповідають полям, вважаються колонками документів:
+    заголовок - тип документу, значення - файли з архіву.
+    """
+    headers, rows = read_table(table_file)
+    mapping = map_columns(headers, columns)
+    if 'type' not in mapping:
+        raise ImportFileError(f'Не знайдено колонку "{columns["type"][0]}"')
+    archive = AttachmentArchive(archive_file)
+    matcher = TypeMatcher(type_model.objects.filter(is_active=True))
+    document_columns = [
+        (index, header.strip())
+        for index, header in enumerate(headers)
+        if index not in mapping.values() and header.strip()
+    ]
+
+    has_registration = 'registration_number' in columns
+    reg_max_length = model._meta.get_field('registration_number').max_length if has_registration else None
+    custom_max_length = model._meta.get_field('custom_type').max_length
+    seen_numbers = {}
+    if has_registration:
+        for number in (
+            model.objects.filter(user=user).exclude(registration_number='')
+            .values_list('registration_number', flat=True)
+        ):
+            seen_numbers[normalize_name(number)] = None
+
+    errors, warnings = [], []
+    instances, documents = [], []
+
+    for line_number, values in rows:
+        def value(field_name):
+            index = mapping.get(field_name)
+            return values[index] if index is not None and index < len(values) else ''
+
+        row_errors = []
+        raw_type = str(value('type'))
+        asset_type, fuzzy = matcher.match(raw_type) if raw_type else (None, False)
+        custom_type = '' if asset_type else raw_type
+        if not raw_type:
+            row_errors.append(('type', "Обов'язкове поле"))
+        elif len(custom_type) > custom_max_length:
+            row_errors.append(('type', f'Не більше {custom_max_length} символів'))
+        if fuzzy:
+            warnings.append({'row': line_number, 'field': 'type', 'value': raw_type, 'matched': asset_type.name})
+
+        data = {type_field: asset_type, 'custom_type': custom_type}
+        if has_registration:
+            number = str(value('registration_number')).strip()
+            key = normalize_name(number)
+            if model.requires_registration_number(asset_type, custom_type) and not number:
+                row_errors.append((
+                    'registration_number',
+                    "Поле 'Державний реєстраційний номер' є обов'язковим для заповнення"
+                ))
+            elif len(number) > reg_max_length:
+                row_errors.append(('registration_number', f'Не більше {reg_max_length} символів'))
+            elif number and key in seen_numbers:
+                duplicate_row = seen_numbers[key]
+                row_errors.append((
+                    'registration_number',
+                    f'Номер повторюється (рядок {duplicate_row})' if duplicate_row else 'Техніка з таким номером вже додана'
+                ))
+            elif number:
+                seen_numbers[key] = line_number
+            data['registration_number'] = number
+
+        required = {
+            normalize_name(name): name
+            for name in required_names(asset_type.required_documents if asset_type else None)
+        }
+        row_documents = []
+        for index, header in document_columns:
+            cell = values[index] if index < len(values) else ''
+            if cell == '':
+                continue
+            document_type = required.get(normalize_name(header), header)
+            for reference in split_references(cell):
+                error = archive.check(reference) if archive.zip else 'Файл вказано, але архів не завантажено'
+                if error:
+                    row_errors.append((header, error))
+                else:
+                    row_documents.append((document_type, reference))
+
+        if row_errors:
+            errors.extend({'row': line_number, 'field': f, 'error': e} for f, e in row_errors)
+            continue
+        instance = model(user=user, documents={}, **data)
+        instances.append(instance)
+        documents.extend((instance, document_type, reference) for document_type, reference in row_documents)
+
+    if not rows:
+        errors.append({'row': None, 'field': None, 'error': 'Файл не містить жодного рядка з даними'})
+    if errors:
+        return {'created': [], 'errors': errors, 'warnings': warnings}
+
+    created = run_import(model, instances, [], archive, documents=documents, folder=folder)
+    return {'created': created, 'errors': [], 'warnings': warnings}
+
+
+TECHNIC_COLUMNS = {
+    'type': ('Тип техніки', 'Тип', 'Назва техніки'),
+    'registration_number': ('Державний реєстраційний номер', 'Реєстраційний номер', 'Держномер', 'Номер'),
+}
+
+INSTRUMENT_COLUMNS = {
+    'type': ('Вид інструменту', 'Тип інструменту', 'Тип', 'Назва інструменту'),
+}
+
+
+def import_technics(user, table_file, archive_file=None):
+    """Як import_employees, плюс 'warnings' - неточні збіги типу техніки"""
+    return _import_assets(
+        user, table_file, archive_file, UserTechnic, TechnicType, 'technic_type', TECHNIC_COLUMNS, 'technics'
+    )
+
+
+def import_instruments(user, table_file, archive_file=None):
+    return _import_assets(
+        user, table_file, archive_file, UserInstrument, InstrumentType, 'instrument_type',
+        INSTRUMENT_COLUMNS, 'instruments'
+    )
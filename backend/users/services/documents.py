@@ -0,0 +1,268 @@
+# users/services/documents.py
+"""
+Нормалізація JSON полів documents у таблицю DocumentFile.
+
+UserOrder/UserPPE зберігають список файлів, UserTechnic/UserInstrument -
+словник {тип_документу: [файли]}. Кожен файл стає окремим рядком DocumentFile,
+щоб пошук по типу, терміну дії чи хешу йшов індексованим SQL.
+
+SHA-256 файлів рахується після коміту транзакції (schedule_digests), а не під час
+збереження власника; доти digest порожній. Наявні дані - команда backfill_document_digests.
+"""
+import hashlib
+import os
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+
+# Тип власника -> поле з JSON документами
+OWNER_MODELS = {
+    'order': 'UserOrder',
+    'technic': 'UserTechnic',
+    'instrument': 'UserInstrument',
+    'ppe': 'UserPPE',
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ')
+
+# Поля рядка DocumentFile, за якими sync_document_files порівнює наявні рядки з JSON
+ROW_FIELDS = ('user_id', 'document_type', 'name', 'path', 'size', 'digest', 'expiry_date')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+DIGEST_SALT = 'users.documents.digest'
+
+
+def owner_type_for(instance):
+    """Повертає тип власника для екземпляра моделі або None"""
+    model_name = instance.__class__.__name__
+    for owner_type, name in OWNER_MODELS.items():
+        if name == model_name:
+            return owner_type
+    return None
+
+
+def normalize_media_path(path):
+    """Приводить шлях до вигляду /media/... (фронтенд інколи зберігає повний URL)"""
+    if not path or not isinstance(path, str):
+        return ''
+    media_url = settings.MEDIA_URL
+    if not path.startswith(media_url) and media_url in path:
+        return path[path.index(media_url):]
+    return path
+
+
+def media_path_to_file(path):
+    """Шлях /media/... -> абсолютний шлях на диску (або None)"""
+    media_url = settings.MEDIA_URL
+    if not path or not path.startswith(media_url):
+        return None
+    relative = path[len(media_url):]
+    full_path = os.path.normpath(os.path.join(settings.MEDIA_ROOT, relative))
+    if not full_path.startswith(os.path.normpath(str(settings.MEDIA_ROOT))):
+        return None
+    return full_path
+
+
+def file_digest(path):
+    """SHA-256 файлу за шляхом /media/...; порожній рядок якщо файлу немає"""
+    full_path = media_path_to_file(path)
+    if not full_path or not os.path.isfile(full_path):
+        return ''
+    digest = hashlib.sha256()
+    try:
+        with open(full_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return ''
+    return digest.hexdigest()
+
+
+def sign_digest(path, digest):
+    """Підпис хешу, порахованого сервером (upload-document, імпорт) - зберігається поруч з digest у JSON"""
+    return signing.Signer(salt=DIGEST_SALT).signature(f'{normalize_media_path(path)}:{digest}')
+
+
+def trusted_digest(file_info, path):
+    """digest з JSON документів, лише якщо його підписав сервер для цього шляху; інакше None"""
+    digest = file_info.get('digest')
+    signature = file_info.get('digest_signature')
+    if not isinstance(digest, str) or not isinstance(signature, str) or not digest or not signature:
+        return None
+    return digest if constant_time_compare(signature, sign_digest(path, digest)) else None
+
+
+def parse_expiry_date(value):
+    """Розбирає дату терміну дії з JSON (ISO або дд.мм.рррр)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_size(value):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return None
+    return size if size >= 0 else None
+
+
+def iter_document_entries(documents):
+    """
+    Перебирає файли з JSON поля documents.
+    Повертає пари (тип_документу, dict_файлу) для списку і для словника.
+    """
+    if isinstance(documents, dict):
+        for doc_type, files in documents.items():
+            if isinstance(files, list):
+                for file_info in files:
+                    if isinstance(file_info, dict):
+                        yield str(doc_type), file_info
+    elif isinstance(documents, list):
+        for file_info in documents:
+            if isinstance(file_info, dict):
+                yield file_info.get('document_type') or '', file_info
+
+
+def build_document_rows(owner_type, owner_id, user_id, documents, known_digests=None):
+    """
+    Будує kwargs для DocumentFile з JSON документів; файли тут не читаються.
+    digest - підписаний сервером з JSON або з known_digests ({шлях: sha256} вже
+    проіндексованих файлів), інакше порожній: його дораховує fill_missing_digests.
+    digest з JSON приймається лише з підписом сервера - клієнт може записати туди будь-що.
+    """
+    if known_digests is None:
+        known_digests = {}
+    rows = []
+    for doc_type, file_info in iter_document_entries(documents):
+        path = normalize_media_path(file_info.get('path') or file_info.get('url') or '')
+        if not path:
+            continue
+        rows.append({
+            'user_id': user_id,
+            'owner_type': owner_type,
+            'owner_id': owner_id,
+            'document_type': doc_type[:500],
+            'name': (file_info.get('name') or file_info.get('original_name') or file_info.get('filename') or '')[:500],
+            'path': path[:1000],
+            'size': parse_size(file_info.get('size')),
+            'digest': trusted_digest(file_info, path) or known_digests.get(path, ''),
+            'expiry_date': parse_expiry_date(file_info.get('expiry_date')),
+        })
+    return rows
+
+
+def _row_key(row):
+    return tuple(row[field] for field in ROW_FIELDS)
+
+
+def sync_document_files(instance):
+    """
+    Узгоджує рядки DocumentFile наказу/техніки/інструменту/ЗІЗ з його JSON documents:
+    незмінені файли лишаються, видаляються і створюються лише відмінні рядки.
+    """
+    from users.models import DocumentFile
+
+    owner_type = owner_type_for(instance)
+    if owner_type is None:
+        return []
+
+    existing = list(
+        DocumentFile.objects.filter(owner_type=owner_type, owner_id=instance.pk).values('pk', *ROW_FIELDS)
+    )
+    known_digests = {row['path']: row['digest'] for row in existing if row['digest']}
+    paths = [
+        normalize_media_path(info.get('path') or info.get('url') or '')
+        for _, info in iter_document_entries(instance.documents)
+    ]
+    missing = [p for p in paths if p and p not in known_digests]
+    if missing:
+        # Той самий файл міг бути вже проіндексований в іншого власника
+        known_digests.update(
+            DocumentFile.objects.filter(path__in=missing)
+            .exclude(digest='')
+            .values_list('path', 'digest')
+        )
+
+    # Однакові рядки (той самий файл двічі) зіставляються поштучно
+    unmatched = {}
+    for row in existing:
+        unmatched.setdefault(_row_key(row), []).append(row['pk'])
+    to_create = []
+    for row in build_document_rows(owner_type, instance.pk, instance.user_id, instance.documents, known_digests):
+        pks = unmatched.get(_row_key(row))
+        if pks:
+            pks.pop()
+        else:
+            to_create.append(DocumentFile(**row))
+
+    stale = [pk for pks in unmatched.values() for pk in pks]
+    if stale:
+        DocumentFile.objects.filter(pk__in=stale).delete()
+    created = DocumentFile.objects.bulk_create(to_create)
+    schedule_digests(created)
+    return created
+
+
+def fill_missing_digests(document_file_ids):
+    """
+    Хешує файли рядків DocumentFile з порожнім digest - кожен шлях один раз;
+    хеш отримують і інші рядки з тим самим шляхом. Повертає кількість оновлених рядків.
+    """
+    from users.models import DocumentFile
+
+    paths = (
+        DocumentFile.objects.filter(pk__in=document_file_ids, digest='')
+        .values_list('path', flat=True)
+        .distinct()
+    )
+    updated = 0
+    for path in list(paths):
+        digest = file_digest(path)
+        if digest:
+            updated += DocumentFile.objects.filter(path=path, digest='').update(digest=digest)
+    return updated
+
+
+def schedule_digests(document_files):
+    """Хешування нових файлів після коміту: не в транзакції і не під її блокуваннями"""
+    pks = [document_file.pk for document_file in document_files if not document_file.digest]
+    if pks:
+        transaction.on_commit(lambda: fill_missing_digests(pks))
+
+
+def delete_document_files(instance):
+    from users.models import DocumentFile
+
+    owner_type = owner_type_for(instance)
+    if owner_type is not None:
+        DocumentFile.objects.filter(owner_type=owner_type, owner_id=instance.pk).delete()
+
+
+def bulk_create_document_files(instances):
+    """DocumentFile для щойно створених власників (масовий імпорт) одним bulk_create"""
+    from users.models import DocumentFile
+
+    rows = []
+    for instance in instances:
+        owner_type = owner_type_for(instance)
+        if owner_type is not None:
+            rows.extend(build_document_rows(owner_type, instance.pk, instance.user_id, instance.documents))
+    created = DocumentFile.objects.bulk_create([DocumentFile(**row) for row in rows], batch_size=1000)
+    schedule_digests(created)
+    return created
@@ -0,0 +1,294 @@
+# users/services/expiry.py
+"""
+Індекс термінів дії (ExpiryRecord).
+
+Терміни живуть у різних місцях: UserWork.expiry_date, дати співробітника
+(медогляд, кваліфікація, охорона праці, спецнавчання) та expiry_date у JSON
+документах техніки/інструментів. Тут вони зводяться в одну таблицю, щоб
+пошук "що закінчується в найближчі N днів" був одним діапазонним запитом.
+"""
+from django.apps import apps as django_apps
+
+from .documents import OWNER_MODELS
+
+# Поле співробітника -> назва документу
+EMPLOYEE_DATE_FIELDS = [
+    ('medical_exam_date', 'Медичний огляд'),
+    ('qualification_expiry_date', 'Кваліфікаційне посвідчення'),
+    ('safety_training_date', 'Посвідчення з охорони праці'),
+    ('special_training_date', 'Посвідчення спеціального навчання'),
+]
+
+BATCH_SIZE = 1000
+
+# Горизонт "скоро закінчується" за замовчуванням (дайджест, адмінка)
+EXPIRY_WARNING_DAYS = 30
+
+
+def employee_rows(employee, department_id):
+    rows = []
+    for field_name, kind in EMPLOYEE_DATE_FIELDS:
+        expiry_date = getattr(employee, field_name)
+        if expiry_date:
+            rows.append({
+                'user_id': employee.user_id,
+                'department_id': department_id,
+                'source_type': 'employee',
+                'source_id': employee.pk,
+                'kind': kind,
+                'title': employee.name[:500],
+                'expiry_date': expiry_date,
+            })
+    return rows
+
+
+def work_rows(work, department_id, title):
+    if not work.expiry_date:
+        return []
+    return [{
+        'user_id': work.user_id,
+        'department_id': department_id,
+        'source_type': 'work',
+        'source_id': work.pk,
+        'kind': 'Дозвіл на роботи',
+        'title': (title or '')[:500],
+        'expiry_date': work.expiry_date,
+    }]
+
+
+def document_rows(owner_type, owner_id, user_id, department_id, title, files):
+    """files - ітерабельне з (document_type, name, expiry_date)"""
+    rows = []
+    for document_type, name, expiry_date in files:
+        if expiry_date:
+            rows.append({
+                'user_id': user_id,
+                'department_id': department_id,
+                'source_type': owner_type,
+                'source_id': owner_id,
+                'kind': (document_type or name or 'Документ')[:500],
+                'title': (title or '')[:500],
+                'expiry_date': expiry_date,
+            })
+    return rows
+
+
+def owner_title(instance):
+    """Назва власника документів для дайджесту"""
+    if hasattr(instance, 'display_title'):
+        return instance.display_title
+    if hasattr(instance, 'display_name'):
+        return instance.display_name or ''
+    return 'ЗІЗ'
+
+
+def _department_id(user_id):
+    User = django_apps.get_model('users', 'User')
+    return User.objects.filter(pk=user_id).values_list('department_id', flat=True).first()
+
+
+def _replace(source_type, source_id, rows):
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    ExpiryRecord.objects.filter(source_type=source_type, source_id=source_id).delete()
+    if rows:
+        ExpiryRecord.objects.bulk_create([ExpiryRecord(**row) for row in rows])
+
+
+def index_employee(employee):
+    _replace('employee', employee.pk, employee_rows(employee, _department_id(employee.user_id)))
+
+
+def index_employees(employees):
+    """Те саме що index_employee, але для пакету (масовий імпорт)"""
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    User = django_apps.get_model('users', 'User')
+    if not employees:
+        return
+    departments = dict(
+        User.objects.filter(pk__in={e.user_id for e in employees}).values_list('pk', 'department_id')
+    )
+    ExpiryRecord.objects.filter(source_type='employee', source_id__in=[e.pk for e in employees]).delete()
+    ExpiryRecord.objects.bulk_create(
+        [
+            ExpiryRecord(**row)
+            for employee in employees
+            for row in employee_rows(employee, departments.get(employee.user_id))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def index_work(work):
+    _replace('work', work.pk, work_rows(work, _department_id(work.user_id), work.work_sub_type.name))
+
+
+def index_document_owner(instance, owner_type):
+    """Перебудовує терміни документів наказу/техніки/інструменту/ЗІЗ з DocumentFile"""
+    DocumentFile = django_apps.get_model('users', 'DocumentFile')
+    files = (
+        DocumentFile.objects
+        .filter(owner_type=owner_type, owner_id=instance.pk, expiry_date__isnull=False)
+        .values_list('document_type', 'name', 'expiry_date')
+    )
+    rows = document_rows(
+        owner_type, instance.pk, instance.user_id, _department_id(instance.user_id),
+        owner_title(instance), files
+    )
+    _replace(owner_type, instance.pk, rows)
+
+
+def index_document_owners(instances, owner_type):
+    """Пакетна версія index_document_owner (після bulk_create_document_files)"""
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    DocumentFile = django_apps.get_model('users', 'DocumentFile')
+    User = django_apps.get_model('users', 'User')
+    if not instances:
+        return
+    owners = {instance.pk: instance for instance in instances}
+    departments = dict(
+        User.objects.filter(pk__in={i.user_id for i in instances}).values_list('pk', 'department_id')
+    )
+    files = {}
+    for owner_id, document_type, name, expiry_date in (
+        DocumentFile.objects
+        .filter(owner_type=owner_type, owner_id__in=list(owners), expiry_date__isnull=False)
+        .values_list('owner_id', 'document_type', 'name', 'expiry_date')
+    ):
+        files.setdefault(owner_id, []).append((document_type, name, expiry_date))
+
+    ExpiryRecord.objects.filter(source_type=owner_type, source_id__in=list(owners)).delete()
+    ExpiryRecord.objects.bulk_create(
+        [
+            ExpiryRecord(**row)
+            for owner_id, owner_files in files.items()
+            for row in document_rows(
+                owner_type, owner_id, owners[owner_id].user_id,
+                departments.get(owners[owner_id].user_id), owner_title(owners[owner_id]), owner_files
+            )
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def remove(source_type, source_id):
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    ExpiryRecord.objects.filter(source_type=source_type, source_id=source_id).delete()
+
+
+def update_user_department(user):
+    """Підрозділ денормалізований - синхронізуємо при зміні користувача"""
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    (ExpiryRecord.objects
+        .filter(user_id=user.pk)
+        .exclude(department_id=user.department_id)
+        .update(department_id=user.department_id))
+
+
+def rebuild_index(get_model=django_apps.get_model, using='default'):
+    """Повна перебудова індексу пакетами (scan_expiring --rebuild)"""
+    ExpiryRecord = get_model('users', 'ExpiryRecord')
+    User = get_model('users', 'User')
+    UserEmployee = get_model('users', 'UserEmployee')
+    UserWork = get_model('users', 'UserWork')
+    DocumentFile = get_model('users', 'DocumentFile')
+
+    ExpiryRecord.objects.using(using).all().delete()
+    departments = dict(User.objects.using(using).values_list('pk', 'department_id'))
+    batch = []
+    created = 0
+
+    def flush():
+        nonlocal batch, created
+        if batch:
+            ExpiryRecord.objects.using(using).bulk_create(batch)
+            created += len(batch)
+            batch = []
+
+    employees = UserEmployee.objects.using(using).all()
+    for employee in employees.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(ExpiryRecord(**row) for row in employee_rows(employee, departments.get(employee.user_id)))
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    works = UserWork.objects.using(using).select_related('work_sub_type')
+    for work in works.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(
+            ExpiryRecord(**row)
+            for row in work_rows(work, departments.get(work.user_id), work.work_sub_type.name)
+        )
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    titles = {}
+    for owner_type, model_name in OWNER_MODELS.items():
+        model = get_model('users', model_name)
+        if owner_type == 'technic':
+            values = model.objects.using(using).values_list('pk', 'technic_type__name', 'custom_type')
+            titles[owner_type] = {pk: type_name or custom for pk, type_name, custom in values}
+        elif owner_type == 'instrument':
+            values = model.objects.using(using).values_list('pk', 'instrument_type__name', 'custom_type')
+            titles[owner_type] = {pk: type_name or custom for pk, type_name, custom in values}
+        elif owner_type == 'order':
+            choices = dict(model._meta.get_field('order_type').choices)
+            values = model.objects.using(using).values_list('pk', 'order_type', 'custom_title')
+            titles[owner_type] = {
+                pk: (custom if order_type == 'custom' and custom else choices.get(order_type, order_type))
+                for pk, order_type, custom in values
+            }
+        else:
+            titles[owner_type] = {}
+
+    files = (
+        DocumentFile.objects.using(using)
+        .filter(expiry_date__isnull=False)
+        .values_list('owner_type', 'owner_id', 'user_id', 'document_type', 'name', 'expiry_date')
+    )
+    for owner_type, owner_id, user_id, document_type, name, expiry_date in files.iterator(chunk_size=BATCH_SIZE):
+        title = titles.get(owner_type, {}).get(owner_id, 'ЗІЗ' if owner_type == 'ppe' else '')
+        batch.extend(
+            ExpiryRecord(**row)
+            for row in document_rows(
+                owner_type, owner_id, user_id, departments.get(user_id), title,
+                [(document_type, name, expiry_date)]
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    flush()
+    return created
+
+
+def expiring_records(start, end):
+    """Один діапазонний запит по індексу expiry_date"""
+    ExpiryRecord = django_apps.get_model('users', 'ExpiryRecord')
+    return (
+        ExpiryRecord.objects
+        .filter(expiry_date__range=(start, end))
+        .select_related('user', 'department')
+        .only(
+            'source_type', 'kind', 'title', 'expiry_date',
+            'user__id', 'user__email', 'user__tender_number', 'user__company_name',
+            'department__id', 'department__name',
+        )
+        .order_by('expiry_date')
+    )
+
+
+def build_digests(records):
+    """
+    Групує записи в дайджести.
+    Повертає (по_тендерах, по_підрозділах):
+      {user_id: {'user': User, 'items': [ExpiryRecord]}}
+      {department_id: {'department': Department|None, 'tenders': {user_id: [ExpiryRecord]}}}
+    """
+    by_tender = {}
+    by_department = {}
+    for record in records:
+        tender = by_tender.setdefault(record.user_id, {'user': record.user, 'items': []})
+        tender['items'].append(record)
+        department = by_department.setdefault(
+            record.department_id, {'department': record.department, 'tenders': {}}
+        )
+        department['tenders'].setdefault(record.user_id, []).append(record)
+    return by_tender, by_department
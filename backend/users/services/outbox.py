@@ -0,0 +1,268 @@
+# users/services/outbox.py
+"""
+Outbox змін для зовнішніх систем (OutboxEvent).
+
+Сигнали пишуть подію в тій самій транзакції, що і зміну моделі, тож подія
+з'являється тільки разом із закомітченою зміною. Споживачі читають журнал по
+position після свого курсора: relay_outbox доставляє на webhook зареєстрованих
+OutboxConsumer, /outbox/ віддає дельти long-poll запитом.
+
+Курсор - не id: id видається при вставці, а видимим рядок стає після коміту,
+тож довга транзакція (масовий імпорт) може закомітити менший id вже після того,
+як курсор його пройшов. position присвоює sequence() вже закомітченим подіям,
+по черзі під блокуванням і після найбільшої виданої, тож подія довгої
+транзакції отримує позицію після свого коміту - більшу за будь-який курсор.
+
+Long-poll тримає потік воркера до MAX_WAIT_SECONDS, але не з'єднання з БД:
+між перевірками з'єднання повертається в пул. Під gthread одночасних
+споживачів /outbox/ має бути менше за GUNICORN_THREADS на воркер, інакше
+вони займуть усі потоки; під ASGI ліміт - пул потоків sync view.
+"""
+import json
+import math
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from django.apps import apps as django_apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+BATCH_SIZE = 500
+SEQUENCE_BATCH_SIZE = 1000
+# Ключ pg_advisory_xact_lock для sequence()
+SEQUENCE_LOCK_KEY = 0x6F7574626F78
+POLL_INTERVAL = 1
+MAX_WAIT_SECONDS = 25
+RETENTION_DAYS = 14
+WEBHOOK_TIMEOUT = 30
+
+# Службові поля User, зміна яких не цікава споживачам
+IGNORED_USER_FIELDS = frozenset({'last_login', 'synced_to_1c', 'sync_1c_id', 'last_sync_at'})
+
+
+def _payload(source_type, instance):
+    if source_type == 'tender':
+        return {
+            'tender_number': instance.tender_number,
+            'company_name': instance.company_name,
+            'status': instance.status,
+        }
+    if source_type == 'employee':
+        return {'name': instance.name, 'position': instance.position}
+    if source_type == 'technic':
+        return {'display_name': instance.display_name, 'registration_number': instance.registration_number}
+    if source_type == 'instrument':
+        return {'display_name': instance.display_name}
+    if source_type == 'order':
+        return {'order_type': instance.order_type, 'display_title': instance.display_title}
+    return {
+        'permit_number': instance.permit_number,
+        'permit_type': instance.permit_type,
+        'employee_id': instance.employee_id,
+        'technic_id': instance.technic_id,
+    }
+
+
+def source_type_for(instance):
+    User = django_apps.get_model('users', 'User')
+    if isinstance(instance, User):
+        return 'tender'
+    return {
+        'UserEmployee': 'employee',
+        'UserTechnic': 'technic',
+        'UserInstrument': 'instrument',
+        'UserOrder': 'order',
+        'Permit': 'permit',
+    }[instance._meta.object_name]
+
+
+def _departments(instances):
+    """{tender_id: department_id}; для тендерів і вже завантажених user - без запиту"""
+    User = django_apps.get_model('users', 'User')
+    departments, missing = {}, set()
+    for instance in instances:
+        if isinstance(instance, User):
+            departments[instance.pk] = instance.department_id
+        elif 'user' in instance._state.fields_cache:
+            departments[instance.user_id] = instance.user.department_id
+        else:
+            missing.add(instance.user_id)
+    if missing - departments.keys():
+        departments.update(
+            User.objects.filter(pk__in=missing - departments.keys()).values_list('pk', 'department_id')
+        )
+    return departments
+
+
+def _event(instance, action, departments):
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    source_type = source_type_for(instance)
+    tender_id = instance.pk if source_type == 'tender' else instance.user_id
+    return OutboxEvent(
+        tender_id=tender_id,
+        department_id=departments.get(tender_id),
+        source_type=source_type,
+        source_id=instance.pk,
+        action=action,
+        payload=_payload(source_type, instance),
+    )
+
+
+def record(instance, action):
+    _event(instance, action, _departments([instance])).save()
+
+
+def record_many(instances, action):
+    """Пакетна версія record (масовий імпорт)"""
+    if not instances:
+        return
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    departments = _departments(instances)
+    OutboxEvent.objects.bulk_create(
+        [_event(instance, action, departments) for instance in instances], batch_size=BATCH_SIZE
+    )
+
+
+def _lock_sequence(connection, table):
+    """Один sequence() одночасно: інші чекають до кінця транзакції"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEQUENCE_LOCK_KEY])
+        else:
+            # SQLite: порожній UPDATE одразу бере блокування на запис. Якщо спершу читати,
+            # дві транзакції не зможуть підвищити блокування і одна впаде з database is locked
+            cursor.execute(f'UPDATE {table} SET position = NULL WHERE 1 = 0')
+
+
+def sequence(limit=SEQUENCE_BATCH_SIZE):
+    """
+    Присвоює position закомітченим подіям без неї (по id, після найбільшої).
+    Незакомітчені події не видно - вони отримають позицію пізніше. Повертає кількість.
+    """
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    pending = OutboxEvent.objects.filter(position__isnull=True)
+    if not pending.exists():
+        return 0
+    with transaction.atomic():
+        _lock_sequence(transaction.get_connection(), OutboxEvent._meta.db_table)
+        ids = list(pending.order_by('id').values_list('id', flat=True)[:limit])
+        last = OutboxEvent.objects.aggregate(last=Max('position'))['last'] or 0
+        OutboxEvent.objects.bulk_update(
+            [OutboxEvent(pk=pk, position=last + number) for number, pk in enumerate(ids, start=1)],
+            ['position'],
+        )
+    return len(ids)
+
+
+def latest_cursor():
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    sequence()
+    return OutboxEvent.objects.aggregate(last=Max('position'))['last'] or 0
+
+
+def events_after(cursor, department_id=None, source_types=None, limit=BATCH_SIZE):
+    """Події з position > cursor по порядку коміту; department_id=None - всі підрозділи"""
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    sequence()
+    events = OutboxEvent.objects.filter(position__gt=cursor)
+    if department_id is not None:
+        events = events.filter(department_id=department_id)
+    if source_types:
+        events = events.filter(source_type__in=source_types)
+    return list(events.order_by('position')[:limit])
+
+
+def _release_connections():
+    # З'єднання (з пулу) не тримаємо під час очікування - інакше кілька споживачів
+    # займуть увесь пул воркера і решта запитів чекатиме DB_POOL_TIMEOUT
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def wait_for_events(cursor, timeout, **filters):
+    """Long-poll: чекає до timeout секунд (0..MAX_WAIT_SECONDS), поки з'являться події після cursor"""
+    if not math.isfinite(timeout):
+        raise ValueError(f'timeout must be finite, got {timeout!r}')
+    deadline = time.monotonic() + min(max(timeout, 0), MAX_WAIT_SECONDS)
+    while True:
+        events = events_after(cursor, **filters)
+        if events or time.monotonic() >= deadline:
+            return events
+        _release_connections()
+        time.sleep(POLL_INTERVAL)
+
+
+def serialize_event(event):
+    return {
+        'id': event.pk,
+        'position': event.position,
+        'tender_id': event.tender_id,
+        'department_id': event.department_id,
+        'source_type': event.source_type,
+        'source_id': event.source_id,
+        'action': event.action,
+        'payload': event.payload,
+        'created_at': event.created_at,
+    }
+
+
+def _post(consumer, events):
+    body = json.dumps(
+        {'events': [serialize_event(event) for event in events], 'cursor': events[-1].position},
+        cls=DjangoJSONEncoder, ensure_ascii=False
+    ).encode()
+    request = urllib.request.Request(consumer.webhook_url, data=body, method='POST')
+    request.add_header('Content-Type', 'application/json')
+    if consumer.token:
+        request.add_header('Authorization', f'Bearer {consumer.token}')
+    with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT):
+        pass  # будь-який 2xx; інші статуси - HTTPError
+
+
+def relay(consumer, batch_size=BATCH_SIZE):
+    """
+    Доставляє споживачу всі нові події пакетами, курсор рухається тільки після
+    успішної доставки пакету. Повертає кількість доставлених подій.
+    """
+    delivered = 0
+    while True:
+        events = events_after(
+            consumer.cursor, department_id=consumer.department_id,
+            source_types=consumer.source_types, limit=batch_size
+        )
+        if not events:
+            break
+        try:
+            _post(consumer, events)
+        except (urllib.error.URLError, OSError) as exc:
+            consumer.last_error = str(exc)[:1000]
+            consumer.save(update_fields=['last_error'])
+            raise
+        consumer.cursor = events[-1].position
+        consumer.last_delivery_at = timezone.now()
+        consumer.last_error = ''
+        consumer.save(update_fields=['cursor', 'last_delivery_at', 'last_error'])
+        delivered += len(events)
+    return delivered
+
+
+def prune(days=RETENTION_DAYS):
+    """Видаляє події, старші за days днів"""
+    OutboxEvent = django_apps.get_model('users', 'OutboxEvent')
+    # Подія з найбільшою позицією лишається: від неї продовжується нумерація, інакше
+    # після тиші довшої за days позиції почнуться з 1 і курсори споживачів їх пропустять
+    last = (
+        OutboxEvent.objects.filter(position__isnull=False)
+        .order_by('-position').values_list('pk', flat=True).first()
+    )
+    deleted, _ = (
+        OutboxEvent.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+        .exclude(pk=last)
+        .delete()
+    )
+    return deleted
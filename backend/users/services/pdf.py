@@ -0,0 +1,40 @@
+# users/services/pdf.py
+"""
+Точка входу для генерації PDF.
+
+Модулі рендерингу (reportlab, svglib, PIL) імпортуються при першому виклику,
+а не при старті процесу: міграції, команди і воркери без PDF їх не завантажують.
+Рендерер створюється один раз на процес (шрифти, логотип) і далі спільний для
+всіх потоків - стан малювання живе в canvas конкретного виклику.
+"""
+import threading
+
+from django.utils.module_loading import import_string
+
+RENDERERS = {
+    'permit': 'users.services.pdf_generator.PermitPDFGenerator',
+}
+
+_renderers = {}
+_lock = threading.Lock()
+
+
+def get_renderer(name):
+    renderer = _renderers.get(name)
+    if renderer is None:
+        with _lock:
+            renderer = _renderers.get(name)
+            if renderer is None:
+                renderer = _renderers[name] = import_string(RENDERERS[name])()
+    return renderer
+
+
+def generate_permit(permit):
+    """Генерує PDF і зберігає в permit.pdf_file (без permit.save())"""
+    return get_renderer('permit').generate_permit(permit)
+
+
+def warm_up():
+    """Імпорт, шрифти та логотип заздалегідь - щоб перший запит не чекав"""
+    for name in RENDERERS:
+        get_renderer(name)
@@ -1,4 +1,14 @@
 # users/services/pdf_generator.py
+"""
+Рендер PDF перепусток (reportlab, svglib, PIL).
+
+Напряму не імпортується - тільки через users.services.pdf, щоб процеси без
+генерації PDF (міграції, команди, API) не платили за імпорт цих бібліотек.
+Шрифти і SVG логотип завантажуються один раз на процес.
+"""
+import copy
+import functools
+import logging
 import os
 from io import BytesIO
 from reportlab.pdfgen import canvas
@@ -14,80 +24,101 @@ from django.conf import settings
 from django.core.files.base import ContentFile
 from PIL import Image
 
+from utils.metrics import PDF_RENDER_SECONDS, timed
+from utils.tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
+
+def _logo_paths():
+    paths = [os.path.join(settings.BASE_DIR, 'static', 'permits', 'logo-new.svg')]
+    if getattr(settings, 'STATICFILES_DIRS', None):
+        paths.append(os.path.join(settings.STATICFILES_DIRS[0], 'permits', 'logo-new.svg'))
+    if getattr(settings, 'STATIC_ROOT', None):
+        paths.append(os.path.join(settings.STATIC_ROOT, 'permits', 'logo-new.svg'))
+    return paths
+
+
+@functools.lru_cache(maxsize=None)
+def register_fonts():
+    """Реєструє шрифти в reportlab (глобально, один раз); повертає (звичайний, жирний)"""
+    font_dir = os.path.join(settings.BASE_DIR, "static", "fonts")
+    try:
+        pdfmetrics.registerFont(TTFont("Montserrat", os.path.join(font_dir, "Montserrat-Regular.ttf")))
+        pdfmetrics.registerFont(TTFont("Montserrat-Bold", os.path.join(font_dir, "Montserrat-Bold.ttf")))
+        return "Montserrat", "Montserrat-Bold"
+    except Exception:
+        return "Roboto", "Roboto-Bold"
+
+
+@functools.lru_cache(maxsize=None)
+def load_logo():
+    """SVG логотип як reportlab Drawing (розбирається один раз) або None"""
+    for logo_path in _logo_paths():
+        if not os.path.exists(logo_path):
+            logger.debug('Логотип не знайдено: %s', logo_path)
+            continue
+        try:
+            drawing = svg2rlg(logo_path)
+        except Exception as e:
+            logger.warning('Помилка з файлом логотипу %s: %s', logo_path, e)
+            continue
+        if not drawing:
+            logger.warning('Не вдалося перетворити SVG %s в drawing', logo_path)
+        elif drawing.width <= 0 or drawing.height <= 0:
+            logger.warning('Некоректні розміри логотипу %s', logo_path)
+        else:
+            return drawing
+    logger.warning('Логотип недоступний, буде використано текстовий fallback')
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _scaled_logo(width):
+    """Копія логотипу, вписана в квадрат width (спільна для потоків - лише читається)"""
+    source = load_logo()
+    if source is None:
+        return None
+    drawing = copy.deepcopy(source)
+    scale = min(width / drawing.width, width / drawing.height)  # Зберігаємо пропорції
+    drawing.width = drawing.width * scale
+    drawing.height = drawing.height * scale
+    drawing.scale(scale, scale)
+    return drawing
+
+
 class PermitPDFGenerator:
     def __init__(self):
         self.page_width, self.page_height = A4  # A4 вертикально
         self.card_width = self.page_width / 2  # Половина сторінки для кожної картки
         self.card_height = self.page_height
-        self._register_fonts()
-        
-    def _register_fonts(self):
-        font_dir = os.path.join(settings.BASE_DIR, "static", "fonts")
-
-        try:
-            pdfmetrics.registerFont(TTFont("Montserrat", os.path.join(font_dir, "Montserrat-Regular.ttf")))
-            pdfmetrics.registerFont(TTFont("Montserrat-Bold", os.path.join(font_dir, "Montserrat-Bold.ttf")))
-            self.font_name = "Montserrat"
-            self.bold_font = "Montserrat-Bold"
-            self.regular_font = self.font_name
-        except Exception as e:
-            self.font_name = "Roboto"
-            self.bold_font = "Roboto-Bold"
-            self.regular_font = self.font_name
+        self.font_name, self.bold_font = register_fonts()
+        self.regular_font = self.font_name
+        load_logo()  # щоб прогрів (pdf.warm_up) включав і розбір SVG
 
     
+    @traced('pdf.logo')
     def _draw_logo(self, canvas, x, y, width=30):
         """Малює SVG логотип на вказаних координатах"""
-        # Спробуємо кілька варіантів шляхів
-        possible_paths = [
-            os.path.join(settings.BASE_DIR, 'static', 'permits', 'logo-new.svg'),
-            os.path.join(settings.STATICFILES_DIRS[0], 'permits', 'logo-new.svg') if hasattr(settings, 'STATICFILES_DIRS') and settings.STATICFILES_DIRS else None,
-            os.path.join(settings.STATIC_ROOT, 'permits', 'logo-new.svg') if hasattr(settings, 'STATIC_ROOT') and settings.STATIC_ROOT else None,
-        ]
-        
-        # Фільтруємо None значення
-        possible_paths = [p for p in possible_paths if p is not None]
-        
-        for logo_path in possible_paths:
-            try:
-                if os.path.exists(logo_path):
-                    
-                    drawing = svg2rlg(logo_path)
-                    if drawing:
-                        
-                        # Масштабуємо логотип
-                        if drawing.width > 0 and drawing.height > 0:
-                            scale_x = width / drawing.width
-                            scale_y = width / drawing.height
-                            scale = min(scale_x, scale_y)  # Зберігаємо пропорції
-                            
-                            drawing.width = drawing.width * scale
-                            drawing.height = drawing.height * scale
-                            drawing.scale(scale, scale)
-                            
-                            # Малюємо на canvas
-                            renderPDF.draw(drawing, canvas, x, y - drawing.height)
-                            return True
-                        else:
-                            print("❌ Некоректні розміри логотипу")
-                    else:
-                        print("❌ Не вдалося перетворити SVG в drawing")
-                else:
-                    print(f"❌ Файл не знайдено: {logo_path}")
-                    
-            except Exception as e:
-                print(f"❌ Помилка з файлом {logo_path}: {e}")
-                continue
-        
+        drawing = _scaled_logo(width)
+        if drawing is not None:
+            renderPDF.draw(drawing, canvas, x, y - drawing.height)
+            return True
+
         # Fallback - малюємо текст замість логотипу
         canvas.setFont(self.bold_font, 12)
         canvas.setFillColor(colors.Color(0.32, 0.77, 0.10))
         canvas.drawString(x, y - 10, "ЗАХІДНИЙ БУГ")
-        print("⚠️ Використано текстовий fallback")
         return False
         
     def generate_permit(self, permit):
         """Генерує PDF перепустки на одній A4 сторінці (дві картки поруч)"""
+        with timed(PDF_RENDER_SECONDS, permit_type=permit.permit_type), span('pdf.generate_permit', {
+            'permit.number': permit.permit_number, 'permit.type': permit.permit_type,
+        }):
+            return self._generate_permit(permit)
+
+    def _generate_permit(self, permit):
         buffer = BytesIO()
         p = canvas.Canvas(buffer, pagesize=A4)
 
@@ -103,13 +134,15 @@ class PermitPDFGenerator:
         # Права картка: Документи
         self._draw_page2(p, permit, x_offset=self.card_width)
 
-        p.save()
+        with span('pdf.canvas_save'):
+            p.save()
 
         pdf_content = buffer.getvalue()
         buffer.close()
 
         filename = f"permit_{permit.permit_number}.pdf"
-        permit.pdf_file.save(filename, ContentFile(pdf_content), save=False)
+        with span('storage.save', {'file.name': filename, 'file.size': len(pdf_content)}):
+            permit.pdf_file.save(filename, ContentFile(pdf_content), save=False)
         return permit
     
     def _draw_page1(self, canvas, permit, x_offset=0):
@@ -246,6 +279,7 @@ class PermitPDFGenerator:
             
             
     
+    @traced('pdf.header')
     def _draw_header(self, canvas, permit_number, margin, x_offset=0):
         """Малює header першої сторінки"""
         y_pos = self.card_height - 5 * mm
@@ -278,6 +312,7 @@ class PermitPDFGenerator:
         canvas.setLineWidth(2)
         canvas.line(x_offset + margin, y_pos, x_offset + self.card_width - margin, y_pos)
     
+    @traced('pdf.header')
     def _draw_header_page2(self, canvas, margin, permit_number, x_offset=0):
         """Header другої сторінки"""
         y_pos = self.card_height - 5 * mm
@@ -311,6 +346,7 @@ class PermitPDFGenerator:
         canvas.line(x_offset + margin, y_pos, x_offset + self.card_width - margin, y_pos)
 
     
+    @traced('pdf.documents_table')
     def _draw_documents_table(self, canvas, documents, margin, start_y, x_offset=0):
         """Малює таблицю документів"""
         row_height = 10
@@ -391,6 +427,7 @@ class PermitPDFGenerator:
         x_centered = x_offset + (self.card_width - text_width) / 2
         canvas.drawString(x_centered, y_pos, text)
 
+    @traced('pdf.photo')
     def _draw_employee_photo(self, canvas, employee, margin, x_offset=0):
         """Малює фото працівника 30x40 мм справа зверху під хедером з cover fit"""
         try:
@@ -454,7 +491,7 @@ class PermitPDFGenerator:
             canvas.rect(x_pos, y_pos, photo_width, photo_height, fill=0, stroke=1)
 
         except Exception as e:
-            print(f"❌ Помилка завантаження фото: {e}")
+            logger.warning('Помилка завантаження фото для перепустки: %s', e)
             # Placeholder
             x_pos = x_offset + self.card_width - margin - (30 * mm)
             y_pos = self.card_height - 20 * mm - (40 * mm)
@@ -494,8 +531,8 @@ class PermitPDFGenerator:
                     'expiry_date': expiry
                 })
 
-            # Медогляд (тільки якщо є фото)
-            if emp.medical_exam_photo:
+            # Медогляд (тільки якщо вказана дата)
+            if emp.medical_exam_date:
                 documents.append({
                     'name': 'Медичний огляд',
                     'expiry_date': None
@@ -538,4 +575,4 @@ class PermitPDFGenerator:
                             })
 
         
-        return documents
\ No newline at end of file
+        return documents
\ No newline at end of file
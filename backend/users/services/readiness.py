@@ -0,0 +1,295 @@
+# users/services/readiness.py
+"""
+Підсумок готовності переможця тендеру (UserReadiness).
+
+Перераховується тільки для користувачів, чиї дані змінились: кілька агрегуючих
+запитів на пакет користувачів замість перегляду всіх інлайнів у адмінці.
+Заодно заповнює UserDocumentStatus по табах документів підрозділу.
+"""
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+def required_names(required_documents):
+    names = []
+    for doc in required_documents or []:
+        name = doc.get('name') if isinstance(doc, dict) else doc
+        if name:
+            names.append(str(name))
+    return names
+
+
+def _counts(model, user_ids, using):
+    rows = (
+        model.objects.using(using)
+        .filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(n=Count('id'))
+        .values_list('user_id', 'n')
+    )
+    return dict(rows)
+
+
+def _asset_missing(get_model, using, user_ids, owner_type, model_name, type_field, missing):
+    """Рахує відсутні документи техніки/інструментів згідно з required_documents типу"""
+    model = get_model('users', model_name)
+    DocumentFile = get_model('users', 'DocumentFile')
+
+    assets = list(
+        model.objects.using(using)
+        .filter(user_id__in=user_ids, **{f'{type_field}__isnull': False})
+        .values_list('id', 'user_id', f'{type_field}__name', f'{type_field}__required_documents')
+    )
+    if not assets:
+        return {}
+
+    present = {}
+    files = (
+        DocumentFile.objects.using(using)
+        .filter(owner_type=owner_type, owner_id__in=[a[0] for a in assets])
+        .values_list('owner_id', 'document_type')
+        .distinct()
+    )
+    for owner_id, document_type in files:
+        present.setdefault(owner_id, set()).add(document_type)
+
+    required_total = {}
+    for asset_id, user_id, type_name, required_documents in assets:
+        names = required_names(required_documents)
+        required_total[user_id] = required_total.get(user_id, 0) + len(names)
+        have = present.get(asset_id, set())
+        for name in names:
+            if name not in have:
+                missing.setdefault(user_id, []).append({
+                    'source': owner_type,
+                    'id': asset_id,
+                    'title': type_name,
+                    'document': name,
+                })
+    return required_total
+
+
+def _orders_missing(get_model, using, user_ids, missing):
+    """Кожен стандартний тип наказу має бути завантажений хоча б одним файлом"""
+    UserOrder = get_model('users', 'UserOrder')
+    DocumentFile = get_model('users', 'DocumentFile')
+    order_types = [
+        (value, label)
+        for value, label in UserOrder._meta.get_field('order_type').choices
+        if value != 'custom'
+    ]
+
+    orders = {
+        order_id: (user_id, order_type)
+        for order_id, user_id, order_type in (
+            UserOrder.objects.using(using)
+            .filter(user_id__in=user_ids)
+            .exclude(order_type='custom')
+            .values_list('id', 'user_id', 'order_type')
+        )
+    }
+    with_files = (
+        DocumentFile.objects.using(using)
+        .filter(owner_type='order', owner_id__in=list(orders))
+        .values_list('owner_id', flat=True)
+        .distinct()
+    )
+    uploaded = {}
+    for order_id in with_files:
+        user_id, order_type = orders[order_id]
+        uploaded.setdefault(user_id, set()).add(order_type)
+
+    for user_id in user_ids:
+        have = uploaded.get(user_id, set())
+        for value, label in order_types:
+            if value not in have:
+                missing.setdefault(user_id, []).append({
+                    'source': 'order',
+                    'id': None,
+                    'title': label,
+                    'document': label,
+                })
+    return {user_id: len(order_types) for user_id in user_ids}
+
+
+def _update_document_statuses(get_model, using, user_ids):
+    """Таб вважається завершеним коли заповнені всі обов'язкові поля"""
+    User = get_model('users', 'User')
+    DocumentTab = get_model('users', 'DocumentTab')
+    DocumentField = get_model('users', 'DocumentField')
+    UserDocument = get_model('users', 'UserDocument')
+    UserDocumentStatus = get_model('users', 'UserDocumentStatus')
+
+    departments = dict(
+        User.objects.using(using)
+        .filter(pk__in=user_ids, department__isnull=False)
+        .values_list('pk', 'department_id')
+    )
+    if not departments:
+        return
+
+    tabs = {}
+    for tab_id, department_id in (
+        DocumentTab.objects.using(using)
+        .filter(department_id__in=set(departments.values()), is_active=True)
+        .values_list('id', 'department_id')
+    ):
+        tabs.setdefault(department_id, []).append(tab_id)
+    if not tabs:
+        return
+
+    required_fields = {}
+    for field_id, tab_id in (
+        DocumentField.objects.using(using)
+        .filter(tab__department_id__in=list(tabs), is_required=True)
+        .values_list('id', 'tab_id')
+    ):
+        required_fields.setdefault(tab_id, set()).add(field_id)
+
+    filled = {}
+    for user_id, field_id in (
+        UserDocument.objects.using(using)
+        .filter(user_id__in=list(departments))
+        .values_list('user_id', 'field_id')
+    ):
+        filled.setdefault(user_id, set()).add(field_id)
+
+    existing = {
+        (status.user_id, status.tab_id): status
+        for status in UserDocumentStatus.objects.using(using).filter(user_id__in=list(departments))
+    }
+    now = timezone.now()
+    to_create, to_update = [], []
+    for user_id, department_id in departments.items():
+        for tab_id in tabs.get(department_id, []):
+            completed = required_fields.get(tab_id, set()) <= filled.get(user_id, set())
+            status = existing.get((user_id, tab_id))
+            if status is None:
+                to_create.append(UserDocumentStatus(
+                    user_id=user_id, tab_id=tab_id, is_completed=completed,
+                    completed_at=now if completed else None
+                ))
+            elif status.is_completed != completed:
+                status.is_completed = completed
+                status.completed_at = now if completed else None
+                to_update.append(status)
+
+    UserDocumentStatus.objects.using(using).bulk_create(to_create)
+    UserDocumentStatus.objects.using(using).bulk_update(to_update, ['is_completed', 'completed_at'])
+
+
+def refresh_readiness(user_ids, get_model=django_apps.get_model, using='default'):
+    """Перераховує UserReadiness для вказаних користувачів"""
+    user_ids = [user_id for user_id in set(user_ids) if user_id]
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        _refresh_batch(user_ids[start:start + BATCH_SIZE], get_model, using)
+
+
+def _refresh_batch(user_ids, get_model, using):
+    User = get_model('users', 'User')
+    UserReadiness = get_model('users', 'UserReadiness')
+    ExpiryRecord = get_model('users', 'ExpiryRecord')
+
+    user_ids = list(
+        User.objects.using(using)
+        .filter(pk__in=user_ids, is_staff=False)
+        .values_list('pk', flat=True)
+    )
+    if not user_ids:
+        return
+
+    employees = _counts(get_model('users', 'UserEmployee'), user_ids, using)
+    technics = _counts(get_model('users', 'UserTechnic'), user_ids, using)
+    instruments = _counts(get_model('users', 'UserInstrument'), user_ids, using)
+    orders = _counts(get_model('users', 'UserOrder'), user_ids, using)
+    works = _counts(get_model('users', 'UserWork'), user_ids, using)
+    expired = dict(
+        ExpiryRecord.objects.using(using)
+        .filter(user_id__in=user_ids, expiry_date__lt=timezone.localdate())
+        .values('user_id')
+        .annotate(n=Count('id'))
+        .values_list('user_id', 'n')
+    )
+
+    missing = {}
+    required = {}
+    for totals in (
+        _asset_missing(get_model, using, user_ids, 'technic', 'UserTechnic', 'technic_type', missing),
+        _asset_missing(get_model, using, user_ids, 'instrument', 'UserInstrument', 'instrument_type', missing),
+        _orders_missing(get_model, using, user_ids, missing),
+    ):
+        for user_id, count in totals.items():
+            required[user_id] = required.get(user_id, 0) + count
+
+    existing = {
+        readiness.user_id: readiness
+        for readiness in UserReadiness.objects.using(using).filter(user_id__in=user_ids)
+    }
+    fields = [
+        'employees_count', 'technics_count', 'instruments_count', 'orders_count', 'works_count',
+        'required_documents_count', 'missing_documents_count', 'missing_documents',
+        'expired_count', 'completeness', 'updated_at',
+    ]
+    now = timezone.now()
+    to_create, to_update = [], []
+    for user_id in user_ids:
+        user_missing = missing.get(user_id, [])
+        user_required = required.get(user_id, 0)
+        completeness = round(100 * (user_required - len(user_missing)) / user_required) if user_required else 0
+        values = {
+            'employees_count': employees.get(user_id, 0),
+            'technics_count': technics.get(user_id, 0),
+            'instruments_count': instruments.get(user_id, 0),
+            'orders_count': orders.get(user_id, 0),
+            'works_count': works.get(user_id, 0),
+            'required_documents_count': user_required,
+            'missing_documents_count': len(user_missing),
+            'missing_documents': user_missing,
+            'expired_count': expired.get(user_id, 0),
+            'completeness': max(0, min(100, completeness)),
+            'updated_at': now,
+        }
+        readiness = existing.get(user_id)
+        if readiness is None:
+            to_create.append(UserReadiness(user_id=user_id, **values))
+        else:
+            for key, value in values.items():
+                setattr(readiness, key, value)
+            to_update.append(readiness)
+
+    UserReadiness.objects.using(using).bulk_create(to_create)
+    UserReadiness.objects.using(using).bulk_update(to_update, fields)
+    _update_document_statuses(get_model, using, user_ids)
+
+
+class _PendingRefresh:
+    """Один on_commit на транзакцію: id користувачів збираються, перерахунок - одним викликом"""
+
+    def __init__(self):
+        self.user_ids = set()
+
+    def __call__(self):
+        refresh_readiness(self.user_ids)
+
+
+def schedule_refresh(user_id):
+    """
+    Перерахунок після коміту транзакції (одразу, якщо транзакції немає).
+    N збережених співробітників/техніки одного тендеру в транзакції - один перерахунок.
+    """
+    if not user_id:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        refresh_readiness([user_id])
+        return
+    pending = getattr(connection, '_pending_readiness', None)
+    # Після відкату (транзакції чи savepoint) callback зникає з run_on_commit - реєструємо новий
+    if pending is None or not any(entry[1] is pending for entry in connection.run_on_commit):
+        pending = connection._pending_readiness = _PendingRefresh()
+        transaction.on_commit(pending)
+    pending.user_ids.add(user_id)
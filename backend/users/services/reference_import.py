@@ -0,0 +1,313 @@
+# users/services/reference_import.py
+"""
+Імпорт довідників з вивантаження 1С (CSV / JSON / JSON Lines).
+
+Записи зіставляються по external_id (код 1С) зі знімком існуючих рядків у
+пам'яті (один .values() запит), тому в БД іде тільки різниця:
+нові - bulk_create(update_conflicts=True), змінені - bulk_update,
+відсутні у вивантаженні - is_active=False. Все в одній транзакції; якщо хоча б
+один рядок некоректний, нічого не змінюється.
+Рядки без external_id (створені вручну або populate_*_types) при першому імпорті
+прив'язуються за назвою (+ батьківський запис).
+"""
+import codecs
+import csv
+import json
+import os
+
+from django.apps import apps as django_apps
+from django.db import transaction
+
+BATCH_SIZE = 500
+SNIFF_BYTES = 1024 * 1024
+
+# Альтернативні назви колонок у вивантаженні -> ключ
+COLUMN_ALIASES = {
+    'код': 'id', 'external_id': 'id', 'code': 'id',
+    'назва': 'name', 'найменування': 'name',
+    'код батька': 'parent_id', 'parent': 'parent_id', 'батько': 'parent_id',
+    'потребує обладнання': 'has_equipment',
+    'необхідні документи': 'required_documents', 'документи': 'required_documents',
+}
+
+TRUE_VALUES = {'1', 'true', 'так', 'yes', 'y', '+'}
+FALSE_VALUES = {'0', 'false', 'ні', 'no', 'n', '-', ''}
+
+
+class ReferenceImportError(Exception):
+    """Файл не вдалося прочитати або довідник невідомий"""
+
+
+def _text(value):
+    value = str(value if value is not None else '').strip()
+    if not value:
+        raise ValueError('порожнє значення')
+    return value
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value if value is not None else '').strip().casefold()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f'"{value}" не є так/ні')
+
+
+def _documents(value):
+    """Список документів у форматі required_documents: JSON або назви через |"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            value = [name for name in (part.strip() for part in value.split('|')) if name]
+    if not isinstance(value, list):
+        raise ValueError('очікується список документів')
+    documents = []
+    for doc in value:
+        if isinstance(doc, str):
+            doc = {'name': doc}
+        if not isinstance(doc, dict) or not str(doc.get('name') or '').strip():
+            raise ValueError('документ без назви')
+        documents.append(doc)
+    return documents
+
+
+class Reference:
+    """Опис довідника: модель, поля з перетвореннями, FK на батьківський довідник"""
+
+    def __init__(self, model_name, fields, parent=None):
+        self.model_name = model_name
+        self.fields = fields
+        self.parent = parent  # (поле FK, ключ довідника батька)
+
+    @property
+    def model(self):
+        return django_apps.get_model('users', self.model_name)
+
+
+REFERENCES = {
+    'work_types': Reference('WorkType', {'name': _text}),
+    'work_subtypes': Reference(
+        'WorkSubType', {'name': _text, 'has_equipment': _bool}, parent=('work_type', 'work_types')
+    ),
+    'equipment': Reference('Equipment', {'name': _text}, parent=('subtype', 'work_subtypes')),
+    'technic_types': Reference('TechnicType', {'name': _text, 'required_documents': _documents}),
+    'instrument_types': Reference('InstrumentType', {'name': _text, 'required_documents': _documents}),
+}
+
+
+# ===================================================================
+# Читання вивантаження (потоково)
+
+def _encoding(path):
+    with open(path, 'rb') as file:
+        head = file.read(SNIFF_BYTES)
+    try:
+        codecs.getincrementaldecoder('utf-8-sig')().decode(head, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1251'
+
+
+def _normalize_keys(row):
+    normalized = {}
+    for key, value in row.items():
+        key = ' '.join(str(key or '').split()).casefold()
+        normalized[COLUMN_ALIASES.get(key, key)] = value
+    return normalized
+
+
+def read_rows(path):
+    """Ітератор словників (рядок, дані) з .csv, .json або .jsonl"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, encoding=_encoding(path), newline='') as file:
+            first_line = file.readline()
+            file.seek(0)
+            delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+            for line_no, row in enumerate(csv.DictReader(file, delimiter=delimiter), start=2):
+                yield line_no, _normalize_keys(row)
+    elif extension == '.jsonl':
+        with open(path, encoding='utf-8-sig') as file:
+            for line_no, line in enumerate(file, start=1):
+                if line.strip():
+                    yield line_no, _normalize_keys(_json_object(line, line_no))
+    elif extension == '.json':
+        with open(path, encoding='utf-8-sig') as file:
+            try:
+                data = json.load(file)
+            except ValueError as exc:
+                raise ReferenceImportError(f'Некоректний JSON: {exc}')
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ReferenceImportError('JSON має бути списком записів або {"items": [...]}')
+        for index, item in enumerate(items, start=1):
+            if not isinstance(item, dict):
+                raise ReferenceImportError(f'Запис {index}: очікується обʼєкт')
+            yield index, _normalize_keys(item)
+    else:
+        raise ReferenceImportError('Підтримуються файли .csv, .json, .jsonl')
+
+
+def _json_object(line, line_no):
+    try:
+        item = json.loads(line)
+    except ValueError as exc:
+        raise ReferenceImportError(f'Рядок {line_no}: некоректний JSON: {exc}')
+    if not isinstance(item, dict):
+        raise ReferenceImportError(f'Рядок {line_no}: очікується обʼєкт')
+    return item
+
+
+# ===================================================================
+# Порівняння зі знімком та застосування
+
+def _snapshot(reference):
+    """{external_id: {pk, поля, is_active}} + {(батько, назва): pk} для рядків без коду"""
+    model = reference.model
+    columns = ['pk', 'external_id', 'is_active', *reference.fields]
+    if reference.parent:
+        columns.append(f'{reference.parent[0]}_id')
+    by_code, legacy = {}, {}
+    for row in model.objects.values(*columns):
+        if row['external_id']:
+            by_code[row['external_id']] = row
+        else:
+            parent_id = row.get(f'{reference.parent[0]}_id') if reference.parent else None
+            legacy.setdefault((parent_id, row['name']), row)
+    return by_code, legacy
+
+
+def import_reference(kind, rows, deactivate_missing=True, dry_run=False):
+    """
+    rows - ітерабельне з (номер рядка, словник). Повертає
+    {'created', 'updated', 'deactivated', 'unchanged', 'errors': [{'row', 'error'}]}.
+    """
+    try:
+        reference = REFERENCES[kind]
+    except KeyError:
+        raise ReferenceImportError(f'Невідомий довідник "{kind}". Доступні: {", ".join(REFERENCES)}')
+    model = reference.model
+    by_code, legacy = _snapshot(reference)
+    parent_field = reference.parent[0] if reference.parent else None
+    parent_ids = {}
+    if reference.parent:
+        parent_ids = dict(
+            REFERENCES[reference.parent[1]].model.objects
+            .filter(external_id__isnull=False)
+            .values_list('external_id', 'pk')
+        )
+
+    errors, seen = [], set()
+    present_fields = set()
+    to_create, to_update = [], []
+    changed_fields = set()
+    unchanged = 0
+
+    for line_no, row in rows:
+        code = str(row.get('id') or '').strip()
+        if not code:
+            errors.append({'row': line_no, 'error': 'Немає коду (id)'})
+            continue
+        if code in seen:
+            errors.append({'row': line_no, 'error': f'Код {code} повторюється'})
+            continue
+        seen.add(code)
+
+        values = {}
+        row_errors = []
+        for field, convert in reference.fields.items():
+            if field not in row:
+                continue
+            try:
+                values[field] = convert(row[field])
+            except ValueError as exc:
+                row_errors.append(f'{field}: {exc}')
+        if 'name' not in values and not row_errors:
+            row_errors.append('name: немає колонки')
+        if parent_field:
+            parent_code = str(row.get('parent_id') or '').strip()
+            if parent_code not in parent_ids:
+                row_errors.append(f'Батьківський запис з кодом "{parent_code}" не знайдено')
+            else:
+                values[f'{parent_field}_id'] = parent_ids[parent_code]
+        if row_errors:
+            errors.append({'row': line_no, 'error': '; '.join(row_errors)})
+            continue
+
+        present_fields.update(values)
+        values['is_active'] = True
+        existing = by_code.get(code)
+        if existing is None:
+            existing = legacy.pop((values.get(f'{parent_field}_id') if parent_field else None, values['name']), None)
+            if existing is not None:
+                values['external_id'] = code
+        if existing is None:
+            to_create.append(model(external_id=code, **values))
+            continue
+
+        changed = {field for field, value in values.items() if existing.get(field) != value}
+        if not changed:
+            unchanged += 1
+            continue
+        changed_fields.update(changed)
+        merged = {key: value for key, value in existing.items() if key != 'pk'}
+        merged.update(values)
+        to_update.append((model(pk=existing['pk'], **merged), existing))
+
+    to_deactivate = []
+    if deactivate_missing:
+        to_deactivate = [row['pk'] for code, row in by_code.items() if code not in seen and row['is_active']]
+
+    result = {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deactivated': len(to_deactivate),
+        'unchanged': unchanged,
+        'errors': errors,
+    }
+    if errors or dry_run:
+        return result
+
+    with transaction.atomic():
+        if to_create:
+            model.objects.bulk_create(
+                to_create, batch_size=BATCH_SIZE, update_conflicts=True,
+                unique_fields=['external_id'], update_fields=sorted(present_fields | {'is_active'}),
+            )
+        if to_update:
+            model.objects.bulk_update([obj for obj, _ in to_update], sorted(changed_fields), batch_size=BATCH_SIZE)
+        if to_deactivate:
+            model.objects.filter(pk__in=to_deactivate).update(is_active=False)
+        _after_types_changed(kind, to_update)
+    return result
+
+
+def _after_types_changed(kind, updated):
+    """Назва типу є в пошуковому індексі, required_documents - в готовності тендерів"""
+    if kind not in ('technic_types', 'instrument_types'):
+        return
+    renamed = [obj.pk for obj, old in updated if old['name'] != obj.name]
+    documents_changed = [obj.pk for obj, old in updated if old['required_documents'] != obj.required_documents]
+    if not renamed and not documents_changed:
+        return
+    from . import readiness, search
+
+    source_type, asset_model, type_field = (
+        ('technic', 'UserTechnic', 'technic_type') if kind == 'technic_types'
+        else ('instrument', 'UserInstrument', 'instrument_type')
+    )
+    assets = django_apps.get_model('users', asset_model).objects
+    if renamed:
+        search.index_objects(
+            source_type, list(assets.filter(**{f'{type_field}_id__in': renamed}).select_related(type_field))
+        )
+    if documents_changed:
+        user_ids = set(
+            assets.filter(**{f'{type_field}_id__in': documents_changed}).values_list('user_id', flat=True)
+        )
+        transaction.on_commit(lambda: readiness.refresh_readiness(user_ids))
@@ -0,0 +1,316 @@
+# users/services/search.py
+"""
+Пошук по тендерах, співробітниках, техніці та інструментах (SearchEntry).
+
+Кожен об'єкт - один рядок (title + body), рядки оновлюються сигналами.
+Сам пошук залежить від БД:
+  Postgres - згенерована колонка search_vector (tsvector, конфігурація 'simple',
+             бо української в Postgres немає) + trigram GIN для підрядків
+             (номер тендеру, ЄДРПОУ, email, держномер);
+  SQLite   - FTS5 таблиця з тригерами (розробка і тести);
+  інше     - icontains по title/body.
+Ці структури створює міграція 0021_search_backend (сирим SQL, моделі про них не знають).
+"""
+import re
+
+from django.apps import apps as django_apps
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+BATCH_SIZE = 1000
+MAX_LIMIT = 500
+
+FTS_TABLE = 'users_searchentry_fts'
+
+
+# ===================================================================
+# Побудова записів
+
+def _join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+def tender_row(user):
+    return {
+        'title': _join(user.tender_number, user.company_name)[:500],
+        'body': _join(
+            user.tender_number, user.company_name, user.edrpou, user.email,
+            user.director_name, user.contact_person, user.phone,
+        ),
+    }
+
+
+def employee_row(employee):
+    return {
+        'title': employee.name[:500],
+        'body': _join(employee.name, employee.position, employee.organization_name),
+    }
+
+
+def technic_row(technic, type_name):
+    return {
+        'title': _join(type_name or technic.custom_type, technic.registration_number)[:500],
+        'body': _join(type_name, technic.custom_type, technic.registration_number),
+    }
+
+
+def instrument_row(instrument, type_name):
+    return {
+        'title': (type_name or instrument.custom_type or '')[:500],
+        'body': _join(type_name, instrument.custom_type),
+    }
+
+
+def _row_for(source_type, instance):
+    if source_type == 'tender':
+        return tender_row(instance)
+    if source_type == 'employee':
+        return employee_row(instance)
+    if source_type == 'technic':
+        return technic_row(instance, instance.technic_type.name if instance.technic_type_id else '')
+    return instrument_row(instance, instance.instrument_type.name if instance.instrument_type_id else '')
+
+
+def _save_rows(source_type, items):
+    """items - [(instance, user_id, department_id)]; upsert по (source_type, source_id)"""
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    if not items:
+        return
+    existing = {
+        entry.source_id: entry
+        for entry in SearchEntry.objects.filter(source_type=source_type, source_id__in=[i.pk for i, _, _ in items])
+    }
+    to_create, to_update = [], []
+    for instance, user_id, department_id in items:
+        row = _row_for(source_type, instance)
+        entry = existing.get(instance.pk)
+        if entry is None:
+            to_create.append(SearchEntry(
+                user_id=user_id, department_id=department_id,
+                source_type=source_type, source_id=instance.pk, **row
+            ))
+        elif (entry.title, entry.body, entry.department_id) != (row['title'], row['body'], department_id):
+            entry.title, entry.body, entry.department_id = row['title'], row['body'], department_id
+            to_update.append(entry)
+    SearchEntry.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    SearchEntry.objects.bulk_update(to_update, ['title', 'body', 'department', 'updated_at'], batch_size=BATCH_SIZE)
+
+
+def index_tender(user):
+    """Запис тендеру; заодно підрозділ у записах його співробітників/техніки"""
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    if user.is_staff:
+        remove('tender', user.pk)
+        return
+    _save_rows('tender', [(user, user.pk, user.department_id)])
+    (SearchEntry.objects
+        .filter(user_id=user.pk)
+        .exclude(department_id=user.department_id)
+        .update(department_id=user.department_id))
+
+
+def index_objects(source_type, instances):
+    """Співробітники/техніка/інструменти (один або пакет після bulk_create)"""
+    User = django_apps.get_model('users', 'User')
+    if not instances:
+        return
+    departments = dict(
+        User.objects.filter(pk__in={i.user_id for i in instances}).values_list('pk', 'department_id')
+    )
+    _save_rows(source_type, [(i, i.user_id, departments.get(i.user_id)) for i in instances])
+
+
+def remove(source_type, source_id):
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    SearchEntry.objects.filter(source_type=source_type, source_id=source_id).delete()
+
+
+def rebuild_index(get_model=django_apps.get_model, using='default'):
+    """Повна перебудова пакетами (команда rebuild_search_index)"""
+    SearchEntry = get_model('users', 'SearchEntry')
+    User = get_model('users', 'User')
+    SearchEntry.objects.using(using).all().delete()
+
+    departments = {}
+    created = 0
+    batch = []
+
+    def flush():
+        nonlocal batch, created
+        SearchEntry.objects.using(using).bulk_create(batch)
+        created += len(batch)
+        batch = []
+
+    for user in User.objects.using(using).filter(is_staff=False).iterator(chunk_size=BATCH_SIZE):
+        departments[user.pk] = user.department_id
+        batch.append(SearchEntry(
+            user_id=user.pk, department_id=user.department_id,
+            source_type='tender', source_id=user.pk, **tender_row(user)
+        ))
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    sources = [
+        ('employee', get_model('users', 'UserEmployee').objects.using(using).all(), employee_row),
+        ('technic', get_model('users', 'UserTechnic').objects.using(using).select_related('technic_type'),
+         lambda t: technic_row(t, t.technic_type.name if t.technic_type_id else '')),
+        ('instrument', get_model('users', 'UserInstrument').objects.using(using).select_related('instrument_type'),
+         lambda i: instrument_row(i, i.instrument_type.name if i.instrument_type_id else '')),
+    ]
+    for source_type, queryset, build in sources:
+        for instance in queryset.filter(user_id__in=list(departments)).iterator(chunk_size=BATCH_SIZE):
+            batch.append(SearchEntry(
+                user_id=instance.user_id, department_id=departments.get(instance.user_id),
+                source_type=source_type, source_id=instance.pk, **build(instance)
+            ))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+    flush()
+    return created
+
+
+# ===================================================================
+# Пошук
+
+def tokenize(query):
+    return re.findall(r'\w+', (query or '').casefold())[:10]
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _filters(user_id, department_id, source_types):
+    clauses, params = [], []
+    if user_id is not None:
+        clauses.append('e.user_id = %s')
+        params.append(user_id)
+    if department_id is not None:
+        clauses.append('e.department_id = %s')
+        params.append(department_id)
+    if source_types:
+        clauses.append('e.source_type IN (%s)' % ', '.join(['%s'] * len(source_types)))
+        params.extend(source_types)
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _postgres_where(query, terms, filters, params):
+    like = f'%{_escape_like(query.strip())}%'
+    where = f"(e.search_vector @@ to_tsquery('simple', %s) OR (e.title || ' ' || e.body) ILIKE %s){filters}"
+    return where, [_tsquery(terms), like, *params]
+
+
+def _search_postgres(query, terms, filters, params, limit):
+    where, where_params = _postgres_where(query, terms, filters, params)
+    sql = f"""
+        SELECT e.id, ts_rank(e.search_vector, to_tsquery('simple', %s)) + similarity(e.title, %s) AS rank
+        FROM users_searchentry e
+        WHERE {where}
+        ORDER BY rank DESC, e.id
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_tsquery(terms), query, *where_params, limit])
+        return cursor.fetchall()
+
+
+def _fts_table_exists():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def _fts_match(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _search_sqlite(terms, filters, params, limit):
+    match = _fts_match(terms)
+    # bm25: менше - краще; title важить більше за body
+    sql = f"""
+        SELECT e.id, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank
+        FROM {FTS_TABLE} JOIN users_searchentry e ON e.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s{filters}
+        ORDER BY rank DESC, e.id
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, *params, limit])
+        return cursor.fetchall()
+
+
+def _fallback_queryset(terms, user_id=None, department_id=None, source_types=None):
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    queryset = SearchEntry.objects.all()
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    if department_id is not None:
+        queryset = queryset.filter(department_id=department_id)
+    if source_types:
+        queryset = queryset.filter(source_type__in=source_types)
+    return queryset
+
+
+def _search_fallback(terms, user_id, department_id, source_types, limit):
+    queryset = _fallback_queryset(terms, user_id, department_id, source_types)
+    return [(pk, 0.0) for pk in queryset.order_by('source_type', 'title').values_list('pk', flat=True)[:limit]]
+
+
+def search_ids(query, user_id=None, department_id=None, source_types=None, limit=20):
+    """[(id SearchEntry, rank)] від найрелевантнішого"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+    filters, params = _filters(user_id, department_id, source_types)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(query, terms, filters, params, limit)
+    if connection.vendor == 'sqlite' and _fts_table_exists():
+        return _search_sqlite(terms, filters, params, limit)
+    return _search_fallback(terms, user_id, department_id, source_types, limit)
+
+
+def search(query, user_id=None, department_id=None, source_types=None, limit=20):
+    """SearchEntry з атрибутом rank (user підвантажений)"""
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    ranked = search_ids(query, user_id, department_id, source_types, limit)
+    entries = SearchEntry.objects.select_related('user').in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, rank in ranked:
+        entry = entries.get(pk)
+        if entry is not None:
+            entry.rank = float(rank or 0)
+            results.append(entry)
+    return results
+
+
+def matching_user_ids(query, department_id=None):
+    """
+    Тендери, у яких щось знайдено (сам тендер, співробітник чи техніка) - для адмінки.
+    Без MAX_LIMIT і ранжування: підзапит user_id для queryset.filter(pk__in=...),
+    тож changelist рахує і сторінкує всі збіги.
+    """
+    SearchEntry = django_apps.get_model('users', 'SearchEntry')
+    terms = tokenize(query)
+    if not terms:
+        return SearchEntry.objects.none().values('user_id')
+    filters, params = _filters(None, department_id, None)
+    if connection.vendor == 'postgresql':
+        where, where_params = _postgres_where(query, terms, filters, params)
+        matches = RawSQL(f'SELECT e.id FROM users_searchentry e WHERE {where}', where_params)
+    elif connection.vendor == 'sqlite' and _fts_table_exists():
+        matches = RawSQL(
+            f'SELECT e.id FROM {FTS_TABLE} JOIN users_searchentry e ON e.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s{filters}',
+            [_fts_match(terms), *params],
+        )
+    else:
+        return _fallback_queryset(terms, department_id=department_id).values('user_id')
+    return SearchEntry.objects.filter(pk__in=matches).values('user_id')
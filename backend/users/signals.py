@@ -0,0 +1,216 @@
+# backend/users/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+
+from .models import (
+    UserWork, UserEmployee, UserOrder, UserTechnic, UserInstrument, UserPPE, UserDocument,
+    TechnicType, InstrumentType, Permit
+)
+from .services import expiry, outbox, readiness, search
+from .services.documents import (
+    owner_type_for, sync_document_files, delete_document_files, bulk_create_document_files
+)
+
+DOCUMENT_OWNERS = (UserOrder, UserTechnic, UserInstrument, UserPPE)
+
+# bulk_create не надсилає post_save - масові операції надсилають цей сигнал
+# з instances=[створені об'єкти з pk]
+bulk_created = Signal()
+
+
+# ===================================================================
+# Нормалізовані документи (DocumentFile) та їх терміни дії
+
+def document_owner_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Оновлюємо DocumentFile коли змінюється JSON поле documents"""
+    if raw:
+        return
+    if update_fields is not None and 'documents' not in update_fields:
+        return
+    sync_document_files(instance)
+    expiry.index_document_owner(instance, owner_type_for(instance))
+
+
+def document_owner_deleted(sender, instance, **kwargs):
+    delete_document_files(instance)
+    expiry.remove(owner_type_for(instance), instance.pk)
+
+
+for _model in DOCUMENT_OWNERS:
+    post_save.connect(document_owner_saved, sender=_model, dispatch_uid=f'docfiles_save_{_model.__name__}')
+    post_delete.connect(document_owner_deleted, sender=_model, dispatch_uid=f'docfiles_delete_{_model.__name__}')
+
+
+# ===================================================================
+# Індекс термінів дії (ExpiryRecord)
+
+def employee_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        expiry.index_employee(instance)
+
+
+def employee_deleted(sender, instance, **kwargs):
+    expiry.remove('employee', instance.pk)
+
+
+def work_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        expiry.index_work(instance)
+
+
+def work_deleted(sender, instance, **kwargs):
+    expiry.remove('work', instance.pk)
+
+
+# Адмінка зберігає переможців через проксі-модель TenderUser (users/admin.py), тому
+# обробники користувача підключаються і до неї; sender рядком - проксі ще не імпортована
+USER_SENDERS = ('users.User', 'users.TenderUser')
+
+
+def user_saved(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    # Вхід (update_last_login) та інші збереження без зміни підрозділу/is_staff нічого не перераховують
+    if raw or not instance.readiness_changed(update_fields):
+        return
+    if not created:
+        expiry.update_user_department(instance)
+    if not instance.is_staff:
+        # Новий переможець одразу отримує рядок UserReadiness
+        readiness.schedule_refresh(instance.pk)
+
+
+post_save.connect(employee_saved, sender=UserEmployee, dispatch_uid='expiry_employee_save')
+post_delete.connect(employee_deleted, sender=UserEmployee, dispatch_uid='expiry_employee_delete')
+post_save.connect(work_saved, sender=UserWork, dispatch_uid='expiry_work_save')
+post_delete.connect(work_deleted, sender=UserWork, dispatch_uid='expiry_work_delete')
+for _sender in USER_SENDERS:
+    post_save.connect(user_saved, sender=_sender, dispatch_uid=f'expiry_user_save_{_sender}')
+
+
+# ===================================================================
+# Підсумок готовності (UserReadiness)
+# Реєструються після DocumentFile, щоб перерахунок бачив оновлені файли
+
+READINESS_SOURCES = (UserEmployee, UserTechnic, UserInstrument, UserOrder, UserWork, UserDocument)
+
+
+def readiness_source_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        readiness.schedule_refresh(instance.user_id)
+
+
+for _model in READINESS_SOURCES:
+    post_save.connect(readiness_source_changed, sender=_model, dispatch_uid=f'readiness_save_{_model.__name__}')
+    post_delete.connect(readiness_source_changed, sender=_model, dispatch_uid=f'readiness_delete_{_model.__name__}')
+
+
+# ===================================================================
+# Масові операції (bulk_create)
+
+def employees_bulk_created(sender, instances, **kwargs):
+    expiry.index_employees(instances)
+    for user_id in {instance.user_id for instance in instances}:
+        readiness.schedule_refresh(user_id)
+
+
+bulk_created.connect(employees_bulk_created, sender=UserEmployee, dispatch_uid='bulk_employees')
+
+
+def document_owners_bulk_created(sender, instances, **kwargs):
+    bulk_create_document_files(instances)
+    if instances:
+        expiry.index_document_owners(instances, owner_type_for(instances[0]))
+    for user_id in {instance.user_id for instance in instances}:
+        readiness.schedule_refresh(user_id)
+
+
+for _model in DOCUMENT_OWNERS:
+    bulk_created.connect(document_owners_bulk_created, sender=_model, dispatch_uid=f'bulk_{_model.__name__}')
+
+
+# ===================================================================
+# Пошуковий індекс (SearchEntry)
+
+SEARCH_SOURCES = {
+    UserEmployee: 'employee',
+    UserTechnic: 'technic',
+    UserInstrument: 'instrument',
+}
+
+
+def search_user_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_tender(instance)
+
+
+def search_source_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_objects(SEARCH_SOURCES[sender], [instance])
+
+
+def search_source_deleted(sender, instance, **kwargs):
+    search.remove(SEARCH_SOURCES[sender], instance.pk)
+
+
+def search_sources_bulk_created(sender, instances, **kwargs):
+    search.index_objects(SEARCH_SOURCES[sender], instances)
+
+
+def search_type_renamed(sender, instance, raw=False, created=False, **kwargs):
+    """Назва типу входить у записи техніки/інструментів"""
+    if raw or created:
+        return
+    if sender is TechnicType:
+        search.index_objects('technic', list(instance.usertechnic_set.select_related('technic_type')))
+    else:
+        search.index_objects('instrument', list(instance.userinstrument_set.select_related('instrument_type')))
+
+
+for _sender in USER_SENDERS:
+    post_save.connect(search_user_saved, sender=_sender, dispatch_uid=f'search_user_save_{_sender}')
+for _model in SEARCH_SOURCES:
+    post_save.connect(search_source_saved, sender=_model, dispatch_uid=f'search_save_{_model.__name__}')
+    post_delete.connect(search_source_deleted, sender=_model, dispatch_uid=f'search_delete_{_model.__name__}')
+    bulk_created.connect(search_sources_bulk_created, sender=_model, dispatch_uid=f'search_bulk_{_model.__name__}')
+for _model in (TechnicType, InstrumentType):
+    post_save.connect(search_type_renamed, sender=_model, dispatch_uid=f'search_type_{_model.__name__}')
+
+
+# ===================================================================
+# Outbox змін для зовнішніх систем (OutboxEvent)
+
+OUTBOX_SOURCES = (UserEmployee, UserTechnic, UserInstrument, UserOrder, Permit)
+
+
+def outbox_user_saved(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    if raw or instance.is_staff:
+        return
+    if update_fields is not None and set(update_fields) <= outbox.IGNORED_USER_FIELDS:
+        return
+    outbox.record(instance, 'created' if created else 'updated')
+
+
+def outbox_user_deleted(sender, instance, **kwargs):
+    if not instance.is_staff:
+        outbox.record(instance, 'deleted')
+
+
+def outbox_source_saved(sender, instance, raw=False, created=False, **kwargs):
+    if not raw:
+        outbox.record(instance, 'created' if created else 'updated')
+
+
+def outbox_source_deleted(sender, instance, **kwargs):
+    outbox.record(instance, 'deleted')
+
+
+def outbox_sources_bulk_created(sender, instances, **kwargs):
+    outbox.record_many(instances, 'created')
+
+
+for _sender in USER_SENDERS:
+    post_save.connect(outbox_user_saved, sender=_sender, dispatch_uid=f'outbox_user_save_{_sender}')
+    post_delete.connect(outbox_user_deleted, sender=_sender, dispatch_uid=f'outbox_user_delete_{_sender}')
+for _model in OUTBOX_SOURCES:
+    post_save.connect(outbox_source_saved, sender=_model, dispatch_uid=f'outbox_save_{_model.__name__}')
+    post_delete.connect(outbox_source_deleted, sender=_model, dispatch_uid=f'outbox_delete_{_model.__name__}')
+    bulk_created.connect(outbox_sources_bulk_created, sender=_model, dispatch_uid=f'outbox_bulk_{_model.__name__}')
@@ -1,3 +1,602 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from users.management.commands.explain_hot_paths import hot_paths
+from users.models import (
+    TOWER_CRANE, Department, DocumentFile, ExpiryRecord, OutboxEvent, TechnicType, User, UserEmployee,
+    UserSpecification, UserTechnic, UserWork, WorkSubType, WorkType,
+)
+from users.services import expiry, outbox
+from users.services.bulk_import import TypeMatcher, import_employees, import_technics
+from utils import db_router
+from utils.middleware import ReplicaRoutingMiddleware
+from utils.renderers import FastJSONRenderer
+
+REPLICA = db_router.REPLICA_DB_ALIAS
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Репліка - окремий SQLite файл: знімок default у setUp, після нього записи
+    йдуть лише в default. Що бачить запит - з тієї бази він і читав.
+    TransactionTestCase: всередині atomic (TestCase) читання завжди з default.
+
+    Alias репліки з'являється лише на час класу (settings.DATABASES його не має),
+    тож test runner не перевіряє і не створює для нього тестову БД.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.mkdtemp()
+        replica = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3')}
+        settings.DATABASES[REPLICA] = replica
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], REPLICA: dict(replica),
+        })[REPLICA]
+        cls.databases = cls.databases | {REPLICA}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        connections.settings.pop(REPLICA, None)
+        settings.DATABASES.pop(REPLICA, None)
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        Department.objects.create(name='Підрозділ А', code='A')
+        self.snapshot_replica()
+
+    def snapshot_replica(self):
+        """Копія default (схема і дані) у файл репліки"""
+        connections[REPLICA].close()
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        target = sqlite3.connect(settings.DATABASES[REPLICA]['NAME'])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+
+    def department_codes(self, response):
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['code'] for row in response.json()['results'])
+
+    def test_get_api_reads_from_replica(self):
+        Department.objects.create(name='Підрозділ Б', code='B')
+        response = self.client.get('/api/auth/departments/')
+        self.assertEqual(self.department_codes(response), ['A'])
+        self.assertNotIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+
+    def test_write_pins_rest_of_scope_to_primary(self):
+        Department.objects.create(name='Підрозділ Б', code='B')
+        with db_router.routing_scope(replica=True):
+            self.assertFalse(Department.objects.filter(code='B').exists())
+            Department.objects.filter(code='A').update(description='змінено')
+            self.assertTrue(db_router.wrote_to_primary())
+            self.assertTrue(Department.objects.filter(code='B').exists())
+
+    def test_write_alias_without_write_does_not_pin(self):
+        Department.objects.create(name='Підрозділ Б', code='B')
+        with db_router.routing_scope(replica=True):
+            Department.objects.get_or_create(code='A', defaults={'name': 'Підрозділ А'})
+            with transaction.atomic():
+                list(Department.objects.select_for_update().filter(code='A'))
+            self.assertFalse(db_router.wrote_to_primary())
+            self.assertFalse(Department.objects.filter(code='B').exists())
+
+    def test_write_in_get_request_sets_primary_cookie(self):
+        user = User.objects.create_user(email='tender@example.com', username='tender', password=None)
+        self.client.force_login(user)
+        self.snapshot_replica()  # користувач і сесія - в обох базах
+        response = self.client.get('/api/auth/user-specification/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(ReplicaRoutingMiddleware.PIN_COOKIE, response.cookies)
+        self.assertTrue(UserSpecification.objects.filter(user=user).exists())
+
+    def test_primary_cookie_pins_next_request(self):
+        Department.objects.create(name='Підрозділ Б', code='B')
+        self.client.cookies[ReplicaRoutingMiddleware.PIN_COOKIE] = '1'
+        response = self.client.get('/api/auth/departments/')
+        self.assertEqual(self.department_codes(response), ['A', 'B'])
+
+class HotPathIndexTests(TestCase):
+    """Гарячі запити списків мають використовувати індекси з міграції 0025"""
+
+    def test_hot_paths_use_indexes(self):
+        if connections[DEFAULT_DB_ALIAS].vendor == 'postgresql':
+            # На порожніх таблицях планувальник обирає seq scan; перевіряємо, що індекс придатний
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for label, queryset, index_name in hot_paths():
+            with self.subTest(label):
+                self.assertIn(index_name, queryset.explain())
+
+
+class DocumentFileSyncTests(TestCase):
+    """DocumentFile з JSON documents: рядки узгоджуються, файли хешуються після коміту"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.media_root = media_root
+        self.user = User.objects.create(username='tender', email='tender@example.com', tender_number='T-1')
+
+    def write_file(self, name, content):
+        with open(os.path.join(self.media_root, name), 'wb') as file:
+            file.write(content)
+        return {'name': name, 'path': f'/media/{name}'}
+
+    def test_digest_is_computed_after_commit(self):
+        passport = self.write_file('passport.pdf', b'passport')
+        with self.captureOnCommitCallbacks() as callbacks:
+            technic = UserTechnic.objects.create(user=self.user, custom_type='Кран', documents={'Техпаспорт': [passport]})
+        document_file = DocumentFile.objects.get(owner_type='technic', owner_id=technic.pk)
+        self.assertEqual(document_file.digest, '')
+
+        for callback in callbacks:
+            callback()
+        document_file.refresh_from_db()
+        self.assertEqual(document_file.digest, hashlib.sha256(b'passport').hexdigest())
+
+    def test_resave_keeps_unchanged_rows(self):
+        passport = self.write_file('passport.pdf', b'passport')
+        insurance = self.write_file('insurance.pdf', b'insurance')
+        with self.captureOnCommitCallbacks(execute=True):
+            technic = UserTechnic.objects.create(user=self.user, custom_type='Кран', documents={'Техпаспорт': [passport]})
+        kept = DocumentFile.objects.get(owner_type='technic', owner_id=technic.pk)
+
+        technic.documents = {'Техпаспорт': [passport], 'Поліс': [insurance]}
+        with self.captureOnCommitCallbacks(execute=True):
+            technic.save()
+
+        rows = DocumentFile.objects.filter(owner_type='technic', owner_id=technic.pk)
+        self.assertEqual(rows.count(), 2)
+        self.assertTrue(rows.filter(pk=kept.pk, digest=kept.digest).exists())
+        self.assertEqual(rows.get(document_type='Поліс').digest, hashlib.sha256(b'insurance').hexdigest())
+
+        technic.documents = {'Поліс': [insurance]}
+        technic.save()
+        self.assertEqual(list(rows.values_list('document_type', flat=True)), ['Поліс'])
+
+
+class ReadinessScheduleTests(TransactionTestCase):
+    """schedule_refresh: один перерахунок на транзакцію (справжні коміти, тому TransactionTestCase)"""
+
+    def setUp(self):
+        self.first = User.objects.create(username='first', email='first@example.com', tender_number='T-1')
+        self.second = User.objects.create(username='second', email='second@example.com', tender_number='T-2')
+
+    def test_one_refresh_per_transaction(self):
+        with mock.patch('users.services.readiness.refresh_readiness') as refresh:
+            with transaction.atomic():
+                for number in range(5):
+                    UserEmployee.objects.create(user=self.first, name=f'Співробітник {number}')
+                UserEmployee.objects.create(user=self.second, name='Співробітник')
+
+        refresh.assert_called_once()
+        self.assertEqual(set(refresh.call_args.args[0]), {self.first.pk, self.second.pk})
+
+    def test_rolled_back_savepoint_does_not_lose_later_refresh(self):
+        with mock.patch('users.services.readiness.refresh_readiness') as refresh:
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        UserEmployee.objects.create(user=self.first, name='Співробітник')
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                UserEmployee.objects.create(user=self.second, name='Співробітник')
+
+        refresh.assert_called_once()
+        self.assertEqual(set(refresh.call_args.args[0]), {self.second.pk})
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Вивід і помилки FastJSONRenderer збігаються з JSONRenderer DRF"""
+
+    def assertSameAsDRF(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_plain_data(self):
+        self.assertSameAsDRF({'name': 'Тендер\u2028', 'items': [1, 2.5, None, True], 1: 'x'})
+
+    def test_non_finite_float_raises_in_strict_mode(self):
+        for data in ({'value': float('nan')}, [[float('inf')]], {'value': Decimal('NaN')}):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                FastJSONRenderer().render(data)
+
+    def test_null_without_non_finite(self):
+        self.assertSameAsDRF({'value': None, 'nested': [{'value': 1.5}]})
+
+    def test_non_finite_float_without_strict_mode(self):
+        with mock.patch.object(FastJSONRenderer, 'strict', False), \
+                mock.patch.object(JSONRenderer, 'strict', False):
+            self.assertSameAsDRF({'value': float('nan'), 'other': [float('-inf')]})
+
+    def test_int_wider_than_int64(self):
+        self.assertSameAsDRF({'value': 2 ** 70, 'negative': -2 ** 64})
+
+
+class EmployeeImportTests(TestCase):
+    """import_employees: CSV/архів, помилки рядків, прибирання файлів"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.media_root = media_root
+        self.user = User.objects.create(username='tender', email='tender@example.com', tender_number='T-1')
+        self.future = (timezone.localdate() + timedelta(days=365)).strftime('%d.%m.%Y')
+
+    def csv_file(self, text, encoding='utf-8'):
+        return SimpleUploadedFile('employees.csv', text.encode(encoding))
+
+    def zip_file(self, files):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, content in files.items():
+                archive.writestr(name, content)
+        return SimpleUploadedFile('files.zip', buffer.getvalue())
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def test_csv_with_archive(self):
+        table = self.csv_file(
+            'ПІБ,Посада,Медогляд,Фото\n'
+            f'Іваненко Іван,Монтажник,{self.future},photo.jpg\n'
+            'Петренко Петро,Зварник,,\n'
+        )
+        result = import_employees(self.user, table, self.zip_file({'photos/photo.jpg': b'photo'}))
+
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(len(result['created']), 2)
+        employee = UserEmployee.objects.get(user=self.user, name='Іваненко Іван')
+        self.assertEqual(employee.position, 'Монтажник')
+        self.assertEqual(employee.medical_exam_date.strftime('%d.%m.%Y'), self.future)
+        with employee.photo.open('rb') as photo:
+            self.assertEqual(photo.read(), b'photo')
+        self.assertEqual(self.stored_files(), [os.path.basename(employee.photo.name)])
+
+    def test_row_error_creates_nothing(self):
+        table = self.csv_file(
+            'ПІБ,Медогляд,Фото\n'
+            'Іваненко Іван,,photo.jpg\n'
+            'Петренко Петро,31.02.2030,\n'
+        )
+        result = import_employees(self.user, table, self.zip_file({'photo.jpg': b'photo'}))
+
+        self.assertEqual(result['created'], [])
+        self.assertEqual(result['errors'], [{
+            'row': 3, 'field': 'medical_exam_date', 'error': 'Невірний формат дати (очікується ДД.ММ.РРРР)',
+        }])
+        self.assertFalse(UserEmployee.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_failed_insert_removes_stored_files(self):
+        table = self.csv_file('ПІБ,Фото\nІваненко Іван,photo.jpg\n')
+        with mock.patch('users.services.bulk_import._bulk_create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                import_employees(self.user, table, self.zip_file({'photo.jpg': b'photo'}))
+
+        self.assertFalse(UserEmployee.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_cp1251_csv_with_semicolons(self):
+        table = self.csv_file('ПІБ;Посада;Організація\nІваненко Іван;Монтажник;Клініка "Здоров\'я"\n', 'cp1251')
+        result = import_employees(self.user, table)
+
+        self.assertEqual(result['errors'], [])
+        employee = UserEmployee.objects.get(user=self.user)
+        self.assertEqual(
+            (employee.name, employee.position, employee.organization_name),
+            ('Іваненко Іван', 'Монтажник', 'Клініка "Здоров\'я"'),
+        )
+
+
+class TechnicImportTests(TestCase):
+    """Зіставлення типів (TypeMatcher) і перевірка держномерів у import_technics"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='tender', email='tender@example.com', tender_number='T-1')
+        self.crane_25 = TechnicType.objects.create(name='Автокран 25т')
+        self.crane_50 = TechnicType.objects.create(name='Автокран 50т')
+        self.tower_crane = TechnicType.objects.create(name=TOWER_CRANE)
+
+    def import_csv(self, text):
+        return import_technics(self.user, SimpleUploadedFile('technics.csv', text.encode()))
+
+    def test_type_matcher(self):
+        matcher = TypeMatcher(TechnicType.objects.all())
+        cases = [
+            ('автокран  25Т', self.crane_25, False),  # регістр і пробіли
+            ('Aвтoкpaн 25т', self.crane_25, False),  # латинські A, o, p, a
+            ('Автокрн 25т', self.crane_25, True),
+            ('Автокран 35т', None, False),  # число інше - не 25т і не 50т
+            ('Екскаватор', None, False),
+        ]
+        for name, expected, fuzzy in cases:
+            with self.subTest(name=name):
+                self.assertEqual(matcher.match(name), (expected, fuzzy))
+
+    def test_fuzzy_match_is_reported_in_warnings(self):
+        result = self.import_csv('Тип техніки,Держномер\nАвтокрн 50т,AA1234BB\nАвтокран 35т,\n')
+
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(result['warnings'], [
+            {'row': 2, 'field': 'type', 'value': 'Автокрн 50т', 'matched': 'Автокран 50т'},
+        ])
+        matched, custom = sorted(result['created'], key=lambda technic: technic.pk)
+        self.assertEqual(matched.technic_type, self.crane_50)
+        self.assertEqual((custom.technic_type, custom.custom_type), (None, 'Автокран 35т'))
+
+    def test_registration_number_rules(self):
+        result = self.import_csv(f'Тип техніки,Держномер\n{TOWER_CRANE},\nАвтокран 25т,\n')
+
+        self.assertEqual(result['created'], [])
+        self.assertEqual(result['errors'], [{
+            'row': 3, 'field': 'registration_number',
+            'error': "Поле 'Державний реєстраційний номер' є обов'язковим для заповнення",
+        }])
+
+        result = self.import_csv(f'Тип техніки,Держномер\n{TOWER_CRANE},\n')
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(result['created'][0].registration_number, '')
+
+    def test_duplicate_registration_numbers(self):
+        UserTechnic.objects.create(user=self.user, technic_type=self.crane_25, registration_number='KA0001AA')
+        # Латинські і кириличні літери номеру вважаються однаковими
+        result = self.import_csv(
+            'Тип техніки,Держномер\n'
+            'Автокран 25т,AA1234BB\n'
+            'Автокран 50т,АА1234ВВ\n'
+            'Автокран 50т,ka0001aa\n'
+        )
+
+        self.assertEqual(result['created'], [])
+        self.assertEqual(result['errors'], [
+            {'row': 3, 'field': 'registration_number', 'error': 'Номер повторюється (рядок 2)'},
+            {'row': 4, 'field': 'registration_number', 'error': 'Техніка з таким номером вже додана'},
+        ])
+        self.assertEqual(UserTechnic.objects.filter(user=self.user).count(), 1)
+
+
+class ExpiryIndexTests(TestCase):
+    """ExpiryRecord підтримується сигналами і збігається з повною перебудовою"""
+
+    def setUp(self):
+        self.department = Department.objects.create(name='Підрозділ', code='D1')
+        self.user = User.objects.create(
+            username='tender', email='tender@example.com', tender_number='T-1', department=self.department
+        )
+        self.crane = TechnicType.objects.create(name='Автокран 25т')
+
+    def records(self):
+        return sorted(
+            ExpiryRecord.objects.values_list('source_type', 'source_id', 'kind', 'title', 'department_id', 'expiry_date')
+        )
+
+    def test_document_dates(self):
+        technic = UserTechnic.objects.create(
+            user=self.user, technic_type=self.crane, registration_number='AA1234BB',
+            documents={
+                'Техпаспорт': [{'name': 'passport.pdf', 'path': '/media/passport.pdf', 'expiry_date': '2030-05-01'}],
+                'Страховка': [
+                    {'name': 'insurance.pdf', 'path': '/media/insurance.pdf', 'expiry_date': '01.02.2031'},
+                    {'name': 'photo.jpg', 'path': '/media/photo.jpg'},
+                ],
+            },
+        )
+        self.assertEqual(self.records(), [
+            ('technic', technic.pk, 'Страховка', 'Автокран 25т', self.department.pk, date(2031, 2, 1)),
+            ('technic', technic.pk, 'Техпаспорт', 'Автокран 25т', self.department.pk, date(2030, 5, 1)),
+        ])
+
+        technic.documents['Техпаспорт'][0]['expiry_date'] = '2032-05-01'
+        del technic.documents['Страховка']
+        technic.save()
+        self.assertEqual(self.records(), [
+            ('technic', technic.pk, 'Техпаспорт', 'Автокран 25т', self.department.pk, date(2032, 5, 1)),
+        ])
+
+        technic.delete()
+        self.assertEqual(self.records(), [])
+
+    def test_employee_and_work_dates(self):
+        employee = UserEmployee.objects.create(
+            user=self.user, name='Іваненко Іван', medical_exam_date=date(2030, 1, 1),
+            safety_training_date=date(2030, 6, 1),
+        )
+        sub_type = WorkSubType.objects.create(work_type=WorkType.objects.create(name='Висотні роботи'), name='Монтаж')
+        work = UserWork.objects.create(
+            user=self.user, work_type=sub_type.work_type, work_sub_type=sub_type, expiry_date=date(2031, 1, 1)
+        )
+        self.assertEqual(self.records(), [
+            ('employee', employee.pk, 'Медичний огляд', 'Іваненко Іван', self.department.pk, date(2030, 1, 1)),
+            ('employee', employee.pk, 'Посвідчення з охорони праці', 'Іваненко Іван', self.department.pk, date(2030, 6, 1)),
+            ('work', work.pk, 'Дозвіл на роботи', 'Монтаж', self.department.pk, date(2031, 1, 1)),
+        ])
+
+        employee.medical_exam_date = None
+        employee.save()
+        other = Department.objects.create(name='Інший підрозділ', code='D2')
+        self.user.department = other
+        self.user.save()
+        self.assertEqual(self.records(), [
+            ('employee', employee.pk, 'Посвідчення з охорони праці', 'Іваненко Іван', other.pk, date(2030, 6, 1)),
+            ('work', work.pk, 'Дозвіл на роботи', 'Монтаж', other.pk, date(2031, 1, 1)),
+        ])
+
+    def test_bulk_import_and_rebuild(self):
+        future = timezone.localdate() + timedelta(days=365)
+        table = SimpleUploadedFile(
+            'employees.csv', f'ПІБ,Медогляд\nІваненко Іван,{future:%d.%m.%Y}\nПетренко Петро,\n'.encode()
+        )
+        import_employees(self.user, table)
+        UserTechnic.objects.create(
+            user=self.user, custom_type='Трал',
+            documents={'Техпаспорт': [{'name': 'passport.pdf', 'path': '/media/passport.pdf', 'expiry_date': '2030-05-01'}]},
+        )
+        employee = UserEmployee.objects.get(name='Іваненко Іван')
+        indexed = self.records()
+        self.assertIn(('employee', employee.pk, 'Медичний огляд', 'Іваненко Іван', self.department.pk, future), indexed)
+        self.assertEqual(len(indexed), 2)
+
+        ExpiryRecord.objects.all().delete()
+        self.assertEqual(expiry.rebuild_index(), 2)
+        self.assertEqual(self.records(), indexed)
+
+
+class OutboxTests(TestCase):
+    """Курсор outbox (position): пакети, long-poll, record_many, пізній коміт"""
+
+    def setUp(self):
+        self.department = Department.objects.create(name='Підрозділ', code='D1')
+        self.user = User.objects.create(
+            username='tender', email='tender@example.com', tender_number='T-1', department=self.department
+        )
+
+    def names(self, events):
+        return [event.payload.get('name', event.payload.get('tender_number')) for event in events]
+
+    def test_record_many(self):
+        cursor = outbox.latest_cursor()
+        table = SimpleUploadedFile('employees.csv', 'ПІБ,Посада\nІваненко Іван,Монтажник\nПетренко Петро,\n'.encode())
+        created = import_employees(self.user, table)['created']
+
+        events = outbox.events_after(cursor)
+        self.assertEqual(
+            [(e.source_type, e.source_id, e.action, e.tender_id, e.department_id, e.payload) for e in events],
+            [
+                ('employee', created[0].pk, 'created', self.user.pk, self.department.pk,
+                 {'name': 'Іваненко Іван', 'position': 'Монтажник'}),
+                ('employee', created[1].pk, 'created', self.user.pk, self.department.pk,
+                 {'name': 'Петренко Петро', 'position': ''}),
+            ],
+        )
+
+    def test_cursor_paging(self):
+        other = User.objects.create(username='other', email='other@example.com', tender_number='T-2')
+        for i in range(5):
+            UserEmployee.objects.create(user=self.user if i % 2 == 0 else other, name=f'Співробітник {i}')
+
+        pages, cursor = [], 0
+        while events := outbox.events_after(cursor, limit=2):
+            pages.append(events)
+            cursor = events[-1].position
+        delivered = [event for page in pages for event in page]
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(delivered, list(OutboxEvent.objects.order_by('id')))
+        self.assertEqual([event.position for event in delivered], sorted({event.position for event in delivered}))
+        self.assertEqual(cursor, outbox.latest_cursor())
+
+        department_events = outbox.events_after(0, department_id=self.department.pk, source_types=['employee'])
+        self.assertEqual(self.names(department_events), ['Співробітник 0', 'Співробітник 2', 'Співробітник 4'])
+
+    def test_long_poll(self):
+        cursor = outbox.latest_cursor()
+
+        def create_employee(seconds):
+            UserEmployee.objects.create(user=self.user, name='Новий')
+
+        with mock.patch('users.services.outbox.time.sleep', side_effect=create_employee) as sleep:
+            events = outbox.wait_for_events(cursor, 5)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(self.names(events), ['Новий'])
+
+        with mock.patch('users.services.outbox.time.sleep') as sleep:
+            self.assertEqual(outbox.wait_for_events(events[-1].position, 0), [])
+        sleep.assert_not_called()
+
+    def test_event_committed_after_cursor_passed_it(self):
+        # SQLite пускає лише одного писача, тож довгу транзакцію імітуємо: id події видано
+        # раніше (менший), а видимою вона стає вже після того, як курсор пройшов наступну
+        employee = UserEmployee.objects.create(user=self.user, name='Довга транзакція')
+        late = OutboxEvent.objects.get(source_type='employee', source_id=employee.pk)
+        OutboxEvent.objects.filter(pk=late.pk).delete()
+        UserEmployee.objects.create(user=self.user, name='Коротка транзакція')
+        cursor = outbox.events_after(0)[-1].position
+
+        late.save(force_insert=True)
+        events = outbox.events_after(cursor)
+        self.assertEqual(events, [late])
+        self.assertLess(late.pk, OutboxEvent.objects.latest('id').pk)
+        self.assertGreater(events[0].position, cursor)
+
+    def test_prune_keeps_numbering(self):
+        UserEmployee.objects.create(user=self.user, name='Старий')
+        cursor = outbox.latest_cursor()
+        total = OutboxEvent.objects.update(created_at=timezone.now() - timedelta(days=outbox.RETENTION_DAYS + 1))
+
+        # Остання подія лишається - від неї продовжується нумерація
+        self.assertEqual(outbox.prune(), total - 1)
+        self.assertEqual(OutboxEvent.objects.get().position, cursor)
+        UserEmployee.objects.create(user=self.user, name='Новий')
+        self.assertEqual(self.names(outbox.events_after(cursor)), ['Новий'])
+
+    def test_view(self):
+        admin = User.objects.create(username='admin', email='admin@example.com')
+        User.objects.filter(pk=admin.pk).update(is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        cursor = self.client.get('/api/auth/outbox/', {'cursor': 'latest'}).json()['cursor']
+        employee = UserEmployee.objects.create(user=self.user, name='Новий')
+
+        response = self.client.get('/api/auth/outbox/', {'cursor': cursor, 'type': 'employee'}).json()
+        self.assertEqual([(e['source_id'], e['action']) for e in response['events']], [(employee.pk, 'created')])
+        self.assertEqual(response['cursor'], response['events'][-1]['position'])
+        self.assertGreater(response['cursor'], cursor)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SQLite не виконує дві транзакції із записом одночасно')
+class OutboxConcurrentTransactionTests(TransactionTestCase):
+    """Подія довгої транзакції, закомітчена після того, як курсор пройшов новішу"""
+
+    def test_long_transaction(self):
+        first = User.objects.create(username='first', email='first@example.com', tender_number='T-1')
+        second = User.objects.create(username='second', email='second@example.com', tender_number='T-2')
+        cursor = outbox.latest_cursor()
+        inserted, finish = threading.Event(), threading.Event()
+
+        def long_transaction():
+            try:
+                with transaction.atomic():
+                    UserEmployee.objects.create(user_id=first.pk, name='Довга транзакція')
+                    inserted.set()
+                    finish.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=long_transaction)
+        thread.start()
+        try:
+            self.assertTrue(inserted.wait(10))
+            UserEmployee.objects.create(user=second, name='Коротка транзакція')
+            events = outbox.events_after(cursor)
+            self.assertEqual([event.payload['name'] for event in events], ['Коротка транзакція'])
+            cursor = events[-1].position
+        finally:
+            finish.set()
+            thread.join()
+
+        self.assertEqual([event.payload['name'] for event in outbox.events_after(cursor)], ['Довга транзакція'])
 
-# Create your tests here.
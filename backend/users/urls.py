@@ -38,6 +38,7 @@ urlpatterns = [
     # ===================================================================
     # Співробітники (таб Співробітники)  
     path('user-employees/', views.UserEmployeeListCreateView.as_view(), name='user-employees-list'),
+    path('user-employees/import/', views.import_employees, name='user-employees-import'),
     path('user-employees/<int:pk>/', views.UserEmployeeDetailView.as_view(), name='user-employees-detail'),
     
     # ===================================================================
@@ -49,11 +50,13 @@ urlpatterns = [
     # ===================================================================
     # Техніка (таб Техніка)
     path('user-technics/', views.UserTechnicListCreateView.as_view(), name='user-technics-list'),
+    path('user-technics/import/', views.import_technics, name='user-technics-import'),
     path('user-technics/<int:pk>/', views.UserTechnicDetailView.as_view(), name='user-technics-detail'),
     
     # ===================================================================
     # Інструменти (таб Інструменти)
     path('user-instruments/', views.UserInstrumentListCreateView.as_view(), name='user-instruments-list'),
+    path('user-instruments/import/', views.import_instruments, name='user-instruments-import'),
     path('user-instruments/<int:pk>/', views.UserInstrumentDetailView.as_view(), name='user-instruments-detail'),
     
     # ===================================================================
@@ -63,13 +66,15 @@ urlpatterns = [
     # ===================================================================
     # Допоміжні endpoints
     path('upload-document/', views.upload_document, name='upload-document'),
+    path('search/', views.search_view, name='search'),
+    path('outbox/', views.outbox_view, name='outbox'),
     # ===================================================================
-    path('admin/orders/', views.AdminOrderListView.as_view(), name='admin-orders'),
-    path('admin/technics/', views.AdminTechnicListView.as_view(), name='admin-technics'),
-    path('admin/employees/', views.AdminEmployeeListView.as_view(), name='admin-employees'),
-    path('admin/instruments/', views.AdminInstrumentListView.as_view(), name='admin-instruments'),
-    path('admin/ppe/', views.AdminPPEListView.as_view(), name='admin-ppe'),
-    path('admin/specifications/', views.AdminSpecificationListView.as_view(), name='admin-specifications'),
+    path('admin/orders/', views.admin_orders_view, name='admin-orders'),
+    path('admin/technics/', views.admin_technics_view, name='admin-technics'),
+    path('admin/employees/', views.admin_employees_view, name='admin-employees'),
+    path('admin/instruments/', views.admin_instruments_view, name='admin-instruments'),
+    path('admin/ppe/', views.admin_ppe_view, name='admin-ppe'),
+    path('admin/specifications/', views.admin_specifications_view, name='admin-specifications'),
 
     #    Перепустки
     # path('users/<int:user_id>/permits/', views.user_permits, name='user-permits'),
@@ -7,18 +7,24 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes
 from django.contrib.auth import authenticate
 from django.conf import settings
 from django.utils import timezone
 from datetime import datetime, timedelta
 from rest_framework.permissions import AllowAny
+from asgiref.sync import sync_to_async
+from utils.aio import async_api_view, json_response, paginate, save_upload
+import asyncio
+import logging
+import math
+import os
 from .models import WorkType, WorkSubType, Equipment, UserWork
 from .serializers import WorkTypeSerializer, WorkSubTypeSerializer, EquipmentSerializer, UserWorkSerializer
 import uuid
 
 # ВИПРАВЛЕНИЙ ІМПОРТ - видалено AdminDepartmentAccess
-from .models import User, Department, PasswordResetToken, TechnicType, InstrumentType, UserSpecification, UserEmployee, UserOrder, UserTechnic, UserInstrument, UserPPE
+from .models import User, Department, PasswordResetToken, TechnicType, InstrumentType, UserSpecification, UserEmployee, UserOrder, UserTechnic, UserInstrument, UserPPE, SearchEntry, OutboxEvent
 from .serializers import (
     UserRegistrationSerializer, 
     UserActivationSerializer,
@@ -26,8 +32,13 @@ from .serializers import (
     DepartmentSerializer,
     TechnicTypeSerializer, InstrumentTypeSerializer, UserSpecificationSerializer,
     UserEmployeeSerializer, UserOrderSerializer, UserTechnicSerializer,
-    UserInstrumentSerializer, UserPPESerializer
+    UserInstrumentSerializer, UserPPESerializer,
+    UserSpecificationRowSerializer, UserEmployeeRowSerializer, UserOrderRowSerializer,
+    UserTechnicRowSerializer, UserInstrumentRowSerializer, UserPPERowSerializer,
 )
+from .services.documents import sign_digest
+
+logger = logging.getLogger(__name__)
 
 
 class DepartmentListView(APIView):
@@ -124,7 +135,9 @@ class RegisterView(APIView):
             
             # Відправка email (зараз в консоль)
             activation_link = f"{settings.FRONTEND_URL}/activate/{user.activation_token}"
-            print(f"Лінк активації для {user.email}: {activation_link}")
+            # Токен активації - секрет: у постійний лог (INFO) не пишемо
+            logger.info('Зареєстровано %s, лінк активації створено', user.email)
+            logger.debug('Лінк активації для %s: %s', user.email, activation_link)
             
             return Response({
                 'message': 'Користувач зареєстрований. Очікуйте схвалення адміністратора.',
@@ -251,7 +264,7 @@ class CustomAuthToken(ObtainAuthToken):
 
 class WorkTypeListView(generics.ListAPIView):
     """API для отримання списку типів робіт"""
-    queryset = WorkType.objects.all()
+    queryset = WorkType.objects.filter(is_active=True)
     serializer_class = WorkTypeSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None  # Вимкнути пагінацію для невеликого списку
@@ -259,7 +272,7 @@ class WorkTypeListView(generics.ListAPIView):
 
 class WorkSubTypeListView(generics.ListAPIView):
     """API для отримання списку підтипів робіт (можна фільтрувати по work_type)"""
-    queryset = WorkSubType.objects.select_related('work_type')
+    queryset = WorkSubType.objects.filter(is_active=True).select_related('work_type')
     serializer_class = WorkSubTypeSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
@@ -276,7 +289,7 @@ class WorkSubTypeListView(generics.ListAPIView):
 
 class EquipmentListView(generics.ListAPIView):
     """API для отримання списку обладнання (можна фільтрувати по subtype)"""
-    queryset = Equipment.objects.select_related('subtype', 'subtype__work_type')
+    queryset = Equipment.objects.filter(is_active=True).select_related('subtype', 'subtype__work_type')
     serializer_class = EquipmentSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = None
@@ -436,6 +449,66 @@ class UserEmployeeListCreateView(generics.ListCreateAPIView):
             return UserEmployee.objects.filter(user=user).order_by('-created_at')
 
 
+def _bulk_import_response(request, importer, serializer_class, label):
+    """Спільна обробка масового імпорту: file - CSV/XLSX, archive - необов'язковий ZIP"""
+    from .services.bulk_import import ImportFileError
+
+    if request.user.is_staff:
+        return Response({'error': 'Імпорт доступний тільки переможцям тендерів'}, status=status.HTTP_403_FORBIDDEN)
+    if 'file' not in request.FILES:
+        return Response({'error': 'Файл не знайдено'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = importer(request.user, request.FILES['file'], request.FILES.get('archive'))
+    except ImportFileError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    warnings = result.get('warnings', [])
+    if result['errors']:
+        return Response({
+            'error': f'Файл містить помилки, жодного запису ({label}) не створено',
+            'errors': result['errors'],
+            'warnings': warnings,
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = serializer_class(result['created'], many=True, context={'request': request})
+    return Response({
+        'created': len(result['created']),
+        'results': serializer.data,
+        'warnings': warnings,
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_employees(request):
+    """
+    Масовий імпорт співробітників (ZIP - фото та посвідчення).
+    Або створюються всі рядки, або жоден (з переліком помилок по рядках).
+    """
+    from .services.bulk_import import import_employees as run_import
+    return _bulk_import_response(request, run_import, UserEmployeeSerializer, 'співробітники')
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_technics(request):
+    """Масовий імпорт техніки; тип зіставляється з довідником TechnicType"""
+    from .services.bulk_import import import_technics as run_import
+    return _bulk_import_response(request, run_import, UserTechnicSerializer, 'техніка')
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_instruments(request):
+    """Масовий імпорт інструментів; тип зіставляється з довідником InstrumentType"""
+    from .services.bulk_import import import_instruments as run_import
+    return _bulk_import_response(request, run_import, UserInstrumentSerializer, 'інструменти')
+
+
 # ===================================================================
 # API для інструментів (таб Інструменти)
 
@@ -512,61 +585,160 @@ class UserSpecificationRetrieveUpdateView(generics.RetrieveUpdateAPIView):
 # ===================================================================
 # Допоміжні API endpoints
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def upload_document(request):
-    """API для завантаження окремих документів"""
-    if 'file' not in request.FILES:
-        return Response(
-            {'error': 'Файл не знайдено'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    file = request.FILES['file']
-    document_type = request.data.get('document_type', 'general')
-    
+@async_api_view(['POST'])
+async def upload_document(request):
+    """API для завантаження окремих документів (async: файл пишеться в пулі потоків)"""
+    files = await sync_to_async(lambda: request.FILES)()
+    if 'file' not in files:
+        return json_response({'error': 'Файл не знайдено'}, status=status.HTTP_400_BAD_REQUEST)
+
+    file = files['file']
+    document_type = request.POST.get('document_type', 'general')
+
     # Створюємо папку користувача
-    user_folder = request.user.create_documents_folder()
-    
+    user_folder = await asyncio.to_thread(request.user.create_documents_folder)
+
     # Формуємо шлях до файлу
-    import os
-    from django.conf import settings
-    
     file_name = f"{document_type}_{file.name}"
     relative_path = f"tenders/{user_folder}/{document_type}/{file_name}"
     full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
-    
-    # Створюємо підпапку якщо не існує
-    os.makedirs(os.path.dirname(full_path), exist_ok=True)
-    
-    # Зберігаємо файл
+
+    # Зберігаємо файл (хеш рахуємо по дорозі, щоб не читати файл повторно)
     try:
-        with open(full_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
-        
-        return Response({
-            'success': True,
-            'file_info': {
-                'name': file.name,
-                'original_name': file.name,
-                'path': f"/media/{relative_path}",
-                'size': file.size,
-                'document_type': document_type
-            }
-        })
+        digest = await save_upload(file, full_path)
     except Exception as e:
-        return Response(
-            {'error': f'Помилка завантаження файлу: {str(e)}'}, 
+        return json_response(
+            {'error': f'Помилка завантаження файлу: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    return json_response({
+        'success': True,
+        'file_info': {
+            'name': file.name,
+            'original_name': file.name,
+            'path': f"/media/{relative_path}",
+            'size': file.size,
+            'document_type': document_type,
+            'digest': digest,
+            'digest_signature': sign_digest(f"/media/{relative_path}", digest)
+        }
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_view(request):
+    """
+    Пошук по тендерах, співробітниках, техніці та інструментах, впорядкований за релевантністю.
+    ?q=текст&type=employee,technic&limit=20
+    Суперадмін шукає скрізь, адмін підрозділу - у своєму підрозділі, переможець - у своїх даних.
+    """
+    from .services import search
+
+    query = request.query_params.get('q', '').strip()
+    if len(query) < 2:
+        return Response({'error': 'Запит має містити щонайменше 2 символи'}, status=status.HTTP_400_BAD_REQUEST)
+
+    valid_types = {value for value, _ in SearchEntry.SOURCE_TYPES}
+    source_types = [t for t in request.query_params.get('type', '').split(',') if t in valid_types]
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), 50)
+    except ValueError:
+        limit = 20
+
+    user = request.user
+    scope = {}
+    if not user.is_staff:
+        scope['user_id'] = user.pk
+    elif not user.is_superuser:
+        if not user.department_id:
+            return Response({'count': 0, 'results': []})
+        scope['department_id'] = user.department_id
+
+    entries = search.search(query, source_types=source_types, limit=limit, **scope)
+    return Response({
+        'count': len(entries),
+        'results': [
+            {
+                'type': entry.source_type,
+                'type_display': entry.get_source_type_display(),
+                'id': entry.source_id,
+                'title': entry.title,
+                'rank': round(entry.rank, 4),
+                'user_id': entry.user_id,
+                'tender_number': entry.user.tender_number,
+                'company_name': entry.user.company_name,
+            }
+            for entry in entries
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def outbox_view(request):
+    """
+    Дельти змін для зовнішніх систем (long-poll).
+    ?cursor=<cursor з попередньої відповіді>&type=employee,permit&timeout=20&limit=500
+    cursor=latest - повертає поточний курсор без подій (почати з "зараз").
+    Якщо нових подій немає, відповідь чекає до timeout секунд (не більше 25).
+    Суперадмін бачить всі підрозділи, адмін підрозділу - свій.
+    """
+    from .services import outbox
+
+    user = request.user
+    if not user.is_staff:
+        return Response({'error': 'Доступ заборонено'}, status=status.HTTP_403_FORBIDDEN)
+    department_id = None
+    if not user.is_superuser:
+        if not user.department_id:
+            return Response({'error': 'Підрозділ не призначено'}, status=status.HTTP_403_FORBIDDEN)
+        department_id = user.department_id
+
+    cursor = request.query_params.get('cursor', '0')
+    if cursor == 'latest':
+        return Response({'events': [], 'cursor': outbox.latest_cursor()})
+    try:
+        cursor = max(int(cursor), 0)
+        timeout = float(request.query_params.get('timeout', 0))
+        limit = min(max(int(request.query_params.get('limit', outbox.BATCH_SIZE)), 1), outbox.BATCH_SIZE)
+    except ValueError:
+        return Response({'error': 'Некоректні cursor/timeout/limit'}, status=status.HTTP_400_BAD_REQUEST)
+    # nan/inf: max(nan, 0) == nan, і дедлайн long-poll ніколи б не настав
+    if not math.isfinite(timeout):
+        return Response({'error': 'Некоректні cursor/timeout/limit'}, status=status.HTTP_400_BAD_REQUEST)
+    timeout = min(max(timeout, 0), outbox.MAX_WAIT_SECONDS)
+
+    valid_types = {value for value, _ in OutboxEvent.SOURCE_TYPES}
+    source_types = [t for t in request.query_params.get('type', '').split(',') if t in valid_types]
+    events = outbox.wait_for_events(
+        cursor, timeout, department_id=department_id, source_types=source_types, limit=limit
+    )
+    return Response({
+        'events': [outbox.serialize_event(event) for event in events],
+        'cursor': events[-1].position if events else cursor,
+    })
 
 
 # ОКРЕМІ API ДЛЯ АДМІНІВ - ТІЛЬКИ ПЕРЕГЛЯД ДАНИХ ПЕРЕМОЖЦІВ
 
-class AdminOrderListView(generics.ListAPIView):
+class RowListMixin:
+    """list() з рядків .values() через легкий RowSerializer (тільки читання)"""
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.row_serializer_class(request)
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
+
+
+class AdminOrderListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всіх наказів переможців тендерів"""
     serializer_class = UserOrderSerializer
+    row_serializer_class = UserOrderRowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -586,9 +758,10 @@ class AdminOrderListView(generics.ListAPIView):
             return UserOrder.objects.all().select_related('user', 'user__department').order_by('-created_at')
 
 
-class AdminTechnicListView(generics.ListAPIView):
+class AdminTechnicListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всієї техніки переможців тендерів"""
     serializer_class = UserTechnicSerializer
+    row_serializer_class = UserTechnicRowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -607,9 +780,10 @@ class AdminTechnicListView(generics.ListAPIView):
             return UserTechnic.objects.all().select_related('user', 'user__department', 'technic_type').order_by('-created_at')
 
 
-class AdminEmployeeListView(generics.ListAPIView):
+class AdminEmployeeListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всіх співробітників переможців тендерів"""
     serializer_class = UserEmployeeSerializer
+    row_serializer_class = UserEmployeeRowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -628,9 +802,10 @@ class AdminEmployeeListView(generics.ListAPIView):
             return UserEmployee.objects.all().select_related('user', 'user__department').order_by('-created_at')
 
 
-class AdminInstrumentListView(generics.ListAPIView):
+class AdminInstrumentListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всіх інструментів переможців тендерів"""
     serializer_class = UserInstrumentSerializer
+    row_serializer_class = UserInstrumentRowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -649,9 +824,10 @@ class AdminInstrumentListView(generics.ListAPIView):
             return UserInstrument.objects.all().select_related('user', 'user__department', 'instrument_type').order_by('-created_at')
 
 
-class AdminPPEListView(generics.ListAPIView):
+class AdminPPEListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всіх ЗІЗ переможців тендерів"""
     serializer_class = UserPPESerializer
+    row_serializer_class = UserPPERowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -670,9 +846,10 @@ class AdminPPEListView(generics.ListAPIView):
             return UserPPE.objects.all().select_related('user', 'user__department')
 
 
-class AdminSpecificationListView(generics.ListAPIView):
+class AdminSpecificationListView(RowListMixin, generics.ListAPIView):
     """API для адмінів - перегляд всіх специфікацій переможців тендерів"""
     serializer_class = UserSpecificationSerializer
+    row_serializer_class = UserSpecificationRowSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -691,6 +868,31 @@ class AdminSpecificationListView(generics.ListAPIView):
             return UserSpecification.objects.all().select_related('user', 'user__department')
 
 
+def async_row_list(view_class):
+    """
+    Async версія адмін-списку з RowListMixin: той самий get_queryset і RowSerializer,
+    рядки читаються через async ORM, пагінація як у DRF.
+    """
+    @async_api_view(['GET'])
+    async def view(request):
+        # get_queryset перевіряє user.department - FK завантажується заздалегідь
+        await sync_to_async(lambda: request.user.department)()
+        queryset = view_class(request=request, format_kwarg=None).get_queryset()
+        rows = view_class.row_serializer_class(request)
+        return json_response(await paginate(request, rows.values(queryset), rows.serialize))
+    view.__name__ = view.__qualname__ = f'{view_class.__name__}_async'
+    view.__doc__ = view_class.__doc__
+    return view
+
+
+admin_orders_view = async_row_list(AdminOrderListView)
+admin_technics_view = async_row_list(AdminTechnicListView)
+admin_employees_view = async_row_list(AdminEmployeeListView)
+admin_instruments_view = async_row_list(AdminInstrumentListView)
+admin_ppe_view = async_row_list(AdminPPEListView)
+admin_specifications_view = async_row_list(AdminSpecificationListView)
+
+
 # ДОДАТИ ЦІ КЛАСИ В backend/users/views.py (в кінець файлу):
 
 # ===================================================================
@@ -780,13 +982,12 @@ def logout_view(request):
         return Response({'message': 'Помилка при виході'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def user_profile_view(request):
-    """Профіль поточного користувача"""
-    user = User.objects.select_related('department').get(pk=request.user.pk)
-    serializer = UserSerializer(user)
-    return Response(serializer.data)
+@async_api_view(['GET'])
+async def user_profile_view(request):
+    """Профіль (досьє) поточного користувача"""
+    user = await User.objects.select_related('department', 'readiness').aget(pk=request.user.pk)
+    data = await sync_to_async(lambda: UserSerializer(user).data)()
+    return json_response(data)
 
 
 # API для адмінів підрозділів (тільки суперадмін та адміни можуть використовувати)
@@ -802,7 +1003,7 @@ class UserListView(APIView):
             }, status=status.HTTP_403_FORBIDDEN)
         
         # Логіка фільтрації як в admin панелі
-        users = User.objects.filter(is_staff=False)  # Тільки переможці тендерів
+        users = User.objects.filter(is_staff=False).select_related('department', 'readiness')  # Тільки переможці тендерів
         
         if request.user.is_superuser:
             # Суперадмін бачить всіх
@@ -0,0 +1,178 @@
+# backend/utils/aio.py
+"""
+Помічники для async view (ASGI).
+
+DRF APIView синхронний, тому I/O-важкі endpoints (завантаження файлів, роздача
+медіа, читання списків) - звичайні async view Django з тією ж автентифікацією
+(DEFAULT_AUTHENTICATION_CLASSES) і тим самим JSON (FastJSONRenderer).
+Під ASGI тіло запиту сервер дочитує асинхронно ще до view, тож повільний клієнт
+не займає потік. Запис і читання файлів ідуть у пулі потоків (asyncio.to_thread):
+запис - одним викликом на файл, читання - по блоку, event loop не блокується.
+"""
+import asyncio
+import functools
+import hashlib
+import mimetypes
+import os
+import posixpath
+import stat
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage, Paginator
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import content_disposition_header, http_date
+from django.utils.translation import gettext as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.static import was_modified_since
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .renderers import FastJSONRenderer
+from .tracing import span
+
+CHUNK_SIZE = 64 * 1024
+
+_renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+def _authenticators():
+    return [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+
+def _authenticate(request):
+    # Request DRF: Token або сесія (з CSRF перевіркою для POST, як в APIView)
+    return Request(request, authenticators=_authenticators()).user
+
+
+def _error_response(request, exc):
+    response = json_response({'detail': exc.detail}, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # Як APIView: 401 з WWW-Authenticate від першого автентифікатора, інакше 403
+        header = _authenticators()[0].authenticate_header(request)
+        if header:
+            response['WWW-Authenticate'] = header
+        else:
+            response.status_code = 403
+    return response
+
+
+def async_api_view(methods):
+    """
+    Аналог @api_view(methods) + IsAuthenticated для async view.
+    У view приходить request з автентифікованим request.user.
+    """
+    def decorator(view):
+        @csrf_exempt  # CSRF для сесії перевіряє SessionAuthentication
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                user = await sync_to_async(_authenticate)(request)
+                if not user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                request.user = user
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return _error_response(request, exc)
+        return wrapper
+    return decorator
+
+
+async def paginate(request, queryset, serialize):
+    """
+    Те саме, що PageNumberPagination DRF (PAGE_SIZE, ?page=N|last, count/next/previous),
+    але через async ORM. serialize(rows) -> список для results.
+    """
+    page_size = api_settings.PAGE_SIZE
+    # Paginator лише рахує межі сторінки: count уже відомий, запит не виконується
+    paginator = Paginator(range(await queryset.acount()), page_size)
+    page_number = request.GET.get('page', 1)
+    if page_number in PageNumberPagination.last_page_strings:
+        page_number = paginator.num_pages
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise exceptions.NotFound(
+            PageNumberPagination.invalid_page_message.format(page_number=page_number, message=str(exc))
+        )
+    bottom = (page.number - 1) * page_size
+    rows = [row async for row in queryset[bottom:bottom + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page.number + 1) if page.has_next() else None
+    previous_url = None
+    if page.has_previous():
+        previous_url = (
+            remove_query_param(url, 'page') if page.number == 2
+            else replace_query_param(url, 'page', page.number - 1)
+        )
+    return {'count': paginator.count, 'next': next_url, 'previous': previous_url, 'results': serialize(rows)}
+
+
+# ===================================================================
+# Файли
+
+def _save_upload(uploaded_file, full_path):
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    digest = hashlib.sha256()
+    with span('storage.write', {'file.path': full_path, 'file.size': uploaded_file.size}):
+        with open(full_path, 'wb+') as destination:
+            for chunk in uploaded_file.chunks():
+                digest.update(chunk)
+                destination.write(chunk)
+    return digest.hexdigest()
+
+
+async def save_upload(uploaded_file, full_path):
+    """Записує UploadedFile у full_path (папки створюються); повертає sha256"""
+    return await asyncio.to_thread(_save_upload, uploaded_file, full_path)
+
+
+async def _file_chunks(path):
+    file = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+async def serve(request, path, document_root=None):
+    """Асинхронний аналог django.views.static.serve (ті самі заголовки, без індексів папок)"""
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = Path(safe_join(document_root, path))
+    try:
+        file_stat = await asyncio.to_thread(fullpath.stat)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404(_('“%(path)s” does not exist') % {'path': fullpath})
+    if stat.S_ISDIR(file_stat.st_mode):
+        raise Http404(_('Directory indexes are not allowed here.'))
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), file_stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or 'application/octet-stream'
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_file_chunks(fullpath), content_type=content_type)
+    else:
+        # WSGI (GUNICORN_WORKER_CLASS=gthread): асинхронний ітератор Django спершу
+        # зібрав би в пам'ять увесь файл, FileResponse віддається через wsgi.file_wrapper
+        response = FileResponse(await asyncio.to_thread(fullpath.open, 'rb'), content_type=content_type)
+    response.headers['Last-Modified'] = http_date(file_stat.st_mtime)
+    response.headers['Content-Length'] = file_stat.st_size
+    response.headers['Content-Disposition'] = content_disposition_header(False, fullpath.name)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
@@ -0,0 +1,92 @@
+# backend/utils/db_router.py
+"""
+Читання з репліки БД (необов'язкової, DATABASES['replica']).
+
+За замовчуванням усе йде в default. ReplicaRoutingMiddleware вмикає читання з
+репліки лише для GET/HEAD запитів API та списків адмінки (read_from_replica).
+Щойно в межах запиту відбувся запис, решта запиту читає з default, а клієнт
+отримує cookie, з якою його наступні запити REPLICA_PIN_SECONDS теж читають з
+default - користувач бачить власні зміни попри відставання репліки.
+Всередині transaction.atomic читання завжди з default.
+
+Запис визначається за SQL, що справді пішов у default (execute_wrapper), а не
+за db_for_write: Django питає alias для запису і там, де нічого не пише
+(select_for_update, get_or_create зі знайденим рядком).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+REPLICA_DB_ALIAS = 'replica'
+# Перше слово SQL, яке змінює дані чи схему (SELECT ... FOR UPDATE - не запис)
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'MERGE', 'TRUNCATE', 'CREATE', 'ALTER', 'DROP')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def routing_scope(replica=False):
+    """Окремий стан маршрутизації (запит, команда); replica=True - читати з репліки одразу"""
+    replica_token = _read_from_replica.set(replica and replica_configured())
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(replica_token)
+        _wrote.reset(wrote_token)
+
+
+def use_replica():
+    """Далі в поточному блоці routing_scope читати з репліки, якщо запису ще не було"""
+    if replica_configured() and not _wrote.get():
+        _read_from_replica.set(True)
+
+
+def wrote_to_primary():
+    """Чи був запис у поточному блоці routing_scope"""
+    return _wrote.get()
+
+
+def _track_writes(execute, sql, params, many, context):
+    if sql.lstrip()[:8].upper().startswith(WRITE_STATEMENTS):
+        # Після запису - тільки default до кінця блоку (читаємо власні зміни)
+        _read_from_replica.set(False)
+        _wrote.set(True)
+    return execute(sql, params, many, context)
+
+
+def _install_write_tracker(sender=None, connection=None, **kwargs):
+    # connect() з пулом викликається на кожне взяття з'єднання, обгортка - одна
+    if connection.alias == DEFAULT_DB_ALIAS and _track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_track_writes)
+
+
+connection_created.connect(_install_write_tracker)
+# З'єднання, відкриті до імпорту модуля (перевірки при старті, міграції)
+for _connection in connections.all(initialized_only=True):
+    _install_write_tracker(connection=_connection)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Репліка - копія default, об'єкти з обох баз належать одній БД
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
@@ -0,0 +1,94 @@
+# backend/utils/log.py
+"""
+Неблокуюче логування.
+
+QueueLogHandler лише кладе запис у чергу, а запис у файл і stdout робить
+окремий потік QueueListener. Виклик logger.* у view/серіалізаторі не чекає на
+диск чи на stdout, за який змагаються потоки і воркери gunicorn.
+Файл - JSON Lines. Кожен процес gunicorn має свій listener; ротація одного
+файлу з кількох процесів ненадійна, тому за розміром ротується лише файл з
+{pid} у назві (кожен процес пише свій). Файл без {pid} не ротується -
+WatchedFileHandler, перевідкривається після зовнішнього logrotate.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+
+# Атрибути LogRecord, які не є extra=...
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Один JSON-об'єкт на рядок: час (UTC), рівень, логер, повідомлення, extra, traceback"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Handler для LOGGING: filename - JSON файл (порожній - без файлу; з {pid} -
+    файл на процес з ротацією за max_bytes), console - дублювати в stdout
+    (json=True - JSON, інакше коротким текстом).
+    """
+
+    def __init__(self, filename='', max_bytes=10 * 1024 * 1024, backup_count=5, console=True, json=False):
+        super().__init__(queue.SimpleQueue())
+        handlers = []
+        if filename:
+            per_process = '{pid}' in str(filename)
+            filename = str(filename).format(pid=os.getpid())
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            if per_process:
+                file_handler = RotatingFileHandler(
+                    filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+                )
+            else:
+                file_handler = WatchedFileHandler(filename, encoding='utf-8', delay=True)
+            file_handler.setFormatter(JSONFormatter())
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(JSONFormatter() if json else logging.Formatter(
+                '{levelname} {asctime} {name} {process:d} {message}', style='{'
+            ))
+            handlers.append(console_handler)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self._stop_listener)  # дописати чергу перед виходом
+
+    def prepare(self, record):
+        # Як QueueHandler, але exc_info/extra лишаються для JSONFormatter у listener
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def _stop_listener(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self._stop_listener()
+        super().close()
@@ -0,0 +1,117 @@
+# backend/utils/media.py
+"""
+Абсолютні URL медіа файлів для серіалізаторів.
+
+request.build_absolute_uri на кожен файл щоразу розбирає URL (urlsplit) і
+перевіряє шлях; на списках з тисячами документів це основна витрата CPU.
+Резолвер обчислює префікс scheme://host один раз на запит, а звичайні шляхи
+/media/... просто дописує до нього. Результат такий самий, як у
+build_absolute_uri; нетипові шляхи (/./, /../, //, повні URL) йдуть через нього.
+
+Друга витрата - percent-encoding кириличних імен файлів (iri_to_uri). Шлях не
+залежить від запиту, а ті самі документи віддаються в кожному списку, тому
+закодований шлях кешується на процес (LRU).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri, iri_to_uri
+
+
+# ~ кілька МБ пам'яті; вистачає на сторінку адмін-списку з усіма документами
+QUOTED_PATHS_CACHE_SIZE = 20000
+
+
+@lru_cache(maxsize=QUOTED_PATHS_CACHE_SIZE)
+def _quote_path(path):
+    return iri_to_uri(path)
+
+
+@lru_cache(maxsize=QUOTED_PATHS_CACHE_SIZE)
+def _storage_path(base_url, name):
+    """FileSystemStorage.url(name) без urljoin (для імен з _is_plain_name)"""
+    return base_url + filepath_to_uri(name).lstrip('/')
+
+
+def _is_plain_path(path):
+    return (
+        path.startswith('/')
+        and not path.startswith('//')
+        and '/./' not in path
+        and '/../' not in path
+    )
+
+
+def _is_plain_name(name):
+    """Ім'я файлу, яке urljoin не змінить (без схеми, query, '.'/'..' сегментів)"""
+    return not (':' in name or '?' in name or '#' in name or '/.' in f'/{name}')
+
+
+class MediaURLResolver:
+    """Префікс scheme://host на один запит + швидке перетворення шляхів"""
+
+    def __init__(self, request):
+        self.request = request
+        self.prefix = request.build_absolute_uri('/')[:-1] if request is not None else None
+        self.media_url = settings.MEDIA_URL
+
+    def absolute(self, path):
+        """Те саме що request.build_absolute_uri(path); None якщо запиту немає"""
+        if self.prefix is None:
+            return None
+        if _is_plain_path(path):
+            return self.prefix + _quote_path(path)
+        return self.request.build_absolute_uri(path)
+
+    def file_url(self, field_file):
+        """Те саме що build_absolute_uri(field_file.url) для FileField; None для порожнього"""
+        if not field_file or self.prefix is None:
+            return None
+        return self.storage_url(field_file.storage, field_file.name)
+
+    def storage_url(self, storage, name):
+        """Як DRF FileField: URL файлу за ім'ям у сховищі (відносний, якщо запиту немає)"""
+        if not name:
+            return None
+        if isinstance(storage, FileSystemStorage) and _is_plain_name(name):
+            path = _storage_path(storage.base_url, name)
+        else:
+            path = storage.url(name)
+        return self.absolute(path) if self.prefix is not None else path
+
+    def _with_url(self, file_info):
+        data = file_info.copy()
+        path = data.get('path')
+        if self.prefix is not None and isinstance(path, str) and path.startswith(self.media_url):
+            data['url'] = self.absolute(path)
+        return data
+
+    def document_list(self, documents):
+        """Список файлів (накази, ЗІЗ): копії словників з доданим 'url'"""
+        if not isinstance(documents, list):
+            return []
+        with_url = self._with_url
+        return [with_url(doc) for doc in documents if isinstance(doc, dict)]
+
+    def document_groups(self, documents):
+        """{тип_документу: [файли]} (техніка, інструменти): те саме по групах"""
+        if not isinstance(documents, dict):
+            return {}
+        with_url = self._with_url
+        return {
+            doc_type: [with_url(doc) for doc in files if isinstance(doc, dict)]
+            for doc_type, files in documents.items()
+            if isinstance(files, list)
+        }
+
+
+def media_resolver(request):
+    """Один резолвер на запит (кешується на об'єкті request)"""
+    if request is None:
+        return MediaURLResolver(None)
+    resolver = getattr(request, '_media_url_resolver', None)
+    if resolver is None:
+        resolver = MediaURLResolver(request)
+        request._media_url_resolver = resolver
+    return resolver
@@ -0,0 +1,149 @@
+# backend/utils/metrics.py
+"""
+Метрики Prometheus (prometheus_client).
+
+MetricsMiddleware рахує запити, час відповіді, розмір тіла запиту (завантаження)
+та кількість SQL запитів - з міткою view (ім'я URL з users/urls.py, для
+адмінки admin:<ім'я>). Окремо: час генерації PDF перепустки і розмір ZIP
+з перепустками. Віддає їх GET /metrics для staff користувача або з заголовком
+Authorization: Bearer <METRICS_TOKEN> (для Prometheus).
+
+Під gunicorn кожен воркер - окремий процес. gunicorn.conf.py задає
+PROMETHEUS_MULTIPROC_DIR, тоді значення пишуться у файли в цій папці, а
+/metrics будь-якого воркера сумує їх по всіх процесах.
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+UNRESOLVED = '<unresolved>'
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP запити', ['view', 'method', 'status'],
+)
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Час відповіді', ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+REQUEST_BODY_BYTES = Histogram(
+    'http_request_body_bytes', 'Розмір тіла POST/PUT/PATCH запиту (завантаження файлів)', ['view'],
+    buckets=(1024, 10 * 1024, 100 * 1024, 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 25 * 1024 ** 2, 50 * 1024 ** 2),
+)
+DB_QUERIES = Histogram(
+    'django_db_queries_per_request', 'Кількість SQL запитів на HTTP запит', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+PDF_RENDER_SECONDS = Histogram(
+    'permit_pdf_render_seconds', 'Генерація PDF перепустки', ['permit_type'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+ZIP_EXPORT_BYTES = Histogram(
+    'permits_zip_export_bytes', 'Розмір ZIP з перепустками користувача',
+    buckets=(100 * 1024, 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 25 * 1024 ** 2, 50 * 1024 ** 2, 100 * 1024 ** 2),
+)
+
+# Лічильник SQL запитів поточного HTTP запиту. Список, а не число: контекст
+# копіюється в sync_to_async, а змінений у потоці список видно і тут.
+_queries = ContextVar('metrics_queries', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    # connect() з пулом викликається на кожне взяття з'єднання, обгортка - одна
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(_install_query_counter)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """with timed(PDF_RENDER_SECONDS, permit_type='employee'): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """Запити, час, розмір тіла та кількість SQL запитів по view"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start, counter = time.perf_counter(), [0]
+        token = _queries.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        start, counter = time.perf_counter(), [0]
+        token = _queries.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self._observe(request, response, time.perf_counter() - start, counter[0])
+        return response
+
+    def _observe(self, request, response, duration, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        REQUEST_SECONDS.labels(view, request.method).observe(duration)
+        DB_QUERIES.labels(view).observe(queries)
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            try:
+                REQUEST_BODY_BYTES.labels(view).observe(int(request.META.get('CONTENT_LENGTH') or 0))
+            except ValueError:
+                pass
+
+
+def _authorized(request):
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """Метрики у форматі Prometheus (сума по всіх воркерах gunicorn)"""
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,138 @@
+# backend/utils/middleware.py
+"""
+Контекст поточного запиту та вибір БД для читання (репліка).
+
+Адмінка інколи потребує request там, де Django його не передає (readonly поля,
+методи відображення). Зберігати його на self ModelAdmin не можна - екземпляр
+один на процес і спільний для всіх потоків. ContextVar ізольований для кожного
+потоку та кожної asyncio задачі (asgiref копіює контекст у sync_to_async).
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import db_router
+
+_current_request = ContextVar('current_request', default=None)
+
+
+def get_current_request():
+    """Поточний HttpRequest або None (поза запитом: команди, сигнали з shell)"""
+    return _current_request.get()
+
+
+class RequestContextMiddleware:
+    """Робить request доступним через get_current_request() до кінця відповіді"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    GET/HEAD запити API (/api/) та списки адмінки читають з репліки
+    (utils.db_router). Запит, що щось записав, ставить cookie, і наступні
+    REPLICA_PIN_SECONDS запити клієнта читають з default.
+    """
+    PIN_COOKIE = 'db_primary'
+    # Адмін-сторінки тільки для читання, крім *_changelist
+    ADMIN_READ_VIEWS = frozenset({'users_tenderuser_download_all_permits'})
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not db_router.replica_configured():
+            return self.get_response(request)
+        # Репліку вмикає process_view, коли відомо, яка це сторінка
+        with db_router.routing_scope():
+            response = self.get_response(request)
+            wrote = db_router.wrote_to_primary()
+        return self._pin(request, response, wrote)
+
+    async def __acall__(self, request):
+        if not db_router.replica_configured():
+            return await self.get_response(request)
+        with db_router.routing_scope():
+            response = await self.get_response(request)
+            wrote = db_router.wrote_to_primary()
+        return self._pin(request, response, wrote)
+
+    def _pin(self, request, response, wrote):
+        if wrote:
+            # Фронтенд на іншому домені: cookie має ходити в cross-site запитах (CORS з credentials)
+            secure = request.is_secure()
+            response.set_cookie(
+                self.PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, secure=secure, samesite='None' if secure else 'Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if db_router.replica_configured() and self._reads_from_replica(request):
+            db_router.use_replica()
+
+    def _reads_from_replica(self, request):
+        if request.method not in ('GET', 'HEAD') or self.PIN_COOKIE in request.COOKIES:
+            return False
+        if request.path.startswith('/api/'):
+            return True
+        url_name = request.resolver_match.url_name or ''
+        return url_name.endswith('_changelist') or url_name in self.ADMIN_READ_VIEWS
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise 6.6 лише синхронний: під ASGI Django через нього переводив би
+    кожен запит у потік. Тут статика віддається як і раніше, а решта запитів
+    іде далі ланцюжком без переходу в потік.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
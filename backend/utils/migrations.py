@@ -0,0 +1,24 @@
+# backend/utils/migrations.py
+"""
+Операції міграцій, що залежать від СУБД.
+
+AddIndexConcurrently: на PostgreSQL - CREATE INDEX CONCURRENTLY (таблиця
+доступна на запис, поки будується індекс), на інших СУБД (SQLite локально) -
+звичайний AddIndex. Міграція з цією операцією має бути atomic = False.
+Якщо побудова перервалась, у PostgreSQL лишається INVALID індекс - його
+треба видалити (DROP INDEX CONCURRENTLY) і повторити migrate.
+"""
+from django.contrib.postgres.operations import AddIndexConcurrently as PostgresAddIndexConcurrently
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexConcurrently(PostgresAddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,113 @@
+# backend/utils/renderers.py
+"""
+JSON рендерер і парсер на orjson.
+
+Адмін-списки віддають великі вкладені documents_info, і json.dumps з
+DRF JSONEncoder стає помітною частиною часу відповіді. orjson кодує базові типи
+в C; все, що він не знає (Decimal, дати, lazy-рядки, генератори), віддається в
+JSONEncoder DRF, тому формат відповіді не змінюється. Якщо orjson не
+встановлений або не може закодувати дані (відступи для browsable API,
+ensure_ascii, числа поза int64) - працює стандартна реалізація DRF.
+inf/nan orjson пише як null, тому для них теж DRF: ValueError у strict режимі
+(STRICT_JSON), NaN/Infinity - без нього.
+"""
+import io
+import math
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необов'язковий
+    orjson = None
+
+if orjson is not None:
+    # Дати/час кодує JSONEncoder DRF ('Z' замість '+00:00', помилка для aware time),
+    # dataclass - як і stdlib json (тобто помилка -> fallback)
+    DUMPS_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+_LINE_SEPARATOR = '\u2028'.encode()
+_PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def _has_non_finite(value):
+    """Чи є inf/nan серед float у вкладених dict/list/tuple"""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer з orjson для компактного UTF-8 виводу"""
+
+    def __init__(self):
+        self._encoder = self.encoder_class()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        non_finite = False
+
+        def default(obj):
+            # float(Decimal('NaN')) тощо - значення від JSONEncoder теж перевіряємо
+            nonlocal non_finite
+            value = self._encoder.default(obj)
+            non_finite = non_finite or _has_non_finite(value)
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default, option=DUMPS_OPTIONS)
+        except orjson.JSONEncodeError:
+            ret = None
+        if non_finite and self.strict:
+            # Генератор вже вичерпано, повторне кодування його не побачить - помилка як у DRF
+            raise ValueError('Out of range float values are not JSON compliant')
+        if ret is None or non_finite or (b'null' in ret and _has_non_finite(data)):
+            # Великі int, невідомі типи, inf/nan - поведінка/помилка як у DRF
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Як і DRF: U+2028/U+2029 екрануються, щоб JSON лишався підмножиною JavaScript
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028').replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser з orjson для UTF-8 тіла запиту"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+        # orjson суворіший (BOM, NaN, int > 64 біт) - остаточне рішення і текст помилки від stdlib
+        return super().parse(io.BytesIO(body), media_type, parser_context)
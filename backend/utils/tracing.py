@@ -0,0 +1,143 @@
+# backend/utils/tracing.py
+"""
+Трасування запитів (OpenTelemetry).
+
+Вимкнено за замовчуванням. TRACING_FILE вмикає SDK: спани пишуться JSON Lines
+у файл (формат OpenTelemetry, по одному спану на рядок) окремим потоком
+(BatchSpanProcessor). Трасуються view (TracingMiddleware), кожен SQL запит
+(execute_wrapper), етапи PermitPDFGenerator і запис файлів.
+
+Коли вимкнено: TracingMiddleware не підключається (MiddlewareNotUsed),
+обгортка SQL не ставиться, span()/traced() лише перевіряють _tracer is None.
+"""
+import functools
+import os
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+SERVICE_NAME = 'tenderbug-backend'
+MAX_STATEMENT_LENGTH = 2000
+
+_tracer = None
+_noop = nullcontext()
+
+
+def configure():
+    """Вмикає трасування, якщо задано TRACING_FILE (викликається з UsersConfig.ready)"""
+    global _tracer
+    if _tracer is not None or not settings.TRACING_FILE:
+        return
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    filename = settings.TRACING_FILE.format(pid=os.getpid())
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    exporter = ConsoleSpanExporter(
+        out=open(filename, 'a', encoding='utf-8'),
+        formatter=lambda span: span.to_json(indent=None) + '\n',
+    )
+    provider = TracerProvider(
+        resource=Resource.create({'service.name': SERVICE_NAME, 'process.pid': os.getpid()}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = provider.get_tracer(__name__)
+    connection_created.connect(_install_query_tracer)
+
+
+def span(name, attributes=None):
+    """with span('pdf.render', {'permit.number': ...}): ... - без трасування нічого не робить"""
+    if _tracer is None:
+        return _noop
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(name):
+    """Декоратор: виклик функції - окремий спан"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ===================================================================
+# ORM
+
+def _trace_query(execute, sql, params, many, context):
+    # Запити поза трасою (міграції, shell) не пишемо
+    if not trace.get_current_span().is_recording():
+        return execute(sql, params, many, context)
+    connection = context['connection']
+    attributes = {
+        'db.system': connection.vendor,
+        'db.name': connection.alias,
+        'db.statement': sql[:MAX_STATEMENT_LENGTH],
+    }
+    if many:
+        attributes['db.executemany'] = True
+    with _tracer.start_as_current_span('db.query', kind=SpanKind.CLIENT, attributes=attributes):
+        return execute(sql, params, many, context)
+
+
+def _install_query_tracer(sender, connection, **kwargs):
+    if _trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_trace_query)
+
+
+# ===================================================================
+# View
+
+class TracingMiddleware:
+    """Спан на HTTP запит; SQL та PDF спани запиту - його нащадки"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if _tracer is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self._start(request) as current:
+            response = self.get_response(request)
+            self._finish(current, request, response)
+        return response
+
+    async def __acall__(self, request):
+        with self._start(request) as current:
+            response = await self.get_response(request)
+            self._finish(current, request, response)
+        return response
+
+    def _start(self, request):
+        return _tracer.start_as_current_span(request.method, kind=SpanKind.SERVER, attributes={
+            'http.method': request.method,
+            'http.target': request.path,
+        })
+
+    def _finish(self, current, request, response):
+        match = getattr(request, 'resolver_match', None)
+        if match:
+            current.update_name(f'{request.method} {match.view_name}')
+            current.set_attribute('http.route', match.route)
+        current.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            current.set_status(Status(StatusCode.ERROR))
@@ -36,6 +36,8 @@ export interface FileInfo {
   size?: number;
   document_type?: string;
   expiry_date?: string;
+  digest?: string;
+  digest_signature?: string;
 }
 
 export interface DocumentsCollection {